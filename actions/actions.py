@@ -1,15 +1,11 @@
 # Standard Library Imports
 import os
 import random
-import math
+import asyncio
 import logging
 
 # Third-Party Libraries
-import requests
-import validators
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker, Session
 from typing import Any, Text, Dict, List
 from collections import defaultdict
 
@@ -19,8 +15,13 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, AllSlotsReset, ActiveLoop
 
 # Custom Modules
-from database.db_queries import *
 from database.models import *
+from database import async_db_queries as db
+from database.session import get_session, async_session_scope
+from database.vocabulary import Vocabulary
+from database.image_validator import check_header_image_async, create_async_http_client, is_status_fresh
+from actions.image_store import create_image_store_from_env
+from actions.instrumentation import instrumented, instrument_http_client
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level="DEBUG")
@@ -28,38 +29,30 @@ logging.basicConfig(level="DEBUG")
 # Carica le variabili di ambiente dal file .env
 load_dotenv()
 
-# Recupera gli elementi dell'URL del database
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
-DB_DRIVER = os.getenv("DB_DRIVER")
+# Filtri delle raccomandazioni risolti con l'indice in memoria invece che con i join SQL
+USE_FACET_INDEX = os.getenv("USE_FACET_INDEX", "false").lower() in ("1", "true", "yes")
 
-# Costruisci l'URL del database
-DATABASE_URL = f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+# Giochi candidati per ogni genere o publisher richiesto, tra cui scegliere le raccomandazioni
+RECOMMENDATION_CANDIDATES = int(os.getenv("RECOMMENDATION_CANDIDATES", 200))
 
-# Create an engine and sessionmaker
-engine = create_engine(DATABASE_URL)
-SessionFactory = sessionmaker(bind=engine)
+# Somiglianza minima per mostrare direttamente il gioco trovato con la ricerca approssimata
+GAME_NAME_MIN_SIMILARITY = float(os.getenv("GAME_NAME_MIN_SIMILARITY", 0.6))
 
-# Helper function to get the session
-def get_session() -> Session:
-    return SessionFactory()
+# Vocabolari di generi e publisher condivisi da tutti i validatori
+tag_vocabulary = Vocabulary(get_session, Tag, Tag.tag_id, async_session_scope=async_session_scope)
+publisher_vocabulary = Vocabulary(get_session, Publisher, Publisher.publisher_id, async_session_scope=async_session_scope)
 
-def get_game_score(game):
-    if game.positive + game.negative == 0:
-        return 0
-    return (game.positive / (game.positive + game.negative)) * math.log(game.positive + game.negative + 1)
+# Timeout complessivo (in secondi) per la validazione delle immagini di una risposta
+IMAGE_CHECK_TIMEOUT = float(os.getenv("IMAGE_CHECK_TIMEOUT", 3))
+IMAGE_CHECK_WORKERS = int(os.getenv("IMAGE_CHECK_WORKERS", 8))
 
-def format_names(names):
+# Client HTTP asincrono condiviso: riutilizza le connessioni verso la CDN tra le richieste
+http_client = instrument_http_client(create_async_http_client(IMAGE_CHECK_WORKERS))
 
-    all_names = ", ".join([name.name for name in names])
-
-    if ", " in all_names:
-        all_names = all_names.rsplit(", ", 1)
-        all_names = " and ".join(all_names)
-
-    return all_names
+# Cache locale delle immagini ridimensionate (attiva se IMAGE_STORE_DIR è impostata),
+# che scarica con lo stesso client
+image_store = create_image_store_from_env(http_client)
+IMAGE_STORE_URL = os.getenv("IMAGE_STORE_URL", "").rstrip("/")
 
 def format_names_list(names, logic_op = "or"):
     
@@ -136,80 +129,105 @@ def get_games_for_publishers_and_tags(games, publisher_names, genres_names, disp
 
     return list(selected_games)
 
-def game_info_response(game):
-    # Recupero dei nomi degli editori e degli sviluppatori
-    pub_names = format_names(game.publishers)
-    dev_names = format_names(game.developers)
-    
-    # Recupero della data di rilascio
-    release_date = game.release_date.strftime("%B %d, %Y") if game.release_date else "N/A"
-    
-    # Recupero dei dettagli aggiuntivi
-    price = f"${game.price:.2f}" if game.price else "Price not available"
-    short_description = game.short_description if game.short_description else "No description available"
-    required_age = game.required_age if game.required_age else "Not available"
-    estimated_owners = game.estimated_owners if game.estimated_owners else "Not available"
-    reviews = game.reviews if game.reviews else "No reviews available"
-    metacritic_score = f"Metacritic score: {game.metacritic_score}" if game.metacritic_score else "No Metacritic score available"
-    supported_languages = ', '.join([language.name for language in game.supported_languages]) if game.supported_languages else "No supported languages listed"
-    
-    # Recupero del supporto per i sistemi operativi
-    os_support = []
-    if game.support_windows:
-        os_support.append("Windows")
-    if game.support_mac:
-        os_support.append("Mac")
-    if game.support_linux:
-        os_support.append("Linux")
-    
-    os_support_text = ', '.join(os_support) if os_support else "No operating system support listed."
-    
-    # Formattazione della risposta con informazioni aggiuntive
-    response = (
-        f"🎮 {game.name} was released on {release_date} by {pub_names}\n"
-        f"💰 It costs {price} and was developed by {dev_names}\n"
-        f"🔞 Required Age: {required_age}.\n"
-        f"📝 Description: {short_description}\n"
-        f"👥 Estimated owners: {estimated_owners}\n"
-        f"⭐ Reviews: {reviews}\n"
-        f"🎯 {metacritic_score}\n"
-        f"🌐 Languages supported: {supported_languages}\n"
-        f"💻 Operating System Support: {os_support_text}"
-    )
-    
-    return response
-
-def game_info_response_dispatched(dispatcher, game):
-    response = game_info_response(game)
-    header_image = game.header_image
-    
-    # Controlla se l'URL è valido
-    if validators.url(header_image):
-        try:
-            # Fai una richiesta HEAD per ottenere il tipo di contenuto, seguendo le redirezioni
-            response = requests.head(header_image, allow_redirects=True, timeout=10)
-            content_type = response.headers.get('Content-Type', '').lower()
-            
-            # Verifica se il Content-Type è di un'immagine
-            if 'image' in content_type:
-                dispatcher.utter_message(image=header_image, text=game_info_response(game))
+async def get_stored_image_statuses(games):
+    """Return the image statuses saved by the offline validator that are still fresh."""
+    async with async_session_scope() as session:
+        stored_statuses = await db.get_image_statuses(session, [game.app_id for game in games])
+
+    header_images = {game.app_id: game.header_image for game in games}
+    return {
+        image_status.app_id: image_status.status
+        for image_status in stored_statuses
+        if is_status_fresh(image_status, header_images[image_status.app_id])
+    }
+
+async def check_game_image(game, timeout):
+    """Check the header image of a game, storing a resized copy when the image store is enabled."""
+    if image_store:
+        return await image_store.fetch(game.app_id, game.header_image, timeout)
+    return (await check_header_image_async(http_client, game.header_image, timeout))[0]
+
+def needs_image_check(game, image_statuses):
+    if game.app_id not in image_statuses:
+        return True
+    # Un'immagine valida non ancora salvata in locale va scaricata
+    return image_store is not None and image_statuses[game.app_id] == "image"
+
+async def validate_header_images(games, timeout=IMAGE_CHECK_TIMEOUT):
+    """Check the header images of all the games at once, within a single overall deadline.
+
+    Images already in the local image store and statuses saved by the
+    offline validator are used when available, so only the remaining
+    images go to the network. Returns a dict mapping app_id to the image
+    status; games whose check misses the deadline are marked as "timeout".
+    """
+    image_statuses = await get_stored_image_statuses(games)
+
+    if image_store:
+        for game in games:
+            if image_store.contains(game.app_id):
+                image_statuses[game.app_id] = "cached"
+
+    tasks = {
+        asyncio.ensure_future(check_game_image(game, timeout)): game.app_id
+        for game in games if needs_image_check(game, image_statuses)
+    }
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+
+        for task, app_id in tasks.items():
+            if task not in done:
+                image_statuses[app_id] = "timeout"
+            elif task.exception() is not None:
+                # Un controllo fallito non deve far cadere l'intera risposta
+                logger.warning(f"Header image check failed for game {app_id}: {task.exception()!r}")
+                image_statuses[app_id] = "error"
             else:
-                response = game_info_response(game) + "\n🚫 The URL does not point to an image"
-                dispatcher.utter_message(text=response)
-        except requests.exceptions.RequestException as e:
-            # Gestisce eventuali errori durante la richiesta
-            response = game_info_response(game) + "\n❌ Failed to retrieve image"
-            dispatcher.utter_message(text=response)
+                image_statuses[app_id] = task.result()
+
+    return image_statuses
+
+def get_image_url(game):
+    """Return the URL of the local resized copy if available, otherwise the original one."""
+    if image_store and IMAGE_STORE_URL and image_store.contains(game.app_id):
+        return f"{IMAGE_STORE_URL}/{game.app_id}.jpg"
+    return game.header_image
+
+async def game_info_response_dispatched(dispatcher, game, image_status=None):
+    response = game.card_text
+
+    if image_status is None:
+        image_status = (await validate_header_images([game]))[game.app_id]
+
+    if image_status in ("image", "cached"):
+        dispatcher.utter_message(image=get_image_url(game), text=response)
+    elif image_status == "not_image":
+        dispatcher.utter_message(text=response + "\n🚫 The URL does not point to an image")
+    elif image_status == "error":
+        dispatcher.utter_message(text=response + "\n❌ Failed to retrieve image")
+    elif image_status == "invalid":
+        dispatcher.utter_message(text=response + "\n❓ No valid URL found")
     else:
-        response = game_info_response(game) + "\n❓ No valid URL found"
+        # Controllo non concluso entro il tempo limite: solo testo
         dispatcher.utter_message(text=response)
 
+async def games_info_response_dispatched(dispatcher, games):
+    """Send the cards of several games, validating all their header images in a single batch."""
+    image_statuses = await validate_header_images(games)
+
+    for game in games:
+        await game_info_response_dispatched(dispatcher, game, image_statuses[game.app_id])
 
+
+@instrumented
 class ActionProvideGameInfo(Action):
     def name(self) -> Text:
         return "action_provide_game_info"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -218,23 +236,33 @@ class ActionProvideGameInfo(Action):
             dispatcher.utter_message(text="❓ I need the name of the game to provide details")
             return [SlotSet("game", None)]
         
-        session = get_session()
-
-        game = get_game_by_name(session, original_game)
-
-        if game:
-            game_info_response_dispatched(dispatcher, game)
+        game = None
+        async with async_session_scope() as session:
+            candidates = await db.find_games_by_name(session, original_game, limit=3)
+            matched = candidates and candidates[0][2] >= GAME_NAME_MIN_SIMILARITY
+
+            if matched:
+                # L'indice dei nomi può riferire un gioco appena eliminato da una sincronizzazione
+                cards = await db.get_stored_game_cards(session, [candidates[0][0]])
+                game = cards[0] if cards else None
+
+        # La sessione è già chiusa: il controllo dell'immagine non tiene occupata una connessione
+        if game is not None:
+            await game_info_response_dispatched(dispatcher, game)
+        elif candidates and not matched:
+            suggestions = format_names_list([name for _, name, _ in candidates])
+            dispatcher.utter_message(text=f"🚫 Sorry, I couldn't retrieve details for the game '{original_game}'. Did you mean {suggestions}?")
         else:
             dispatcher.utter_message(text=f"🚫 Sorry, I couldn't retrieve details for the game '{original_game}'")
-        
-        session.close()
+
         return [SlotSet("game", None)]
     
+@instrumented
 class ActionProvidePublisherGames(Action):
     def name(self) -> Text:
         return "action_provide_publisher_games"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -244,9 +272,9 @@ class ActionProvidePublisherGames(Action):
             dispatcher.utter_message(text="❓ I need the name of the publishers to provide details")
             return [SlotSet("publishers", None)]
         
-        session = get_session()
-
-        games = get_top_games_filtered(session, publisher_names = [original_publisher], limit=5)
+        async with async_session_scope() as session:
+            games = await db.get_top_games_filtered(session, publisher_names = [original_publisher], limit=5, use_facet_index=USE_FACET_INDEX)
+            games = await db.get_stored_game_cards(session, [game.app_id for game in games])
 
         verb = format_plural_verb(len(games))
 
@@ -255,65 +283,65 @@ class ActionProvidePublisherGames(Action):
         else:
             dispatcher.utter_message(text=f"💡 Here {verb} {len(games)} of our recommendations based on the publisher {original_publisher}:")
 
-            for game in games:
-                game_info_response_dispatched(dispatcher, game)
-        
-        session.close()
+            await games_info_response_dispatched(dispatcher, games)
+
         return [SlotSet("publishers", None)]
 
+@instrumented
 class ActionProvideGenres(Action):
     def name(self) -> Text:
         return "action_provide_genres"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
-        session = get_session()
-
-        genres = get_top_tags(session)
+        async with async_session_scope() as session:
+            genres = await db.get_top_tags(session, limit=10)
+            genres_count = await db.count_top_tags(session)
         
-        # Crea il messaggio da inviare
-        message = f"🎮 I have a total of {len(genres)} genres and subgenres available. These are the 10 most popular:\n\n"
+            # Crea il messaggio da inviare
+            message = f"🎮 I have a total of {genres_count} genres and subgenres available. These are the 10 most popular:\n\n"
 
-        for i, (genre, game_count) in enumerate(genres[:10], 1):  # Prendi solo i primi 10
-            message += f"🔹 {i}. {genre.name} - {game_count} games in this genres\n"
+            for i, (genre, game_count) in enumerate(genres, 1):
+                message += f"🔹 {i}. {genre.name} - {game_count} games in this genres\n"
+
+            dispatcher.utter_message(message)
 
-        dispatcher.utter_message(message)
-        
-        session.close()
         return []
     
+@instrumented
 class ActionProvidePublishers(Action):
     def name(self) -> Text:
         return "action_provide_publishers"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
-        session = get_session()
-
-        # Ottieni i top publishers con il conteggio dei giochi
-        publishers = get_top_publishers(session)
+        async with async_session_scope() as session:
+            # Ottieni i top publishers con il conteggio dei giochi
+            publishers = await db.get_top_publishers(session, limit=10)
+            publishers_count = await db.count_top_publishers(session)
         
-        # Crea il messaggio da inviare
-        message = f"🏢 I have {len(publishers)} publishers available. These are the 10 who have produced the most games:\n\n"
+            # Crea il messaggio da inviare
+            message = f"🏢 I have {publishers_count} publishers available. These are the 10 who have produced the most games:\n\n"
+
+            # Aggiungi i dettagli dei primi 10 publishers in una lista numerata
+            for i, (publisher, game_count) in enumerate(publishers, 1):
+                message += f"🔸 {i}. {publisher.name} - Games produced: {game_count}\n"
 
-        # Aggiungi i dettagli dei primi 10 publishers in una lista numerata
-        for i, (publisher, game_count) in enumerate(publishers[:10], 1):  # Prendi solo i primi 10
-            message += f"🔸 {i}. {publisher.name} - Games produced: {game_count}\n"
+            # Manda il messaggio
+            dispatcher.utter_message(message)
 
-        # Manda il messaggio
-        dispatcher.utter_message(message)
-        session.close()
         return []
 
+@instrumented
 class ActionProvideRecommendation(Action):
     def name(self) -> Text:
         return "action_provide_recommendation"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
@@ -330,56 +358,53 @@ class ActionProvideRecommendation(Action):
 
         logger.info(f"Tracker: yolo")
 
-        session = get_session()
-
-        negative_response = ""
-        positive_response = ""
+        async with async_session_scope() as session:
+            negative_response = ""
+            positive_response = ""
 
-        games = None
+            games = None
 
-        if not genres and not publishers and not genres_filter and not publishers_filter:
-            games = get_top_games(session, limit=1000)
-
-            if len(games) >= 5:
-                games = random.sample(games, 5)
-            else:
-                games = games
+            if not genres and not publishers and not genres_filter and not publishers_filter:
+                games = await db.get_stored_game_cards(session, await db.sample_top_game_ids(session, k=5, top_n=1000))
 
-            positive_response = "🎮 Here are 5 games across all genres and publishers."
-            negative_response = "🚫 Sorry, I couldn't retrieve the top games right now."
+                positive_response = "🎮 Here are 5 games across all genres and publishers."
+                negative_response = "🚫 Sorry, I couldn't retrieve the top games right now."
 
-        elif genres and publishers and genres_filter and publishers_filter:
-            games = get_top_games_filtered(session, publishers, genres)
+            elif genres and publishers and genres_filter and publishers_filter:
+                games = await db.get_recommendation_candidates(session, publishers, genres, RECOMMENDATION_CANDIDATES, use_facet_index=USE_FACET_INDEX)
 
-            games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher)
+                games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher)
+                games = await db.get_stored_game_cards(session, [game.app_id for game in games])
 
-            verb = format_plural_verb(len(games))
+                verb = format_plural_verb(len(games))
 
-            positive_response = f"💡 Here {verb} {len(games)} of our recommendations based on the {format_names_list(genres)} {genre_label} and {format_names_list(publishers)} {publisher_label}:"
-            negative_response = f"🚫 Sorry, I couldn't find any games for the {format_names_list(genres)} {genre_label} and {format_names_list(publishers)} {publisher_label} combination."
+                positive_response = f"💡 Here {verb} {len(games)} of our recommendations based on the {format_names_list(genres)} {genre_label} and {format_names_list(publishers)} {publisher_label}:"
+                negative_response = f"🚫 Sorry, I couldn't find any games for the {format_names_list(genres)} {genre_label} and {format_names_list(publishers)} {publisher_label} combination."
 
-        elif not genres and publishers and not genres_filter and publishers_filter:
-            games = get_top_games_filtered(session, publisher_names=publishers)
+            elif not genres and publishers and not genres_filter and publishers_filter:
+                games = await db.get_recommendation_candidates(session, publisher_names=publishers, per_name_limit=RECOMMENDATION_CANDIDATES, use_facet_index=USE_FACET_INDEX)
 
-            games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher, use_tags=False)
+                games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher, use_tags=False)
+                games = await db.get_stored_game_cards(session, [game.app_id for game in games])
             
-            verb = format_plural_verb(len(games))
+                verb = format_plural_verb(len(games))
 
-            positive_response = f"📝 Here {verb} {len(games)} games published by {format_names_list(publishers)}:"
-            negative_response = f"🚫 Sorry, I couldn't find any games published by {format_names_list(publishers)}."
+                positive_response = f"📝 Here {verb} {len(games)} games published by {format_names_list(publishers)}:"
+                negative_response = f"🚫 Sorry, I couldn't find any games published by {format_names_list(publishers)}."
 
-        elif genres and not publishers and genres_filter and not publishers_filter:
-            games = get_top_games_filtered(session, tag_names= genres)
+            elif genres and not publishers and genres_filter and not publishers_filter:
+                games = await db.get_recommendation_candidates(session, tag_names=genres, per_name_limit=RECOMMENDATION_CANDIDATES, use_facet_index=USE_FACET_INDEX)
 
-            games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher, use_publishers = False)
+                games = get_games_for_publishers_and_tags(games, publishers, genres, dispatcher, use_publishers = False)
+                games = await db.get_stored_game_cards(session, [game.app_id for game in games])
             
-            verb = format_plural_verb(len(games))
+                verb = format_plural_verb(len(games))
             
-            positive_response = f"🎮 Here {verb} {len(games)} games of the {format_names_list(genres)} {genre_label}:"
-            negative_response = f"🚫 Sorry, I couldn't find any games of the {format_names_list(genres)} {genre_label}."
+                positive_response = f"🎮 Here {verb} {len(games)} games of the {format_names_list(genres)} {genre_label}:"
+                negative_response = f"🚫 Sorry, I couldn't find any games of the {format_names_list(genres)} {genre_label}."
 
-        else:
-            negative_response = "🚫 Sorry, I couldn't process your request. Please try specifying different criteria or check your input."
+            else:
+                negative_response = "🚫 Sorry, I couldn't process your request. Please try specifying different criteria or check your input."
 
 
         if not games:
@@ -387,13 +412,12 @@ class ActionProvideRecommendation(Action):
         else:
             dispatcher.utter_message(text=positive_response)
 
-            for game in games:
-                game_info_response_dispatched(dispatcher, game)
+            await games_info_response_dispatched(dispatcher, games)
 
-        session.close()
         return [AllSlotsReset()]
 
     
+@instrumented
 class ActionResumeForm(Action):
     def name(self):
         return "action_resume_form"
@@ -403,6 +427,7 @@ class ActionResumeForm(Action):
         dispatcher.utter_message(text="🔄 Alright, let's pick up where we left off! 😊")
         return [ActiveLoop("detailed_recommendation_form")]
     
+@instrumented
 class ValidateDetailedRecommendationForm(FormValidationAction):
     def name(self) -> Text:
         return "validate_detailed_recommendation_form"
@@ -426,7 +451,7 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
         
         return {"genres_filter": None}
 
-    def validate_genres(
+    async def validate_genres(
         self,
         value: Any,
         dispatcher: CollectingDispatcher,
@@ -438,10 +463,6 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
         if not tracker.get_slot('genres_filter')  and tracker.get_slot('genres') == ["NO"]:
             return {"genres": ["NO"]}
 
-        session = get_session()
-        genres = get_all_tag_names(session)
-        genres = [genre[0].lower() for genre in genres]
-
         slot_value = tracker.get_slot('genres')
 
         logger.info(f"Tracker: {slot_value}")
@@ -452,11 +473,11 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
             valid_genres = []
             
             for value in slot_value:
-                # Convertiamo e verifichiamo ogni valore
-                normalized_value = value.strip().lower()
-                if normalized_value in genres:
-                    logger.info(f"Tracker: {value.strip()}")
-                    valid_genres.append(value.strip())
+                # Verifichiamo ogni valore sul vocabolario dei generi
+                entry = await tag_vocabulary.lookup_async(value)
+                if entry and entry[0] not in valid_genres:
+                    logger.info(f"Tracker: {entry[0]}")
+                    valid_genres.append(entry[0])
             
             # Se abbiamo trovato generi validi, ritorniamo il risultato
             if valid_genres:
@@ -484,7 +505,7 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
         
         return {"publishers_filter": None}
         
-    def validate_publishers(
+    async def validate_publishers(
         self,
         value: Any,
         dispatcher: CollectingDispatcher,
@@ -496,10 +517,6 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
         if not tracker.get_slot('publishers_filter') and tracker.get_slot('publishers') == ["NO"]:
             return {"publishers": ["NO"]}
 
-        session = get_session()
-        publishers = get_all_publisher_names(session)
-        publishers = [publisher[0].lower() for publisher in publishers]
-
         slot_value = tracker.get_slot('publishers')
 
         if slot_value:
@@ -508,11 +525,11 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
             slot_value = list(set(slot_value))
             
             for value in slot_value:
-                # Convertiamo e verifichiamo ogni valore
-                normalized_value = value.strip().lower()
-                if normalized_value in publishers:
-                    logger.info(f"Tracker: {value.strip()}")
-                    valid_publishers.append(value.strip())
+                # Verifichiamo ogni valore sul vocabolario dei publisher
+                entry = await publisher_vocabulary.lookup_async(value)
+                if entry and entry[0] not in valid_publishers:
+                    logger.info(f"Tracker: {entry[0]}")
+                    valid_publishers.append(entry[0])
             
             # Se abbiamo trovato publishers validi, ritorniamo il risultato
             if valid_publishers:
@@ -522,6 +539,7 @@ class ValidateDetailedRecommendationForm(FormValidationAction):
         dispatcher.utter_message(text="🚫 Sorry, that's not a valid publishers. Please try again.")
         return {'publishers': None}
 
+@instrumented
 class ActionResetSlots(Action):
     def name(self) -> Text:
         return "action_reset_slots"
@@ -0,0 +1,183 @@
+import os
+import io
+import sys
+import uuid
+import asyncio
+import argparse
+import threading
+from collections import OrderedDict
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import httpx
+import validators
+from dotenv import load_dotenv
+from PIL import Image, UnidentifiedImageError
+
+# Dimensione massima scaricata per una singola immagine
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+
+
+class ImageStore:
+    """Cache su disco delle immagini di copertina ridimensionate per la chat, per app_id.
+
+    Ogni immagine viene scaricata una volta, ridotta a ``max_width`` e salvata
+    come ``<app_id>.jpg``. Quando lo spazio occupato supera ``max_bytes`` vengono
+    eliminate le immagini usate meno di recente.
+    """
+
+    def __init__(self, directory, max_bytes, max_width=460, http_client=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_width = max_width
+        self.http_client = http_client or httpx.AsyncClient(follow_redirects=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # app_id -> dimensione, dal meno recente
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Ricostruisce l'ordine LRU dai file già su disco (dal meno recente)."""
+        files = []
+        for file_name in os.listdir(self.directory):
+            app_id, extension = os.path.splitext(file_name)
+            if extension != ".jpg" or not app_id.isdigit():
+                continue
+            stat = os.stat(os.path.join(self.directory, file_name))
+            files.append((stat.st_mtime, int(app_id), stat.st_size))
+
+        for _, app_id, size in sorted(files):
+            self._entries[app_id] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def path(self, app_id):
+        return os.path.join(self.directory, f"{app_id}.jpg")
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def contains(self, app_id):
+        """True se l'immagine è in cache; la segna come usata di recente."""
+        with self._lock:
+            if app_id not in self._entries:
+                return False
+            self._entries.move_to_end(app_id)
+
+        # L'mtime conserva l'ordine LRU anche dopo un riavvio
+        try:
+            os.utime(self.path(app_id))
+        except FileNotFoundError:
+            self._forget(app_id)
+            return False
+        return True
+
+    async def fetch(self, app_id, url, timeout=10):
+        """Scarica, ridimensiona e salva l'immagine di un gioco.
+
+        Restituisce gli stessi stati del controllo delle immagini: image,
+        not_image, error o invalid. Il download usa il client asincrono, quindi
+        annullare la richiesta interrompe anche il trasferimento; solo il
+        ridimensionamento (Pillow, dimensione limitata) gira in un thread.
+        """
+        if not url or not validators.url(url):
+            return "invalid"
+
+        try:
+            async with self.http_client.stream("GET", url, timeout=timeout) as response:
+                response.raise_for_status()
+                if 'image' not in response.headers.get('Content-Type', '').lower():
+                    return "not_image"
+
+                data = io.BytesIO()
+                async for chunk in response.aiter_bytes(64 * 1024):
+                    data.write(chunk)
+                    if data.tell() > MAX_DOWNLOAD_BYTES:
+                        return "error"
+        except httpx.HTTPError:
+            return "error"
+
+        return await asyncio.to_thread(self.store, app_id, data)
+
+    def store(self, app_id, data):
+        """Ridimensiona e salva un'immagine scaricata; restituisce image, not_image o error (scrittura fallita)."""
+        try:
+            image = Image.open(data)
+            image.thumbnail((self.max_width, self.max_width))
+            image = image.convert("RGB")
+        except (UnidentifiedImageError, OSError):
+            return "not_image"
+
+        # Scrittura atomica: un file parziale non viene mai servito
+        tmp_path = os.path.join(self.directory, f".{app_id}.{uuid.uuid4().hex}.tmp")
+        try:
+            image.save(tmp_path, "JPEG", quality=85, optimize=True)
+            os.replace(tmp_path, self.path(app_id))
+            size = os.path.getsize(self.path(app_id))
+        except OSError:
+            # Disco pieno o permessi: nessuna copia locale, la risposta usa l'URL originale
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            return "error"
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(app_id, 0)
+            self._entries[app_id] = size
+            self._total_bytes += size
+            self._evict()
+
+        return "image"
+
+    def _forget(self, app_id):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(app_id, 0)
+
+    def _evict(self):
+        # Tiene sempre almeno l'ultima immagine inserita
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            app_id, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self.path(app_id))
+            except FileNotFoundError:
+                pass
+
+
+def create_image_store_from_env(http_client=None):
+    """Crea l'archivio delle immagini configurato nelle variabili di ambiente, o None se disattivato."""
+    directory = os.getenv("IMAGE_STORE_DIR")
+    if not directory:
+        return None
+
+    max_bytes = int(float(os.getenv("IMAGE_STORE_MAX_MB", 200)) * 1024 * 1024)
+    max_width = int(os.getenv("IMAGE_STORE_WIDTH", 460))
+    return ImageStore(directory, max_bytes, max_width, http_client)
+
+
+def serve(directory, port):
+    """Serve le immagini salvate via HTTP (IMAGE_STORE_URL deve puntare a questo server)."""
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    with ThreadingHTTPServer(("", port), handler) as server:
+        print(f"Immagini di {directory} servite sulla porta {port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    arg_parser = argparse.ArgumentParser(description="Serve l'archivio locale delle immagini di copertina.")
+    arg_parser.add_argument("--dir", default=os.getenv("IMAGE_STORE_DIR"), help="cartella dell'archivio delle immagini")
+    arg_parser.add_argument("--port", type=int, default=8081)
+    args = arg_parser.parse_args()
+
+    if not args.dir:
+        sys.exit("IMAGE_STORE_DIR non è impostata")
+    serve(args.dir, args.port)
@@ -0,0 +1,265 @@
+import os
+import time
+import inspect
+import logging
+import functools
+from collections import defaultdict
+from contextvars import ContextVar
+
+from prometheus_client import Histogram, start_http_server
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database.session import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+# Richieste più lente di questa soglia (in millisecondi) finiscono nel log
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))
+# Istruzioni SQL riportate per ogni richiesta lenta
+SLOW_REQUEST_TOP_STATEMENTS = 5
+# Porta dell'endpoint Prometheus (0 lo disattiva)
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9105))
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+ACTION_DURATION = Histogram(
+    "chatbot_action_duration_seconds", "Wall time of a custom action", ["action"],
+)
+ACTION_SQL_STATEMENTS = Histogram(
+    "chatbot_action_sql_statements", "SQL statements executed by a custom action", ["action"], buckets=COUNT_BUCKETS,
+)
+ACTION_SQL_SECONDS = Histogram(
+    "chatbot_action_sql_seconds", "Time spent in SQL statements by a custom action", ["action"],
+)
+ACTION_HTTP_REQUESTS = Histogram(
+    "chatbot_action_http_requests", "Outbound HTTP requests made by a custom action", ["action"], buckets=COUNT_BUCKETS,
+)
+ACTION_HTTP_SECONDS = Histogram(
+    "chatbot_action_http_seconds", "Time spent in outbound HTTP requests by a custom action", ["action"],
+)
+VALIDATOR_DURATION = Histogram(
+    "chatbot_validator_duration_seconds", "Wall time of a form slot validator", ["action", "validator"],
+)
+
+# Statistiche del pool di connessioni (database.session.get_pool_stats): nome -> (metrica, descrizione)
+POOL_COUNTERS = {
+    "checkouts": ("chatbot_db_pool_checkouts", "Connections checked out of the pool"),
+    "connects": ("chatbot_db_pool_connects", "New connections opened by the pool"),
+    "invalidations": ("chatbot_db_pool_invalidations", "Pooled connections invalidated"),
+    "waits": ("chatbot_db_pool_waits", "Checkouts that waited for a free connection"),
+    "wait_time": ("chatbot_db_pool_wait_seconds", "Time spent waiting for a free connection"),
+}
+POOL_GAUGES = {
+    "max_wait_time": ("chatbot_db_pool_max_wait_seconds", "Longest wait for a free connection"),
+    "size": ("chatbot_db_pool_size", "Configured size of the pool"),
+    "checked_in": ("chatbot_db_pool_checked_in", "Idle connections in the pool"),
+    "checked_out": ("chatbot_db_pool_checked_out", "Connections currently in use"),
+    "overflow": ("chatbot_db_pool_overflow", "Connections opened beyond the pool size"),
+}
+
+
+class PoolStatsCollector:
+    """Publish the connection pool statistics of both engines, read at every scrape."""
+
+    def collect(self):
+        pool_stats = get_pool_stats()
+        for key, (name, documentation) in POOL_COUNTERS.items():
+            family = CounterMetricFamily(name, documentation, labels=["engine"])
+            for engine, stats in pool_stats.items():
+                family.add_metric([engine], stats[key])
+            yield family
+        for key, (name, documentation) in POOL_GAUGES.items():
+            family = GaugeMetricFamily(name, documentation, labels=["engine"])
+            for engine, stats in pool_stats.items():
+                # Le dimensioni esistono solo per i pool a coda già creati (non per SQLite)
+                if key in stats:
+                    family.add_metric([engine], stats[key])
+            yield family
+
+
+REGISTRY.register(PoolStatsCollector())
+
+
+class RequestStats:
+    """SQL and HTTP activity of a single action run."""
+
+    def __init__(self, action):
+        self.action = action
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.http_count = 0
+        self.http_time = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])  # istruzione -> [esecuzioni, tempo]
+
+    def record_sql(self, statement, elapsed):
+        self.sql_count += 1
+        self.sql_time += elapsed
+        entry = self.statements[statement]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def record_http(self, elapsed):
+        self.http_count += 1
+        self.http_time += elapsed
+
+    def top_statements(self, limit=SLOW_REQUEST_TOP_STATEMENTS):
+        """The statements that took the most total time: (statement, executions, seconds)."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(statement, count, elapsed) for statement, (count, elapsed) in ranked[:limit]]
+
+
+# Statistiche della richiesta in corso: seguono le coroutine, i thread di asyncio.to_thread
+# e le sessioni asincrone (run_sync)
+current_request = ContextVar("current_request", default=None)
+
+
+# Ogni istruzione in corso sulla connessione lascia (contesto, istante di inizio):
+# after_cursor_execute toglie l'ultima, handle_error quella dell'istruzione fallita
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, start = conn.info["query_start_time"].pop()
+    _record_sql(statement, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is None:
+        return  # errore di connessione: nessuna istruzione partita
+    started = conn.info.get("query_start_time")
+    # Gli errori durante la lettura dei risultati arrivano dopo after_cursor_execute:
+    # la voce è già stata tolta e in cima c'è quella di un'altra istruzione
+    if started and started[-1][0] is exception_context.execution_context:
+        _, start = started.pop()
+        _record_sql(exception_context.statement, time.perf_counter() - start)
+
+
+def _record_sql(statement, elapsed):
+    stats = current_request.get()
+    if stats is not None:
+        stats.record_sql(statement, elapsed)
+
+
+def _record_response_time(elapsed):
+    stats = current_request.get()
+    if stats is not None:
+        stats.record_http(elapsed)
+
+
+def instrument_http_client(http_client):
+    """Record the requests made with an httpx.AsyncClient in the current action's stats."""
+    async def on_request(request):
+        request.extensions["start_time"] = time.perf_counter()
+
+    async def on_response(response):
+        _record_response_time(time.perf_counter() - response.request.extensions["start_time"])
+
+    http_client.event_hooks["request"].append(on_request)
+    http_client.event_hooks["response"].append(on_response)
+    return http_client
+
+
+def _observe(stats, elapsed):
+    ACTION_DURATION.labels(stats.action).observe(elapsed)
+    ACTION_SQL_STATEMENTS.labels(stats.action).observe(stats.sql_count)
+    ACTION_SQL_SECONDS.labels(stats.action).observe(stats.sql_time)
+    ACTION_HTTP_REQUESTS.labels(stats.action).observe(stats.http_count)
+    ACTION_HTTP_SECONDS.labels(stats.action).observe(stats.http_time)
+
+    if elapsed * 1000 < SLOW_REQUEST_MS:
+        return
+
+    lines = [
+        f"Slow action {stats.action}: {elapsed * 1000:.0f} ms, "
+        f"{stats.sql_count} SQL statements ({stats.sql_time * 1000:.0f} ms), "
+        f"{stats.http_count} HTTP requests ({stats.http_time * 1000:.0f} ms)"
+    ]
+    for statement, count, statement_time in stats.top_statements():
+        lines.append(f"  {statement_time * 1000:8.1f} ms  x{count:<4} {' '.join(statement.split())[:200]}")
+    logger.warning("\n".join(lines))
+
+
+def _wrap_run(run):
+    @functools.wraps(run)
+    async def instrumented_run(self, dispatcher, tracker, domain):
+        start_metrics_server()
+        stats = RequestStats(self.name())
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            result = run(self, dispatcher, tracker, domain)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            _observe(stats, time.perf_counter() - start)
+            current_request.reset(token)
+    return instrumented_run
+
+
+def _wrap_validator(validator, validator_name):
+    # I validatori possono essere sincroni o coroutine: il wrapper mantiene lo stesso tipo
+    if inspect.iscoroutinefunction(validator):
+        @functools.wraps(validator)
+        async def instrumented_validator(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await validator(self, *args, **kwargs)
+            finally:
+                VALIDATOR_DURATION.labels(self.name(), validator_name).observe(time.perf_counter() - start)
+    else:
+        @functools.wraps(validator)
+        def instrumented_validator(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return validator(self, *args, **kwargs)
+            finally:
+                VALIDATOR_DURATION.labels(self.name(), validator_name).observe(time.perf_counter() - start)
+    return instrumented_validator
+
+
+def instrumented(action_class):
+    """Class decorator recording wall time, SQL and HTTP activity of an action.
+
+    Works on plain actions and on form validation actions, whose
+    ``validate_<slot>`` methods are also timed one by one.
+    """
+    action_class.run = _wrap_run(action_class.run)
+
+    for attribute, value in list(vars(action_class).items()):
+        if attribute.startswith("validate_") and callable(value):
+            setattr(action_class, attribute, _wrap_validator(value, attribute))
+
+    return action_class
+
+
+_metrics_server_started = False
+
+
+def start_metrics_server(port=METRICS_PORT, addr=METRICS_ADDR):
+    """Expose the metrics for Prometheus on http://<addr>:<port>/metrics.
+
+    Called by the first instrumented action: the action server imports the
+    actions in its main process too, but only the worker runs them and
+    holds the metrics.
+    """
+    global _metrics_server_started
+    if _metrics_server_started or not port:
+        return False
+    _metrics_server_started = True
+    try:
+        start_http_server(port, addr=addr)
+    except OSError as error:
+        # Ad esempio con più worker o con il ricaricamento automatico delle azioni
+        logger.warning(f"Metrics endpoint not started on {addr}:{port}: {error}")
+        return False
+    logger.info(f"Metrics available on http://{addr}:{port}/metrics")
+    return True
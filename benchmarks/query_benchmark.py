@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from database.models import *
+from database import db_queries, facet_index, name_index
+from database.session import create_database_engine, get_snapshot_url
+from synthetic_catalog import SIZES, catalog_path, generate_catalog, missing_schema, parse_size
+from webhook_load import RESULTS_DIR, git_commit, misspell
+
+# Micro-benchmark di ogni funzione di db_queries (e del post-processing delle
+# raccomandazioni in actions.py) su cataloghi sintetici di dimensioni crescenti.
+# L'esponente di crescita tra la dimensione minima e quella massima indica quali
+# percorsi scalano linearmente con il catalogo:
+#
+#   python benchmarks/query_benchmark.py --sizes 5k 50k 500k
+
+def pick_arguments(session):
+    """Valori realistici per i parametri delle query, presi dal catalogo."""
+    tags = [name for name, in session.query(Tag.name).join(TagLeaderboard, TagLeaderboard.tag_id == Tag.tag_id).order_by(TagLeaderboard.rank).limit(50)]
+    publishers = [name for name, in session.query(Publisher.name).join(PublisherLeaderboard, PublisherLeaderboard.publisher_id == Publisher.publisher_id).order_by(PublisherLeaderboard.rank).limit(200)]
+    games = session.query(Game.app_id, Game.name).order_by(Game.score.desc()).limit(1000).all()
+    rng = random.Random(0)
+    return {
+        "top_tag": tags[0],
+        "tag": tags[min(len(tags) - 1, 19)],  # un genere diffuso ma non il più diffuso
+        "other_tag": tags[min(len(tags) - 1, 29)],
+        "top_publisher": publishers[0],
+        "publisher": publishers[min(len(publishers) - 1, 99)],
+        "game_name": games[len(games) // 2][1],
+        "misspelled_name": misspell(games[len(games) // 2][1]),
+        "app_ids": [app_id for app_id, _ in rng.sample(games, min(50, len(games)))],
+    }
+
+def reset_caches():
+    """Svuota le cache di processo, così ogni misura parte da zero."""
+    db_queries._top_band_cache.clear()
+    name_index._shared_index.clear()
+    facet_index._shared_index.clear()
+
+def recommendation_post_processing(session, args):
+    """Come ActionProvideRecommendation con genere e publisher: candidati per nome e scelta in Python."""
+    from rasa_sdk.executor import CollectingDispatcher
+    from actions.actions import get_games_for_publishers_and_tags, RECOMMENDATION_CANDIDATES
+
+    games = db_queries.get_recommendation_candidates(session, [args["top_publisher"]], [args["tag"]], RECOMMENDATION_CANDIDATES)
+    start = time.perf_counter()
+    get_games_for_publishers_and_tags(games, [args["top_publisher"]], [args["tag"]], CollectingDispatcher())
+    return time.perf_counter() - start
+
+# Nome -> funzione(session, argomenti). Le funzioni che restituiscono un numero
+# misurano da sole solo la parte che interessa.
+CASES = {
+    "get_image_statuses[50]": lambda s, a: db_queries.get_image_statuses(s, a["app_ids"]),
+    "get_name_index (build)": lambda s, a: name_index.get_name_index(s, force=True),
+    "find_games_by_name": lambda s, a: db_queries.find_games_by_name(s, a["misspelled_name"]),
+    "compute_top_publishers": lambda s, a: db_queries.compute_top_publishers(s),
+    "compute_top_tags": lambda s, a: db_queries.compute_top_tags(s),
+    "get_top_publishers": lambda s, a: db_queries.get_top_publishers(s),
+    "get_top_tags": lambda s, a: db_queries.get_top_tags(s),
+    "count_top_publishers": lambda s, a: db_queries.count_top_publishers(s),
+    "count_top_tags": lambda s, a: db_queries.count_top_tags(s),
+    "get_top_game_band (query)": lambda s, a: (db_queries._top_band_cache.clear(), db_queries.get_top_game_band(s))[1],
+    "sample_top_game_ids": lambda s, a: db_queries.sample_top_game_ids(s),
+    "get_games_by_ids[50]": lambda s, a: db_queries.get_games_by_ids(s, a["app_ids"]),
+    "get_top_games_filtered[publisher]": lambda s, a: db_queries.get_top_games_filtered(s, publisher_names=[a["publisher"]]),
+    "get_top_games_filtered[tag]": lambda s, a: db_queries.get_top_games_filtered(s, tag_names=[a["tag"]]),
+    "get_top_games_filtered[tag,limit=5]": lambda s, a: db_queries.get_top_games_filtered(s, tag_names=[a["tag"]], limit=5),
+    "get_top_games_filtered[2 tags+publisher]": lambda s, a: db_queries.get_top_games_filtered(s, [a["top_publisher"]], [a["tag"], a["other_tag"]]),
+    "get_facet_index (build)": lambda s, a: facet_index.get_facet_index(s, force=True),
+    "get_top_games_filtered[tag,facet]": lambda s, a: db_queries.get_top_games_filtered(s, tag_names=[a["tag"]], use_facet_index=True),
+    "get_top_games_filtered[2 tags+publisher,facet]": lambda s, a: db_queries.get_top_games_filtered(s, [a["top_publisher"]], [a["tag"], a["other_tag"]], use_facet_index=True),
+    "get_recommendation_candidates[tag+publisher]": lambda s, a: db_queries.get_recommendation_candidates(s, [a["top_publisher"]], [a["tag"]]),
+    "get_recommendation_candidates[tag+publisher,facet]": lambda s, a: db_queries.get_recommendation_candidates(s, [a["top_publisher"]], [a["tag"]], use_facet_index=True),
+    "get_names_by_game[tags,50]": lambda s, a: db_queries.get_names_by_game(s, a["app_ids"], GameTag, GameTag.tag_id, Tag, Tag.tag_id),
+    "get_game_cards[50]": lambda s, a: db_queries.get_game_cards(s, a["app_ids"]),
+    "get_games_for_publishers_and_tags": recommendation_post_processing,
+}
+
+def time_case(engine, case, args, repeat, budget):
+    """Tempi (in secondi) di una funzione, ognuno con una sessione nuova.
+
+    Se la prima esecuzione supera il budget le ripetizioni vengono ridotte.
+    """
+    timings = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            result = case(session, args)
+            elapsed = time.perf_counter() - start
+        timings.append(result if isinstance(result, float) else elapsed)
+        if sum(timings) > budget:
+            break
+    return timings
+
+def run_size(size, repeat, budget, cases, regenerate=False):
+    path = catalog_path(size)
+    if not regenerate and os.path.exists(path):
+        # Un catalogo generato con uno schema precedente va rigenerato
+        missing = missing_schema(path)
+        if missing:
+            print(f"Il catalogo {path} non ha {', '.join(missing[:5])}{' e altro' if len(missing) > 5 else ''}: va rigenerato")
+            regenerate = True
+    if regenerate or not os.path.exists(path):
+        print(f"Generazione del catalogo {size} in {path}...")
+        generate_catalog(path, parse_size(size))
+
+    engine = create_database_engine(get_snapshot_url(path))
+    reset_caches()
+    with Session(engine) as session:
+        args = pick_arguments(session)
+        # Le cache (indici, fascia dei migliori giochi) vengono costruite una volta,
+        # tranne nei casi che misurano proprio la costruzione
+        db_queries.find_games_by_name(session, args["game_name"])
+        facet_index.get_facet_index(session)
+        db_queries.get_top_game_band(session)
+
+    results = {}
+    for name in cases:
+        timings = time_case(engine, CASES[name], args, repeat, budget)
+        results[name] = {
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "min_ms": round(min(timings) * 1000, 3),
+            "runs": len(timings),
+        }
+        print(f"  {size:>5} {name:48} {results[name]['median_ms']:>10.2f} ms")
+    engine.dispose()
+    return results
+
+def growth_exponent(sizes, results, name):
+    """Esponente k di tempo ~ giochi^k tra la dimensione minima e quella massima."""
+    first, last = sizes[0], sizes[-1]
+    t_first, t_last = results[first][name]["median_ms"], results[last][name]["median_ms"]
+    n_first, n_last = parse_size(first), parse_size(last)
+    if len(sizes) < 2 or t_first <= 0 or n_first == n_last:
+        return None
+    return math.log(t_last / t_first) / math.log(n_last / n_first)
+
+def print_report(sizes, results, cases):
+    header = f"{'function':48}" + "".join(f"{size:>12}" for size in sizes) + f"{'growth':>10}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for name in cases:
+        exponent = growth_exponent(sizes, results, name)
+        # Un esponente vicino a 1 indica un costo proporzionale al catalogo
+        flag = "  linear" if exponent is not None and exponent >= 0.7 else ""
+        line = f"{name:48}" + "".join(f"{results[size][name]['median_ms']:>10.2f}ms" for size in sizes)
+        line += f"{exponent:>10.2f}{flag}" if exponent is not None else f"{'-':>10}"
+        print(line)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Micro-benchmark delle query su cataloghi sintetici.")
+    arg_parser.add_argument("--sizes", nargs="+", default=list(SIZES), help="dimensioni dei cataloghi (5k, 50k, 97k, 500k o numeri)")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--budget", type=float, default=30, help="secondi massimi per funzione e dimensione")
+    arg_parser.add_argument("--case", action="append", choices=list(CASES), help="funzioni da misurare (tutte se omesse)")
+    arg_parser.add_argument("--regenerate", action="store_true", help="rigenera i cataloghi anche se esistono")
+    arg_parser.add_argument("--output", help="file JSON dei risultati (default: benchmarks/results/)")
+    args = arg_parser.parse_args()
+
+    sizes = sorted(args.sizes, key=parse_size)
+    cases = args.case or list(CASES)
+    results = {}
+    for size in sizes:
+        results[size] = run_size(size, args.repeat, args.budget, cases, args.regenerate)
+
+    print_report(sizes, results, cases)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"query_benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump({
+            "benchmark": "query_benchmark",
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "repeat": args.repeat,
+            "sizes": {size: parse_size(size) for size in sizes},
+            "results": results,
+            "growth": {name: growth_exponent(sizes, results, name) for name in cases},
+        }, file, indent=2)
+    print(f"Risultati salvati in {output}")
+
+if __name__ == "__main__":
+    main()
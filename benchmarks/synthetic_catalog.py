@@ -0,0 +1,216 @@
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import itertools
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import *
+from database.db_queries import compute_top_publishers, compute_top_tags
+
+# Catalogo sintetico compatibile con lo schema, per provare le query a dimensioni
+# diverse da quella del dataset reale. Le distribuzioni imitano quelle di Steam:
+# pochi tag, publisher e lingue molto diffusi e una lunga coda di valori rari
+# (legge di Zipf), recensioni con distribuzione log-normale.
+#
+#   python benchmarks/synthetic_catalog.py 50k benchmarks/data/catalog-50k.sqlite
+
+DATA_DIR = os.path.join(project_dir, "benchmarks", "data")
+# 97k: dimensione dell'intero dataset Steam (modalità catalogo completo del seeder)
+SIZES = {"5k": 5_000, "50k": 50_000, "97k": 97_000, "500k": 500_000}
+INSERT_BATCH_SIZE = 10_000
+
+# Cardinalità delle dimensioni: fisse o proporzionali al numero di giochi
+TAG_COUNT = 450
+GENRE_COUNT = 30
+CATEGORY_COUNT = 40
+LANGUAGE_COUNT = 100
+PUBLISHERS_PER_GAME = 0.45
+DEVELOPERS_PER_GAME = 0.5
+
+WORDS = [
+    "Dark", "Lost", "Iron", "Star", "Shadow", "Crystal", "Dragon", "Pixel", "Hollow", "Neon",
+    "Ancient", "Broken", "Silent", "Wild", "Frozen", "Crimson", "Eternal", "Hidden", "Last", "Little",
+    "Kingdom", "Legends", "Quest", "Tales", "Chronicles", "Escape", "Survivor", "Tactics", "Rush", "Saga",
+    "Dungeon", "Galaxy", "Empire", "Island", "Forest", "City", "Knight", "Hunter", "Garden", "Factory",
+]
+OWNER_RANGES = ["0 - 20000", "20000 - 50000", "50000 - 100000", "100000 - 200000", "200000 - 500000",
+                "500000 - 1000000", "1000000 - 2000000", "2000000 - 5000000", "5000000 - 10000000"]
+
+class ZipfSampler:
+    """Estrae indici 0..n-1 con probabilità proporzionale a 1 / (indice + 1) ** exponent."""
+
+    def __init__(self, n, exponent, rng):
+        self.population = range(n)
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+        self.rng = rng
+
+    def sample(self, k):
+        """k indici distinti (meno se la popolazione è più piccola)."""
+        k = min(k, len(self.population))
+        chosen = set()
+        while len(chosen) < k:
+            chosen.update(self.rng.choices(self.population, cum_weights=self.cum_weights, k=k - len(chosen)))
+        return chosen
+
+def game_name(rng, app_id):
+    words = rng.sample(WORDS, rng.choice((1, 2, 2, 3)))
+    name = " ".join(words)
+    # Come su Steam, molti titoli sono seguiti o numerati
+    if rng.random() < 0.3:
+        name += f" {rng.choice(['II', 'III', '2', '3', 'Remastered', 'Deluxe Edition', 'VR'])}"
+    return f"{name} {app_id}" if rng.random() < 0.5 else name
+
+def generate_game(rng, app_id):
+    # Recensioni: la maggior parte dei giochi ne ha poche, pochi ne hanno moltissime
+    reviews = int(rng.lognormvariate(3.0, 2.0))
+    positive = int(reviews * rng.betavariate(7, 2))
+    negative = reviews - positive
+    return {
+        "app_id": app_id,
+        "name": game_name(rng, app_id),
+        "release_date": date(2005, 1, 1) + timedelta(days=rng.randrange(7000)),
+        "estimated_owners": OWNER_RANGES[min(len(OWNER_RANGES) - 1, int(math.log10(reviews + 1)))],
+        "peak_ccu": int(reviews * rng.random() / 10),
+        "required_age": rng.choice((0, 0, 0, 0, 12, 16, 18)),
+        "price": round(rng.choice((0, 0, 4.99, 9.99, 14.99, 19.99, 29.99, 59.99)), 2),
+        "dlc_count": rng.choice((0, 0, 0, 1, 2, 5)),
+        "short_description": " ".join(rng.choices(WORDS, k=30)).lower(),
+        "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{app_id}/header.jpg",
+        "support_windows": True,
+        "support_mac": rng.random() < 0.25,
+        "support_linux": rng.random() < 0.15,
+        "metacritic_score": rng.randint(50, 95) if rng.random() < 0.05 else 0,
+        "positive": positive,
+        "negative": negative,
+        "recommendations": int(positive * rng.random()),
+        "score": compute_game_score(positive, negative),
+    }
+
+def dimension_rows(model, id_name, count):
+    rows = [{id_name: i, "name": f"{model.__name__} {i}"} for i in range(1, count + 1)]
+    if model is Language:
+        for row in rows:
+            row["language"] = row["name"]
+    return rows
+
+def insert_batches(connection, table, rows):
+    """Inserisce le righe di un generatore a blocchi di INSERT_BATCH_SIZE."""
+    total = 0
+    while True:
+        batch = list(itertools.islice(rows, INSERT_BATCH_SIZE))
+        if not batch:
+            return total
+        connection.execute(table.insert(), batch)
+        total += len(batch)
+
+def generate_catalog(path, games, seed=0):
+    """Scrive in path un catalogo SQLite sintetico con il numero di giochi richiesto."""
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    dimensions = {
+        # modello, colonna id, tabella di collegamento, numero di valori, esponente di Zipf, valori per gioco
+        "tags": (Tag, "tag_id", GameTag, TAG_COUNT, 0.8, (5, 20)),
+        "genres": (Genre, "genre_id", GameGenre, GENRE_COUNT, 1.2, (1, 4)),
+        "categories": (Category, "category_id", GameCategory, CATEGORY_COUNT, 1.1, (2, 8)),
+        "publishers": (Publisher, "publisher_id", GamePublisher, max(10, int(games * PUBLISHERS_PER_GAME)), 0.7, (1, 2)),
+        "developers": (Developer, "developer_id", GameDeveloper, max(10, int(games * DEVELOPERS_PER_GAME)), 0.7, (1, 2)),
+        "languages": (Language, "language_id", GameSupportedLanguage, LANGUAGE_COUNT, 1.5, (1, 12)),
+    }
+    samplers = {name: ZipfSampler(count, exponent, rng) for name, (_, _, _, count, exponent, _) in dimensions.items()}
+
+    engine = create_engine(f"sqlite:///{path}")
+    counts = {}
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode = OFF")
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        for table in Base.metadata.sorted_tables:
+            connection.execute(CreateTable(table))
+
+        for model, id_name, _, count, _, _ in dimensions.values():
+            connection.execute(model.__table__.insert(), dimension_rows(model, id_name, count))
+
+        counts["games"] = insert_batches(connection, Game.__table__, (generate_game(rng, app_id) for app_id in range(1, games + 1)))
+
+        for name, (_, id_name, link_model, _, _, (low, high)) in dimensions.items():
+            sampler = samplers[name]
+            links = (
+                {"app_id": app_id, id_name: value + 1}
+                for app_id in range(1, games + 1)
+                for value in sampler.sample(rng.randint(low, high))
+            )
+            counts[link_model.__tablename__] = insert_batches(connection, link_model.__table__, links)
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection)
+
+    # Classifiche materializzate, come dopo il seeding
+    with Session(engine) as session:
+        for leaderboard, id_name, rows in (
+            (TagLeaderboard, "tag_id", compute_top_tags(session)),
+            (PublisherLeaderboard, "publisher_id", compute_top_publishers(session)),
+        ):
+            session.bulk_insert_mappings(leaderboard, [
+                {"rank": rank, id_name: dimension_id, "game_count": game_count}
+                for rank, (dimension_id, game_count) in enumerate(rows, 1)
+            ])
+        session.commit()
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return counts
+
+def missing_schema(path):
+    """Tabelle e colonne dei modelli assenti dal catalogo in path (lista vuota se è aggiornato)."""
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        inspector = inspect(engine)
+        tables = set(inspector.get_table_names())
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                missing.append(table.name)
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            missing += [f"{table.name}.{column.name}" for column in table.columns if column.name not in columns]
+        return missing
+    finally:
+        engine.dispose()
+
+def catalog_path(size):
+    return os.path.join(DATA_DIR, f"catalog-{size}.sqlite")
+
+def parse_size(size):
+    """Accetta gli alias 5k/50k/97k/500k o un numero di giochi."""
+    return SIZES[size] if size in SIZES else int(size)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Genera un catalogo sintetico in un file SQLite.")
+    arg_parser.add_argument("size", help="numero di giochi o alias (5k, 50k, 97k, 500k)")
+    arg_parser.add_argument("path", nargs="?", help="file da creare (default: benchmarks/data/catalog-<size>.sqlite)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    path = args.path or catalog_path(args.size)
+    start = time.perf_counter()
+    counts = generate_catalog(path, parse_size(args.size), args.seed)
+    for table_name, rows in counts.items():
+        print(f"{table_name}: {rows} righe")
+    print(f"Catalogo scritto in {path} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+from ruamel.yaml import YAML
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import *
+from database.session import create_database_engine, get_snapshot_url
+from sqlalchemy.orm import Session
+
+# Carico di prova per l'action server: costruisce le richieste al webhook di Rasa
+# per ogni azione personalizzata, le invia con la concorrenza richiesta e salva
+# latenze (p50/p95/p99) e throughput per azione in un file JSON confrontabile.
+#
+#   python -m rasa_sdk --actions actions   (con CATALOG_SQLITE_PATH=catalog.sqlite)
+#   python benchmarks/webhook_load.py --catalog catalog.sqlite --concurrency 16
+
+DEFAULT_URL = "http://localhost:5055/webhook"
+RESULTS_DIR = os.path.join(project_dir, "benchmarks", "results")
+PERCENTILES = (50, 95, 99)
+
+def load_domain(path=os.path.join(project_dir, "domain.yml")):
+    with open(path, encoding="utf-8") as file:
+        return YAML(typ="safe").load(file)
+
+def load_catalog_names(catalog_path, limit=50):
+    """Nomi reali da usare negli slot: generi e publisher più diffusi, giochi più popolari."""
+    engine = create_database_engine(get_snapshot_url(catalog_path))
+    with Session(engine) as session:
+        tags = [name for name, in session.query(Tag.name).join(TagLeaderboard, TagLeaderboard.tag_id == Tag.tag_id).order_by(TagLeaderboard.rank).limit(limit)]
+        publishers = [name for name, in session.query(Publisher.name).join(PublisherLeaderboard, PublisherLeaderboard.publisher_id == Publisher.publisher_id).order_by(PublisherLeaderboard.rank).limit(limit)]
+        games = [name for name, in session.query(Game.name).order_by(Game.score.desc()).limit(limit * 10)]
+    engine.dispose()
+    return {"tags": tags, "publishers": publishers, "games": games}
+
+def misspell(name):
+    """Nome con due caratteri scambiati, per la ricerca approssimata."""
+    if len(name) < 4:
+        return name
+    i = random.randrange(1, len(name) - 2)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+def build_tracker(sender_id, slots, events=(), active_loop=None):
+    return {
+        "sender_id": sender_id,
+        "slots": slots,
+        "latest_message": {"text": "", "intent": {}, "entities": []},
+        "latest_event_time": time.time(),
+        "followup_action": None,
+        "paused": False,
+        "events": [{"event": "user", "text": "", "parse_data": {}}] + list(events),
+        "latest_input_channel": None,
+        "active_loop": {"name": active_loop} if active_loop else {},
+        "latest_action_name": "action_listen",
+    }
+
+def build_payload(domain, next_action, slots, events=(), active_loop=None):
+    sender_id = f"bench-{random.getrandbits(32):08x}"
+    return {
+        "next_action": next_action,
+        "sender_id": sender_id,
+        "tracker": build_tracker(sender_id, slots, events, active_loop),
+        "domain": domain,
+        "version": "3.1",
+    }
+
+def empty_slots(domain):
+    return {slot_name: None for slot_name in domain.get("slots", {})}
+
+def slot_event(name, value):
+    return {"event": "slot", "name": name, "value": value}
+
+# Scenario -> azione chiamata
+SCENARIO_ACTIONS = {
+    "game_info": "action_provide_game_info",
+    "game_info_fuzzy": "action_provide_game_info",
+    "publisher_games": "action_provide_publisher_games",
+    "genres": "action_provide_genres",
+    "publishers": "action_provide_publishers",
+    "recommendation_no_filters": "action_provide_recommendation",
+    "recommendation_genres": "action_provide_recommendation",
+    "recommendation_publishers": "action_provide_recommendation",
+    "recommendation_genres_publishers": "action_provide_recommendation",
+    "validate_genres_filter": "validate_detailed_recommendation_form",
+    "validate_genres": "validate_detailed_recommendation_form",
+    "validate_publishers_filter": "validate_detailed_recommendation_form",
+    "validate_publishers": "validate_detailed_recommendation_form",
+    "resume_form": "action_resume_form",
+    "reset_slots": "action_reset_slots",
+}
+SCENARIOS = list(SCENARIO_ACTIONS)
+
+def build_scenario(scenario, domain, names):
+    """Restituisce (azione, payload) per uno scenario, con valori diversi a ogni chiamata."""
+    slots = empty_slots(domain)
+    genres = random.sample(names["tags"], min(len(names["tags"]), random.randint(1, 3)))
+    publishers = random.sample(names["publishers"], min(len(names["publishers"]), random.randint(1, 2)))
+    game = random.choice(names["games"])
+    form = "detailed_recommendation_form"
+
+    if scenario == "game_info":
+        slots["game"] = game
+        return "action_provide_game_info", build_payload(domain, "action_provide_game_info", slots)
+    if scenario == "game_info_fuzzy":
+        slots["game"] = misspell(game)
+        return "action_provide_game_info", build_payload(domain, "action_provide_game_info", slots)
+    if scenario == "publisher_games":
+        slots["publishers"] = publishers[:1]
+        return "action_provide_publisher_games", build_payload(domain, "action_provide_publisher_games", slots)
+    if scenario == "genres":
+        return "action_provide_genres", build_payload(domain, "action_provide_genres", slots)
+    if scenario == "publishers":
+        return "action_provide_publishers", build_payload(domain, "action_provide_publishers", slots)
+
+    if scenario.startswith("recommendation_"):
+        use_genres = scenario in ("recommendation_genres", "recommendation_genres_publishers")
+        use_publishers = scenario in ("recommendation_publishers", "recommendation_genres_publishers")
+        slots.update(
+            genres=genres if use_genres else ["NO"],
+            genres_filter=use_genres,
+            publishers=publishers if use_publishers else ["NO"],
+            publishers_filter=use_publishers,
+        )
+        return "action_provide_recommendation", build_payload(domain, "action_provide_recommendation", slots)
+
+    if scenario.startswith("validate_"):
+        # Il validatore controlla gli slot impostati dopo l'ultimo messaggio dell'utente
+        slot_name = scenario[len("validate_"):]
+        value = {"genres_filter": True, "genres": genres, "publishers_filter": True, "publishers": publishers}[slot_name]
+        slots.update(genres_filter=True, publishers_filter=True, requested_slot=slot_name)
+        slots[slot_name] = value
+        payload = build_payload(domain, "validate_detailed_recommendation_form", slots, [slot_event(slot_name, value)], form)
+        return "validate_detailed_recommendation_form", payload
+
+    if scenario == "resume_form":
+        return "action_resume_form", build_payload(domain, "action_resume_form", slots)
+    if scenario == "reset_slots":
+        return "action_reset_slots", build_payload(domain, "action_reset_slots", slots)
+
+    raise ValueError(f"Scenario sconosciuto: {scenario}")
+
+def percentile(sorted_values, p):
+    """Percentile con il metodo nearest-rank."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+async def run_load(url, scenarios, domain, names, requests_count, concurrency, warmup, timeout):
+    """Invia requests_count richieste (più warmup non misurate) con al più concurrency in volo."""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+        async def worker(queue, record):
+            while True:
+                try:
+                    scenario = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                _, payload = build_scenario(scenario, domain, names)
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload)
+                    failed = response.status_code != 200
+                except httpx.HTTPError:
+                    failed = True
+                elapsed = time.perf_counter() - start
+                if not record:
+                    continue
+                if failed:
+                    errors[scenario] += 1
+                else:
+                    latencies[scenario].append(elapsed)
+
+        async def run_batch(count, record):
+            queue = asyncio.Queue()
+            for i in range(count):
+                queue.put_nowait(scenarios[i % len(scenarios)])
+            await asyncio.gather(*(worker(queue, record) for _ in range(concurrency)))
+
+        # Le richieste di riscaldamento non vengono misurate
+        await run_batch(warmup, record=False)
+        start = time.perf_counter()
+        await run_batch(requests_count, record=True)
+        duration = time.perf_counter() - start
+
+    return latencies, errors, duration
+
+def summarize(latencies, errors, duration):
+    """Statistiche per scenario e complessive (latenze in millisecondi)."""
+    def stats(values, error_count):
+        values = sorted(values)
+        summary = {
+            "requests": len(values) + error_count,
+            "errors": error_count,
+            "throughput": round(len(values) / duration, 2) if duration else None,
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else None,
+        }
+        for p in PERCENTILES:
+            value = percentile(values, p)
+            summary[f"p{p}_ms"] = round(value * 1000, 2) if value is not None else None
+        return summary
+
+    scenarios = {
+        scenario: dict(action=SCENARIO_ACTIONS[scenario], **stats(latencies.get(scenario, []), errors.get(scenario, 0)))
+        for scenario in sorted(set(latencies) | set(errors))
+    }
+    all_latencies = [value for values in latencies.values() for value in values]
+    return scenarios, stats(all_latencies, sum(errors.values()))
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(scenarios, total, baseline=None):
+    header = f"{'scenario':34} {'req':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, summary in list(scenarios.items()) + [("TOTAL", total)]:
+        line = (f"{name:34} {summary['requests']:>6} {summary['errors']:>4} {summary['throughput'] or 0:>8.1f} "
+                f"{summary['p50_ms'] or 0:>8.1f} {summary['p95_ms'] or 0:>8.1f} {summary['p99_ms'] or 0:>8.1f}")
+        previous = (baseline or {}).get("scenarios", {}).get(name) if name != "TOTAL" else (baseline or {}).get("total")
+        if previous and previous.get("p95_ms") and summary["p95_ms"]:
+            line += f"   p95 {(summary['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%"
+        print(line)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark di carico del webhook dell'action server.")
+    arg_parser.add_argument("--url", default=DEFAULT_URL)
+    arg_parser.add_argument("--catalog", default=os.getenv("CATALOG_SQLITE_PATH"),
+                            help="copia SQLite del catalogo da cui prendere i nomi (vedi database/snapshot.py)")
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--requests", type=int, default=1500, help="richieste misurate in totale")
+    arg_parser.add_argument("--warmup", type=int, default=50)
+    arg_parser.add_argument("--timeout", type=float, default=30)
+    arg_parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="scenari da eseguire (tutti se omessi)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="file JSON dei risultati (default: benchmarks/results/)")
+    arg_parser.add_argument("--compare", help="risultati precedenti con cui confrontare il p95")
+    args = arg_parser.parse_args()
+
+    if not args.catalog:
+        sys.exit("Indica la copia del catalogo con --catalog o CATALOG_SQLITE_PATH")
+
+    random.seed(args.seed)
+    domain = load_domain()
+    names = load_catalog_names(args.catalog)
+    scenarios = args.scenario or SCENARIOS
+
+    latencies, errors, duration = asyncio.run(run_load(
+        args.url, scenarios, domain, names, args.requests, args.concurrency, args.warmup, args.timeout,
+    ))
+    scenario_stats, total = summarize(latencies, errors, duration)
+
+    results = {
+        "benchmark": "webhook_load",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "url": args.url,
+        "catalog": os.path.basename(args.catalog),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "duration_s": round(duration, 3),
+        "total": total,
+        "scenarios": scenario_stats,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_report(scenario_stats, total, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"webhook_load-{datetime.now():%Y%m%d-%H%M%S}-c{args.concurrency}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Risultati salvati in {output}")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
-from dotenv import load_dotenv
 import os
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -13,18 +12,9 @@ import pymysql
 # Installa pymysql come MySQLdb per Alembic
 pymysql.install_as_MySQLdb()
 
-# Carica le variabili d'ambiente dal file .env
-load_dotenv()
-
-# Ottieni le variabili dal .env
-db_user = os.getenv("DB_USER")
-db_password = os.getenv("DB_PASSWORD")
-db_host = os.getenv("DB_HOST")
-db_name = os.getenv("DB_NAME")
-db_driver = os.getenv("DB_DRIVER")
-
-# Costruisci l'URL del database
-database_url = f"{db_driver}://{db_user}:{db_password}@{db_host}/{db_name}"
+# Costruisci l'URL del database dalle variabili del .env
+from database.session import get_database_url
+database_url = get_database_url()
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,56 @@
+"""game score
+
+Revision ID: b7d41c2e9a60
+Revises: 3ea978739375
+Create Date: 2026-10-18 10:41:17.204958
+
+"""
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c2e9a60'
+down_revision: Union[str, None] = '3ea978739375'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def compute_game_score(positive, negative):
+    # Copia di database.models.compute_game_score: la migrazione non deve cambiare se cambia il modello
+    positive = positive or 0
+    negative = negative or 0
+    if positive + negative == 0:
+        return 0.0
+    return (positive / (positive + negative)) * math.log(positive + negative + 1)
+
+
+def upgrade() -> None:
+    op.add_column('games', sa.Column('score', sa.Float(), nullable=True))
+    op.create_index('idx_game_score', 'games', [sa.text('score DESC')], unique=False)
+
+    # Calcola il punteggio in Python per avere la stessa formula su ogni backend
+    games = sa.table('games', sa.column('app_id'), sa.column('positive'), sa.column('negative'), sa.column('score'))
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(games.c.app_id, games.c.positive, games.c.negative)).fetchall()
+    update = (
+        games.update()
+        .where(games.c.app_id == sa.bindparam('b_app_id'))
+        .values(score=sa.bindparam('b_score'))
+    )
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(update, [
+            {'b_app_id': app_id, 'b_score': compute_game_score(positive, negative)}
+            for app_id, positive, negative in rows[start:start + BATCH_SIZE]
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_game_score', table_name='games')
+    op.drop_column('games', 'score')
@@ -0,0 +1,131 @@
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import *
+from database import db_queries
+from database.facet_index import get_facet_index_async
+from database.name_index import get_name_index_async
+from database.game_cards import get_stored_game_cards as get_stored_game_cards_sync
+
+# Versioni asincrone delle query usate dalle azioni.
+#
+# Le query semplici sono riscritte con select() ed eseguite sul driver asincrono;
+# quelle che usano la fascia dei migliori giochi o le schede salvate riutilizzano le
+# funzioni sincrone tramite AsyncSession.run_sync, che le esegue sulla stessa
+# connessione asincrona senza bloccare l'event loop durante l'I/O. Gli indici in
+# memoria passano da get_*_index_async, che ne coordina la costruzione.
+#
+# Le relazioni caricate in modo lazy non sono disponibili fuori da run_sync:
+# i giochi restituiti hanno già publishers e tags caricati.
+
+GAME_RELATIONS = (selectinload(Game.publishers), selectinload(Game.tags))
+
+async def get_image_statuses(session: AsyncSession, app_ids):
+    result = await session.execute(select(ImageStatus).where(ImageStatus.app_id.in_(app_ids)))
+    return result.scalars().all()
+
+async def find_games_by_name(session: AsyncSession, game_name: str, limit=5):
+    """Ricerca approssimata sull'indice a trigrammi: lista di (app_id, nome, somiglianza)."""
+    index = await get_name_index_async(session)
+    return index.search(game_name, limit=limit)
+
+async def get_top_publishers(session: AsyncSession, limit=10):
+    result = await session.execute(
+        select(Publisher, PublisherLeaderboard.game_count)
+        .join(PublisherLeaderboard, PublisherLeaderboard.publisher_id == Publisher.publisher_id)
+        .where(PublisherLeaderboard.rank <= limit)
+        .order_by(PublisherLeaderboard.rank)
+    )
+    return result.all()
+
+async def get_top_tags(session: AsyncSession, limit=10):
+    result = await session.execute(
+        select(Tag, TagLeaderboard.game_count)
+        .join(TagLeaderboard, TagLeaderboard.tag_id == Tag.tag_id)
+        .where(TagLeaderboard.rank <= limit)
+        .order_by(TagLeaderboard.rank)
+    )
+    return result.all()
+
+async def count_top_publishers(session: AsyncSession):
+    return (await session.scalar(select(func.max(PublisherLeaderboard.rank)))) or 0
+
+async def count_top_tags(session: AsyncSession):
+    return (await session.scalar(select(func.max(TagLeaderboard.rank)))) or 0
+
+async def sample_top_game_ids(session: AsyncSession, k=5, top_n=1000, weighted=False):
+    """Estrae k app_id a caso tra i top_n giochi (la fascia è in cache, vedi db_queries)."""
+    return await session.run_sync(db_queries.sample_top_game_ids, k, top_n, weighted)
+
+async def get_games_by_ids(session: AsyncSession, app_ids):
+    """Carica i giochi per chiave primaria, nell'ordine degli app_id richiesti."""
+    result = await session.execute(select(Game).options(*GAME_RELATIONS).where(Game.app_id.in_(app_ids)))
+    games = {game.app_id: game for game in result.scalars()}
+    return [games[app_id] for app_id in app_ids if app_id in games]
+
+async def get_top_games_filtered(session: AsyncSession, publisher_names=None, tag_names=None, limit=None,
+                                 genre_names=None, developer_names=None, category_names=None, use_facet_index=False):
+    if use_facet_index:
+        filters = {
+            'publishers': publisher_names,
+            'tags': tag_names,
+            'genres': genre_names,
+            'developers': developer_names,
+            'categories': category_names,
+        }
+        index = await get_facet_index_async(session)
+        app_ids = index.top_ids(filters, limit)
+        return await get_games_by_ids(session, app_ids)
+
+    query = select(Game).options(*GAME_RELATIONS)
+
+    # Stessi join della versione sincrona
+    if publisher_names:
+        query = query.join(Game.publishers).where(
+            or_(*[Publisher.name.ilike(publisher_name) for publisher_name in publisher_names])
+        )
+
+    if tag_names:
+        query = query.join(Game.tags).where(
+            or_(*[Tag.name.ilike(tag_name) for tag_name in tag_names])
+        )
+
+    if genre_names:
+        query = query.join(Game.genres).where(
+            or_(*[Genre.name.ilike(genre_name) for genre_name in genre_names])
+        )
+
+    if developer_names:
+        query = query.join(Game.developers).where(
+            or_(*[Developer.name.ilike(developer_name) for developer_name in developer_names])
+        )
+
+    if category_names:
+        query = query.join(Game.categories).where(
+            or_(*[Category.name.ilike(category_name) for category_name in category_names])
+        )
+
+    query = query.order_by(Game.score.desc())
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    # Come session.query(Game), un gioco trovato da più join compare una sola volta
+    result = await session.execute(query)
+    return result.scalars().unique().all()
+
+async def get_recommendation_candidates(session: AsyncSession, publisher_names=None, tag_names=None, per_name_limit=200, use_facet_index=False):
+    """I per_name_limit giochi più popolari per ogni nome richiesto (vedi db_queries.get_recommendation_candidates)."""
+    candidates = {}
+    for publisher_name in publisher_names or []:
+        for game in await get_top_games_filtered(session, [publisher_name], tag_names, per_name_limit, use_facet_index=use_facet_index):
+            candidates.setdefault(game.app_id, game)
+    for tag_name in tag_names or []:
+        for game in await get_top_games_filtered(session, publisher_names, [tag_name], per_name_limit, use_facet_index=use_facet_index):
+            candidates.setdefault(game.app_id, game)
+    return list(candidates.values())
+
+async def get_stored_game_cards(session: AsyncSession, app_ids):
+    """Schede formattate dei giochi, nell'ordine richiesto (vedi game_cards.get_stored_game_cards)."""
+    return await session.run_sync(get_stored_game_cards_sync, list(app_ids))
@@ -0,0 +1,122 @@
+import json
+import heapq
+import hashlib
+
+# Lettura incrementale di games.json (un unico oggetto {app_id: gioco, ...}).
+#
+# Il file del catalogo completo occupa alcuni GB: invece di json.load i giochi
+# vengono decodificati uno alla volta da un buffer di dimensione limitata, con
+# JSONDecoder.raw_decode della libreria standard.
+
+READ_CHUNK_SIZE = 1 << 20  # caratteri letti dal file a ogni ricarica del buffer
+WHITESPACE = " \t\n\r"
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+_decoder = json.JSONDecoder()
+
+class GameStream:
+    """Itera le coppie (app_id, gioco) dell'oggetto JSON di primo livello di un file."""
+
+    def __init__(self, file, chunk_size=READ_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Scarta la parte già letta del buffer e aggiunge un blocco dal file."""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def _skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            self._fill()
+
+    def _expect(self, *characters):
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] not in characters:
+            found = self.buffer[self.pos:self.pos + 20] or "fine del file"
+            raise ValueError(f"games.json: atteso {' o '.join(characters)}, trovato {found!r}")
+        self.pos += 1
+        return self.buffer[self.pos - 1]
+
+    def _decode(self):
+        """Decodifica il valore JSON successivo, ricaricando il buffer finché non è completo."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # Un numero seguito dalla fine del buffer o da un carattere che potrebbe continuarlo
+                # è forse troncato ("1" di "12", "1." di "1.5e3"): si ricarica il buffer e si riprova
+                if (end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARACTERS) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def __iter__(self):
+        self._expect("{")
+        self._skip_whitespace()
+        if self.buffer.startswith("}", self.pos):
+            return
+        while True:
+            app_id = self._decode()
+            self._expect(":")
+            yield app_id, self._decode()
+            if self._expect(",", "}") == "}":
+                return
+
+def iter_games(filepath, chunk_size=READ_CHUNK_SIZE):
+    """Coppie (app_id, gioco) di games.json, lette senza caricare tutto il file."""
+    with open(filepath, "r", encoding="utf-8") as file:
+        yield from GameStream(file, chunk_size)
+
+def name_hash(name):
+    """Impronta a 64 bit di un nome normalizzato: più compatta della stringa nel set dei nomi già visti."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+def unique_games(games):
+    """Scarta i giochi senza nome o con un nome già incontrato (senza distinguere maiuscole)."""
+    seen_names = set()
+    for app_id, game in games:
+        name = (game.get('name') or '').strip().lower()
+        if not name:
+            continue
+        key = name_hash(name)
+        if key not in seen_names:
+            seen_names.add(key)
+            yield app_id, game
+
+def top_games(games, limit, key):
+    """I limit giochi con key più alto, dal migliore; a parità vale l'ordine del file.
+
+    Con limit None i giochi sono restituiti tutti, nell'ordine del file, senza tenerli in memoria.
+    """
+    if limit is None:
+        yield from games
+        return
+    if limit <= 0:
+        return
+
+    # Min-heap di al più limit elementi: in cima il peggiore tra quelli tenuti.
+    # -position fa sì che, a parità di valore, venga scartato il gioco letto per ultimo.
+    heap = []
+    for position, (app_id, game) in enumerate(games):
+        entry = (key(game), -position, app_id, game)
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    for _, _, app_id, game in sorted(heap, key=lambda entry: entry[:2], reverse=True):
+        yield app_id, game
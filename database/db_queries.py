@@ -1,51 +1,118 @@
+import time
+import random
+import itertools
+from array import array
+from collections import namedtuple, defaultdict
+
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from database.models import *
 from sqlalchemy import func, case
 from sqlalchemy.orm import joinedload
+from database.facet_index import get_facet_index
+from database.name_index import get_name_index
 
-def get_all_tag_names(session: Session):
-    return session.query(Tag.name).all()
-
-def get_all_publisher_names(session: Session):
-    return session.query(Publisher.name).all()
+def get_image_statuses(session: Session, app_ids):
+    return session.query(ImageStatus).filter(ImageStatus.app_id.in_(app_ids)).all()
 
-def get_game_by_name(session: Session, game_name: str):
-    return session.query(Game).filter(Game.name.ilike(game_name)).first()
+def find_games_by_name(session: Session, game_name: str, limit=5):
+    """Ricerca approssimata sull'indice a trigrammi: lista di (app_id, nome, somiglianza)."""
+    return get_name_index(session).search(game_name, limit=limit)
 
-def get_top_publishers(session: Session):
+def compute_top_publishers(session: Session):
     return (
-    session.query(Publisher, func.count(GamePublisher.app_id).label('game_count'))
-    .join(GamePublisher, GamePublisher.publisher_id == Publisher.publisher_id)
-    .group_by(Publisher.publisher_id)
-    .order_by(func.count(GamePublisher.app_id).desc())
+    session.query(GamePublisher.publisher_id, func.count(GamePublisher.app_id).label('game_count'))
+    .group_by(GamePublisher.publisher_id)
+    .order_by(func.count(GamePublisher.app_id).desc(), GamePublisher.publisher_id)
     .all()
 )
 
-def get_top_tags(session: Session):
+def compute_top_tags(session: Session):
     return (
-    session.query(Tag, func.count(GameTag.app_id).label('game_count'))
-    .join(GameTag, GameTag.tag_id == Tag.tag_id)
-    .group_by(Tag.tag_id)
-    .order_by(func.count(GameTag.app_id).desc())
+    session.query(GameTag.tag_id, func.count(GameTag.app_id).label('game_count'))
+    .group_by(GameTag.tag_id)
+    .order_by(func.count(GameTag.app_id).desc(), GameTag.tag_id)
     .all()
 )
 
-def get_top_games(session, limit=5):
-    score_expr = (
-        (func.coalesce(Game.positive, 0) / func.coalesce(Game.positive + Game.negative, 1))
-        * func.log(func.coalesce(Game.positive - Game.negative, 0) + 1)
-    )
-
-    query = session.query(Game)
+def get_top_publishers(session: Session, limit=10):
+    return (
+    session.query(Publisher, PublisherLeaderboard.game_count)
+    .join(PublisherLeaderboard, PublisherLeaderboard.publisher_id == Publisher.publisher_id)
+    .filter(PublisherLeaderboard.rank <= limit)
+    .order_by(PublisherLeaderboard.rank)
+    .all()
+)
 
-    return query.order_by(score_expr.desc()).limit(limit).all()
+def get_top_tags(session: Session, limit=10):
+    return (
+    session.query(Tag, TagLeaderboard.game_count)
+    .join(TagLeaderboard, TagLeaderboard.tag_id == Tag.tag_id)
+    .filter(TagLeaderboard.rank <= limit)
+    .order_by(TagLeaderboard.rank)
+    .all()
+)
 
-def get_top_games_filtered(session, publisher_names=None, tag_names=None, limit=None):
-    score_expr = (
-        (func.coalesce(Game.positive, 0) / func.coalesce(Game.positive + Game.negative, 1))
-        * func.log(func.coalesce(Game.positive - Game.negative, 0) + 1)
-    )
+# Il rank è la chiave primaria delle classifiche: il massimo è il numero totale
+def count_top_publishers(session: Session):
+    return session.query(func.max(PublisherLeaderboard.rank)).scalar() or 0
+
+def count_top_tags(session: Session):
+    return session.query(func.max(TagLeaderboard.rank)).scalar() or 0
+
+# Fascia dei giochi più popolari usata per il campionamento, ricaricata ogni TOP_BAND_TTL secondi
+TOP_BAND_TTL = 300
+_top_band_cache = {}  # top_n -> (caricata_il, app_ids, pesi cumulativi, giochi con peso positivo)
+
+def get_top_game_band(session, top_n=1000):
+    """Restituisce gli app_id dei top_n giochi, i loro punteggi cumulativi (come array compatti)
+    e il numero di giochi con punteggio positivo."""
+    cached = _top_band_cache.get(top_n)
+    if cached and time.monotonic() - cached[0] < TOP_BAND_TTL:
+        return cached[1:]
+
+    rows = session.query(Game.app_id, Game.score).order_by(Game.score.desc()).limit(top_n).all()
+    app_ids = array('i', (app_id for app_id, _ in rows))
+    cum_weights = array('d', itertools.accumulate(max(score or 0.0, 0.0) for _, score in rows))
+    weighted_count = sum(1 for _, score in rows if score and score > 0)
+
+    _top_band_cache[top_n] = (time.monotonic(), app_ids, cum_weights, weighted_count)
+    return app_ids, cum_weights, weighted_count
+
+def sample_top_game_ids(session, k=5, top_n=1000, weighted=False):
+    """Estrae k app_id a caso tra i top_n giochi, opzionalmente pesati per punteggio."""
+    app_ids, cum_weights, weighted_count = get_top_game_band(session, top_n)
+
+    if not weighted or weighted_count == 0:
+        return [app_ids[i] for i in random.sample(range(len(app_ids)), min(k, len(app_ids)))]
+
+    # I giochi con punteggio nullo non possono essere estratti
+    k = min(k, weighted_count)
+
+    # Estrazione pesata senza ripetizioni: si scartano gli indici già estratti
+    chosen = {}
+    while len(chosen) < k:
+        for i in random.choices(range(len(app_ids)), cum_weights=cum_weights, k=k - len(chosen)):
+            chosen.setdefault(i, None)
+    return [app_ids[i] for i in itertools.islice(chosen, k)]
+
+def get_games_by_ids(session, app_ids):
+    """Carica i giochi per chiave primaria, nell'ordine degli app_id richiesti."""
+    games = {game.app_id: game for game in session.query(Game).filter(Game.app_id.in_(app_ids))}
+    return [games[app_id] for app_id in app_ids if app_id in games]
+
+def get_top_games_filtered(session, publisher_names=None, tag_names=None, limit=None,
+                           genre_names=None, developer_names=None, category_names=None, use_facet_index=False):
+    # Con l'indice in memoria i filtri non richiedono join: si caricano solo i giochi trovati
+    if use_facet_index:
+        filters = {
+            'publishers': publisher_names,
+            'tags': tag_names,
+            'genres': genre_names,
+            'developers': developer_names,
+            'categories': category_names,
+        }
+        return get_games_by_ids(session, get_facet_index(session).top_ids(filters, limit))
 
     query = session.query(Game)
 
@@ -61,7 +128,23 @@ def get_top_games_filtered(session, publisher_names=None, tag_names=None, limit=
             or_(*[Tag.name.ilike(tag_name) for tag_name in tag_names])
         )
 
-    query = query.order_by(score_expr.desc())
+    # Aggiungi i join con Genre, Developer e Category se richiesti
+    if genre_names:
+        query = query.join(Game.genres).filter(
+            or_(*[Genre.name.ilike(genre_name) for genre_name in genre_names])
+        )
+
+    if developer_names:
+        query = query.join(Game.developers).filter(
+            or_(*[Developer.name.ilike(developer_name) for developer_name in developer_names])
+        )
+
+    if category_names:
+        query = query.join(Game.categories).filter(
+            or_(*[Category.name.ilike(category_name) for category_name in category_names])
+        )
+
+    query = query.order_by(Game.score.desc())
 
     # Aggiungi il limite solo se limit è specificato
     if limit is not None:
@@ -69,3 +152,62 @@ def get_top_games_filtered(session, publisher_names=None, tag_names=None, limit=
 
     return query.all()
 
+def get_recommendation_candidates(session, publisher_names=None, tag_names=None, per_name_limit=200, use_facet_index=False):
+    """Giochi tra cui scegliere le raccomandazioni: i per_name_limit più popolari per ogni nome richiesto.
+
+    Come get_top_games_filtered(session, publisher_names, tag_names), ma ogni
+    publisher e ogni genere contribuisce al più per_name_limit giochi: il costo
+    non cresce con il catalogo e ogni nome con almeno un gioco resta rappresentato.
+    """
+    candidates = {}
+    for publisher_name in publisher_names or []:
+        for game in get_top_games_filtered(session, [publisher_name], tag_names, per_name_limit, use_facet_index=use_facet_index):
+            candidates.setdefault(game.app_id, game)
+    for tag_name in tag_names or []:
+        for game in get_top_games_filtered(session, publisher_names, [tag_name], per_name_limit, use_facet_index=use_facet_index):
+            candidates.setdefault(game.app_id, game)
+    return list(candidates.values())
+
+# Oggetto di sola lettura con i soli dati mostrati nella scheda di un gioco
+GameCard = namedtuple('GameCard', [
+    'app_id', 'name', 'release_date', 'price', 'short_description', 'required_age',
+    'estimated_owners', 'reviews', 'metacritic_score', 'header_image',
+    'support_windows', 'support_mac', 'support_linux',
+    'publishers', 'developers', 'supported_languages',
+])
+
+GAME_CARD_COLUMNS = [
+    Game.app_id, Game.name, Game.release_date, Game.price, Game.short_description, Game.required_age,
+    Game.estimated_owners, Game.reviews, Game.metacritic_score, Game.header_image,
+    Game.support_windows, Game.support_mac, Game.support_linux,
+]
+
+def get_names_by_game(session, app_ids, link_model, link_id_column, model, id_column):
+    """Nomi collegati a ciascun gioco per una relazione molti a molti, con una sola query."""
+    names = defaultdict(list)
+    rows = (
+        session.query(link_model.app_id, model.name)
+        .join(model, id_column == link_id_column)
+        .filter(link_model.app_id.in_(app_ids))
+        .order_by(link_model.app_id, id_column)
+    )
+    for app_id, name in rows:
+        names[app_id].append(name)
+    return names
+
+def get_game_cards(session, app_ids):
+    """Carica le schede dei giochi, nell'ordine degli app_id richiesti, con 4 query in tutto."""
+    app_ids = list(app_ids)
+    if not app_ids:
+        return []
+
+    rows = session.query(*GAME_CARD_COLUMNS).filter(Game.app_id.in_(app_ids)).all()
+    publishers = get_names_by_game(session, app_ids, GamePublisher, GamePublisher.publisher_id, Publisher, Publisher.publisher_id)
+    developers = get_names_by_game(session, app_ids, GameDeveloper, GameDeveloper.developer_id, Developer, Developer.developer_id)
+    languages = get_names_by_game(session, app_ids, GameSupportedLanguage, GameSupportedLanguage.language_id, Language, Language.language_id)
+
+    cards = {
+        row.app_id: GameCard(*row, tuple(publishers[row.app_id]), tuple(developers[row.app_id]), tuple(languages[row.app_id]))
+        for row in rows
+    }
+    return [cards[app_id] for app_id in app_ids if app_id in cards]
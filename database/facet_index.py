@@ -0,0 +1,126 @@
+import time
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from database.models import *
+from database.vocabulary import normalize_name
+from database.shared_index import SharedIndex
+
+# Dimensioni filtrabili: modello, id, tabella di collegamento, id nella tabella di collegamento
+FACET_DIMENSIONS = {
+    'tags': (Tag, Tag.tag_id, GameTag, GameTag.tag_id),
+    'publishers': (Publisher, Publisher.publisher_id, GamePublisher, GamePublisher.publisher_id),
+    'genres': (Genre, Genre.genre_id, GameGenre, GameGenre.genre_id),
+    'developers': (Developer, Developer.developer_id, GameDeveloper, GameDeveloper.developer_id),
+    'categories': (Category, Category.category_id, GameCategory, GameCategory.category_id),
+}
+
+# Ogni quanti secondi si controlla se il catalogo è cambiato e l'indice va ricostruito
+FACET_INDEX_TTL = 600
+
+def union_sorted(lists):
+    """Unione di liste ordinate, senza duplicati."""
+    if len(lists) == 1:
+        return lists[0]
+    result = array('i')
+    for position in heapq.merge(*lists):
+        if not result or result[-1] != position:
+            result.append(position)
+    return result
+
+def intersect_sorted(first, second):
+    """Intersezione di due liste ordinate: ricerca binaria della lista più corta nella più lunga."""
+    if len(first) > len(second):
+        first, second = second, first
+    result = array('i')
+    low = 0
+    for position in first:
+        low = bisect_left(second, position, low)
+        if low == len(second):
+            break
+        if second[low] == position:
+            result.append(position)
+    return result
+
+class FacetIndex:
+    """Indice in memoria dei filtri sui giochi (posting list per valore di ogni dimensione).
+
+    I giochi sono numerati per popolarità (posizione 0 = punteggio più alto),
+    quindi ogni posting list ordinata è già in ordine di popolarità e i primi
+    k risultati di un filtro sono i k giochi migliori. I nomi in OR nella
+    stessa dimensione vengono uniti, le dimensioni diverse intersecate.
+    """
+
+    def __init__(self, app_ids, names, postings):
+        self.app_ids = app_ids  # posizione -> app_id
+        self.names = names  # dimensione -> nome normalizzato -> [id]
+        self.postings = postings  # dimensione -> id -> array('i') di posizioni ordinate
+        self.built_at = time.monotonic()
+        self.signature = None  # firma del catalogo al momento della costruzione
+
+    @classmethod
+    def build(cls, session):
+        app_ids = array('i', (app_id for app_id, in session.query(Game.app_id).order_by(Game.score.desc(), Game.app_id)))
+        positions = {app_id: position for position, app_id in enumerate(app_ids)}
+
+        names = {}
+        postings = {}
+        for dimension, (model, id_column, link_model, link_id_column) in FACET_DIMENSIONS.items():
+            dimension_names = defaultdict(list)
+            for value_id, name in session.query(id_column, model.name):
+                if name:
+                    dimension_names[normalize_name(name)].append(value_id)
+            names[dimension] = dict(dimension_names)
+
+            dimension_postings = defaultdict(list)
+            for app_id, value_id in session.query(link_model.app_id, link_id_column):
+                if app_id in positions:
+                    dimension_postings[value_id].append(positions[app_id])
+            postings[dimension] = {value_id: array('i', sorted(posting)) for value_id, posting in dimension_postings.items()}
+
+        return cls(app_ids, names, postings)
+
+    def match(self, filters):
+        """Restituisce le posizioni (ordinate) dei giochi che soddisfano i filtri.
+
+        filters mappa una dimensione alla lista di nomi accettati; le
+        dimensioni senza nomi non filtrano. Senza filtri restituisce None.
+        """
+        result = None
+        for dimension, value_names in filters.items():
+            if not value_names:
+                continue
+
+            dimension_postings = self.postings[dimension]
+            lists = [
+                dimension_postings[value_id]
+                for name in value_names
+                for value_id in self.names[dimension].get(normalize_name(name), [])
+                if value_id in dimension_postings
+            ]
+            matched = union_sorted(lists) if lists else array('i')
+
+            result = matched if result is None else intersect_sorted(result, matched)
+            if not result:
+                break
+
+        return result
+
+    def top_ids(self, filters, k=None):
+        """I k app_id più popolari che soddisfano i filtri (tutti se k è None)."""
+        positions = self.match(filters)
+        if positions is None:
+            return list(self.app_ids[:k])
+        return [self.app_ids[position] for position in positions[:k]]
+
+_shared_index = SharedIndex(FacetIndex.build, FACET_INDEX_TTL)
+
+def get_facet_index(session, force=False):
+    """Restituisce l'indice condiviso dal processo, costruendolo o ricostruendolo se scaduto."""
+    return _shared_index.get(session, force)
+
+async def get_facet_index_async(session, force=False):
+    """Come get_facet_index, con una AsyncSession: una sola costruzione anche tra richieste concorrenti."""
+    return await _shared_index.get_async(session, force)
@@ -0,0 +1,182 @@
+import os
+import sys
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import *
+from database.db_queries import get_game_cards
+from database.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 500
+CARD_FIELDS = ['card_text', 'publishers_text', 'developers_text', 'languages_text', 'os_support_text', 'header_image', 'source_hash']
+
+def format_names(names):
+
+    all_names = ", ".join(names)
+
+    if ", " in all_names:
+        all_names = all_names.rsplit(", ", 1)
+        all_names = " and ".join(all_names)
+
+    return all_names
+
+def format_os_support(game):
+    # Recupero del supporto per i sistemi operativi
+    os_support = []
+    if game.support_windows:
+        os_support.append("Windows")
+    if game.support_mac:
+        os_support.append("Mac")
+    if game.support_linux:
+        os_support.append("Linux")
+
+    return ', '.join(os_support) if os_support else "No operating system support listed."
+
+def build_stored_card(game):
+    """Formatta la scheda di un GameCard e la restituisce come StoredGameCard (non salvata)."""
+    # Recupero dei nomi degli editori e degli sviluppatori
+    pub_names = format_names(game.publishers)
+    dev_names = format_names(game.developers)
+
+    # Recupero della data di rilascio
+    release_date = game.release_date.strftime("%B %d, %Y") if game.release_date else "N/A"
+
+    # Recupero dei dettagli aggiuntivi
+    price = f"${game.price:.2f}" if game.price else "Price not available"
+    short_description = game.short_description if game.short_description else "No description available"
+    required_age = game.required_age if game.required_age else "Not available"
+    estimated_owners = game.estimated_owners if game.estimated_owners else "Not available"
+    reviews = game.reviews if game.reviews else "No reviews available"
+    metacritic_score = f"Metacritic score: {game.metacritic_score}" if game.metacritic_score else "No Metacritic score available"
+    supported_languages = ', '.join(game.supported_languages) if game.supported_languages else "No supported languages listed"
+    os_support_text = format_os_support(game)
+
+    # Formattazione della risposta con informazioni aggiuntive
+    card_text = (
+        f"🎮 {game.name} was released on {release_date} by {pub_names}\n"
+        f"💰 It costs {price} and was developed by {dev_names}\n"
+        f"🔞 Required Age: {required_age}.\n"
+        f"📝 Description: {short_description}\n"
+        f"👥 Estimated owners: {estimated_owners}\n"
+        f"⭐ Reviews: {reviews}\n"
+        f"🎯 {metacritic_score}\n"
+        f"🌐 Languages supported: {supported_languages}\n"
+        f"💻 Operating System Support: {os_support_text}"
+    )
+
+    stored_card = StoredGameCard(
+        app_id=game.app_id,
+        card_text=card_text,
+        publishers_text=pub_names,
+        developers_text=dev_names,
+        languages_text=', '.join(game.supported_languages),
+        os_support_text=os_support_text,
+        header_image=game.header_image,
+    )
+    stored_card.source_hash = card_source_hash(stored_card)
+    return stored_card
+
+def card_source_hash(stored_card):
+    """Hash dei campi salvati di una scheda, per riconoscere le schede cambiate."""
+    fields = [getattr(stored_card, field) for field in CARD_FIELDS if field != 'source_hash']
+    return hashlib.sha256("\x1f".join(field or "" for field in fields).encode("utf-8")).hexdigest()
+
+def get_stored_game_cards(session, app_ids):
+    """Legge le schede già formattate per chiave primaria, nell'ordine richiesto.
+
+    Le schede non ancora salvate vengono formattate al volo dai dati del catalogo.
+    """
+    app_ids = list(app_ids)
+    if not app_ids:
+        return []
+
+    cards = {card.app_id: card for card in session.query(StoredGameCard).filter(StoredGameCard.app_id.in_(app_ids))}
+
+    missing = [app_id for app_id in app_ids if app_id not in cards]
+    if missing:
+        warn_if_cards_missing(session, len(missing))
+        for game in get_game_cards(session, missing):
+            cards[game.app_id] = build_stored_card(game)
+
+    return [cards[app_id] for app_id in app_ids if app_id in cards]
+
+_empty_table_checked = False
+
+def warn_if_cards_missing(session, missing):
+    """Segnala le schede formattate al volo; la prima volta controlla anche se la tabella è vuota."""
+    global _empty_table_checked
+    if not _empty_table_checked:
+        _empty_table_checked = True
+        if session.query(StoredGameCard.app_id).first() is None:
+            logger.warning("La tabella game_cards è vuota: tutte le schede vengono formattate al volo. "
+                           "Popolala con: python database/game_cards.py")
+            return
+    logger.debug("%d schede non salvate formattate al volo", missing)
+
+def rebuild_game_cards(session, app_ids=None):
+    """Ricostruisce le schede salvate, riscrivendo solo quelle il cui contenuto è cambiato.
+
+    Senza app_ids ricostruisce tutto il catalogo ed elimina le schede dei giochi
+    che non esistono più. Restituisce (schede riscritte, schede eliminate).
+    """
+    full_rebuild = app_ids is None
+    if full_rebuild:
+        app_ids = [app_id for app_id, in session.query(Game.app_id).order_by(Game.app_id)]
+    app_ids = list(app_ids)
+
+    written = 0
+    for start in range(0, len(app_ids), REBUILD_BATCH_SIZE):
+        batch = app_ids[start:start + REBUILD_BATCH_SIZE]
+        stored_cards = {
+            card.app_id: card
+            for card in session.query(StoredGameCard).filter(StoredGameCard.app_id.in_(batch))
+        }
+
+        for game in get_game_cards(session, batch):
+            new_card = build_stored_card(game)
+            stored_card = stored_cards.get(game.app_id)
+            if stored_card is not None and stored_card.source_hash == new_card.source_hash:
+                continue
+
+            if stored_card is None:
+                stored_card = StoredGameCard(app_id=game.app_id)
+                session.add(stored_card)
+            for field in CARD_FIELDS:
+                setattr(stored_card, field, getattr(new_card, field))
+            stored_card.updated_at = datetime.utcnow()
+            written += 1
+
+        session.commit()
+
+    deleted = 0
+    if full_rebuild:
+        deleted = (
+            session.query(StoredGameCard)
+            .filter(~StoredGameCard.app_id.in_(session.query(Game.app_id)))
+            .delete(synchronize_session=False)
+        )
+        session.commit()
+
+    return written, deleted
+
+def run_rebuild():
+    """Ricostruisci le schede dei giochi."""
+    arg_parser = argparse.ArgumentParser(description="Ricostruisce la tabella game_cards.")
+    arg_parser.add_argument("app_ids", nargs="*", type=int, help="giochi da ricostruire (tutti se omessi)")
+    args = arg_parser.parse_args()
+
+    with session_scope() as session:
+        written, deleted = rebuild_game_cards(session, args.app_ids or None)
+        print(f"Schede riscritte: {written}, eliminate: {deleted}")
+
+# Esegui la ricostruzione
+if __name__ == "__main__":
+    run_rebuild()
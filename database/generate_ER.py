@@ -1,21 +1,12 @@
 from sqlalchemy.orm import configure_mappers
 from sqlalchemy_schemadisplay import create_schema_graph
-from sqlalchemy import MetaData, create_engine
+from sqlalchemy import MetaData
 from models import Base 
+from session import get_engine
 import os
 
-# Ottieni le variabili dal .env
-db_user = os.getenv("DB_USER")
-db_password = os.getenv("DB_PASSWORD")
-db_host = os.getenv("DB_HOST")
-db_name = os.getenv("DB_NAME")
-db_driver = os.getenv("DB_DRIVER")
-
-# Costruisci l'URL del database
-database_url = f"{db_driver}://{db_user}:{db_password}@{db_host}/{db_name}"
-
 # Crea l'engine con il collegamento al database
-engine = create_engine(database_url)
+engine = get_engine()
 
 metadata = Base.metadata
 # Configura i modelli per la mappatura
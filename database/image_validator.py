@@ -0,0 +1,135 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import httpx
+import requests
+import validators
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import *
+from database.session import session_scope
+
+# Carica le variabili di ambiente dal file .env
+load_dotenv()
+
+# Dopo quanto tempo uno stato salvato va verificato di nuovo
+IMAGE_STATUS_TTL_HOURS = float(os.getenv("IMAGE_STATUS_TTL_HOURS", 24 * 7))
+# Numero massimo di richieste HEAD contemporanee durante la validazione offline
+IMAGE_VALIDATION_WORKERS = int(os.getenv("IMAGE_VALIDATION_WORKERS", 16))
+IMAGE_VALIDATION_TIMEOUT = 10
+COMMIT_EVERY = 500
+
+def create_http_session(pool_size):
+    """Crea una sessione HTTP con un pool di connessioni della dimensione indicata."""
+    http_session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    http_session.mount("http://", adapter)
+    http_session.mount("https://", adapter)
+    return http_session
+
+def create_async_http_client(pool_size):
+    """Crea un client HTTP asincrono con al più pool_size connessioni contemporanee."""
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return httpx.AsyncClient(limits=limits, follow_redirects=True)
+
+def check_header_image(http_session, header_image, timeout):
+    """Restituisce (status, content_type) per l'URL di un'immagine.
+
+    Lo status è uno tra image, not_image, error e invalid.
+    """
+    # Controlla se l'URL è valido
+    if not header_image or not validators.url(header_image):
+        return "invalid", None
+
+    try:
+        # Fai una richiesta HEAD per ottenere il tipo di contenuto, seguendo le redirezioni
+        response = http_session.head(header_image, allow_redirects=True, timeout=timeout)
+        content_type = response.headers.get('Content-Type', '').lower()
+    except requests.exceptions.RequestException:
+        # Gestisce eventuali errori durante la richiesta
+        return "error", None
+
+    # Verifica se il Content-Type è di un'immagine
+    return ("image" if 'image' in content_type else "not_image"), content_type
+
+async def check_header_image_async(http_client, header_image, timeout):
+    """Versione asincrona di check_header_image, con un client httpx."""
+    if not header_image or not validators.url(header_image):
+        return "invalid", None
+
+    try:
+        response = await http_client.head(header_image, timeout=timeout)
+        content_type = response.headers.get('Content-Type', '').lower()
+    except httpx.HTTPError:
+        return "error", None
+
+    return ("image" if 'image' in content_type else "not_image"), content_type
+
+def is_status_fresh(image_status, header_image, now=None):
+    """Verifica che uno stato salvato si riferisca all'URL attuale e non sia scaduto."""
+    if image_status is None or image_status.checked_at is None:
+        return False
+    # Gli errori di rete sono temporanei: non vengono considerati validi
+    if image_status.status == "error" or image_status.url != header_image:
+        return False
+    now = now or datetime.utcnow()
+    return now - image_status.checked_at < timedelta(hours=IMAGE_STATUS_TTL_HOURS)
+
+def validate_catalog_images(session, workers=IMAGE_VALIDATION_WORKERS, only_stale=True):
+    """Verifica le immagini di copertina del catalogo e salva il loro stato."""
+    games = session.query(Game.app_id, Game.header_image).all()
+    stored_statuses = {image_status.app_id: image_status for image_status in session.query(ImageStatus)}
+
+    now = datetime.utcnow()
+    to_check = [
+        (app_id, header_image) for app_id, header_image in games
+        if not only_stale or not is_status_fresh(stored_statuses.get(app_id), header_image, now)
+    ]
+    print(f"Immagini da verificare: {len(to_check)} su {len(games)}")
+
+    http_session = create_http_session(workers)
+
+    def check(item):
+        app_id, header_image = item
+        return app_id, header_image, *check_header_image(http_session, header_image, IMAGE_VALIDATION_TIMEOUT)
+
+    # Il pool di thread limita il numero di richieste contemporanee
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for checked, (app_id, header_image, status, content_type) in enumerate(executor.map(check, to_check), 1):
+            image_status = stored_statuses.get(app_id)
+            if image_status is None:
+                image_status = ImageStatus(app_id=app_id)
+                session.add(image_status)
+
+            image_status.url = header_image
+            image_status.status = status
+            image_status.content_type = content_type
+            image_status.checked_at = datetime.utcnow()
+
+            if checked % COMMIT_EVERY == 0:
+                session.commit()
+                print(f"Immagini verificate: {checked}/{len(to_check)}")
+
+    session.commit()
+    return len(to_check)
+
+def run_validation():
+    """Esegui la validazione offline delle immagini."""
+    arg_parser = argparse.ArgumentParser(description="Valida le immagini di copertina dei giochi nel catalogo.")
+    arg_parser.add_argument("--workers", type=int, default=IMAGE_VALIDATION_WORKERS, help="richieste HEAD contemporanee")
+    arg_parser.add_argument("--all", action="store_true", help="verifica anche le immagini con uno stato ancora valido")
+    args = arg_parser.parse_args()
+
+    with session_scope() as session:
+        validate_catalog_images(session, workers=args.workers, only_stale=not args.all)
+
+# Esegui la validazione
+if __name__ == "__main__":
+    run_validation()
@@ -1,9 +1,19 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date, Text, Boolean, DECIMAL, ForeignKey, Index
+import math
+
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Text, Boolean, Float, DECIMAL, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+def compute_game_score(positive, negative):
+    """Punteggio di popolarità: quota di recensioni positive pesata con log(recensioni + 1)."""
+    positive = positive or 0
+    negative = negative or 0
+    if positive + negative == 0:
+        return 0.0
+    return (positive / (positive + negative)) * math.log(positive + negative + 1)
+
 # Modello per la tabella dei giochi (Games)
 class Game(Base):
     __tablename__ = 'games'
@@ -39,10 +49,15 @@ class Game(Base):
     average_playtime_2weeks = Column(Integer)
     median_playtime = Column(Integer)
     median_playtime_2weeks = Column(Integer)
+    score = Column(Float)  # Calcolato dal seeder con compute_game_score
+    steam_app_id = Column(Integer, unique=True, index=True)  # Chiave del gioco in games.json, usata dalla sincronizzazione
+    source_hash = Column(String(64))  # Hash dei dati normalizzati: la sincronizzazione riscrive solo i giochi cambiati
+    updated_at = Column(DateTime)  # Ultima scrittura del seeder: segnala agli indici in memoria un gioco cambiato
 
     # Relazioni molti a molti
     developers = relationship('Developer', secondary='game_developers')
     genres = relationship('Genre', secondary='game_genres')
+    categories = relationship('Category', secondary='game_categories')
     publishers = relationship('Publisher', secondary='game_publishers')
     tags = relationship('Tag', secondary='game_tags')
     
@@ -52,6 +67,18 @@ class Game(Base):
 
 Index('idx_game_price', Game.price)
 Index('idx_game_positive_negative', Game.positive, Game.negative)
+Index('idx_game_score', Game.score.desc())  # Le classifiche dei giochi leggono l'indice in ordine
+Index('idx_game_updated_at', Game.updated_at)  # Letto dalla firma del catalogo (shared_index.catalog_signature)
+
+# Modello per lo stato delle immagini di copertina (Header images), aggiornato offline
+class ImageStatus(Base):
+    __tablename__ = 'image_statuses'
+
+    app_id = Column(Integer, ForeignKey('games.app_id'), primary_key=True)
+    url = Column(String(500))  # URL verificato: se cambia, lo stato non è più valido
+    status = Column(String(20))  # image, not_image, error o invalid
+    content_type = Column(String(255))
+    checked_at = Column(DateTime, index=True)  # Indice per trovare gli stati scaduti
 
 class Language(Base):
     __tablename__ = 'languages'
@@ -170,7 +197,7 @@ class GameCategory(Base):
     category_id = Column(Integer, ForeignKey('categories.category_id'), primary_key=True)
 
 # Indici per la tabella di relazione molti a molti tra giochi e generi
-Index('idx_game_genre', GameCategory.app_id, GameCategory.category_id)
+Index('idx_game_category', GameCategory.app_id, GameCategory.category_id)
 Index('idx_game_category_app_id', GameCategory.app_id)
 Index('idx_game_category_category_id', GameCategory.category_id)
 
@@ -209,4 +236,47 @@ class GameTag(Base):
 # Indici per la tabella di relazione molti a molti tra giochi e tag
 Index('idx_game_tag', GameTag.app_id, GameTag.tag_id)
 Index('idx_game_tag_app_id', GameTag.app_id)
-Index('idx_game_tag_tag_id', GameTag.tag_id)
\ No newline at end of file
+Index('idx_game_tag_tag_id', GameTag.tag_id)
+
+# Classifiche materializzate di tag e publisher per numero di giochi, aggiornate dal seeder
+class TagLeaderboard(Base):
+    __tablename__ = 'tag_leaderboard'
+
+    rank = Column(Integer, primary_key=True, autoincrement=False)  # 1 = tag con più giochi
+    tag_id = Column(Integer, ForeignKey('tags.tag_id'), index=True)
+    game_count = Column(Integer)
+    tag = relationship('Tag')
+
+class PublisherLeaderboard(Base):
+    __tablename__ = 'publisher_leaderboard'
+
+    rank = Column(Integer, primary_key=True, autoincrement=False)  # 1 = publisher con più giochi
+    publisher_id = Column(Integer, ForeignKey('publishers.publisher_id'), index=True)
+    game_count = Column(Integer)
+    publisher = relationship('Publisher')
+
+
+# Schede dei giochi già formattate, ricostruite dal seeder o da database/game_cards.py
+class StoredGameCard(Base):
+    __tablename__ = 'game_cards'
+
+    app_id = Column(Integer, ForeignKey('games.app_id'), primary_key=True)
+    card_text = Column(Text)
+    publishers_text = Column(Text)
+    developers_text = Column(Text)
+    languages_text = Column(Text)
+    os_support_text = Column(String(255))
+    header_image = Column(String(500))
+    source_hash = Column(String(64))  # Hash dei dati della scheda: si riscrive solo se cambia
+    updated_at = Column(DateTime)
+
+
+# Avanzamento di un seeding, salvato nella stessa transazione di ogni blocco: un seeding interrotto riprende da qui
+class SeedCheckpoint(Base):
+    __tablename__ = 'seed_checkpoints'
+
+    source = Column(String(500), primary_key=True)  # dataset letto e numero di giochi richiesti
+    position = Column(Integer)  # giochi normalizzati già scritti (o scartati per errore)
+    last_source_id = Column(String(64))  # chiave in games.json dell'ultimo gioco scritto, per riconoscere un dataset cambiato
+    inserted_games = Column(Integer)
+    updated_at = Column(DateTime)
@@ -0,0 +1,93 @@
+import re
+import time
+import heapq
+import unicodedata
+from array import array
+from collections import defaultdict
+
+from database.models import *
+from database.shared_index import SharedIndex
+
+# Ogni quanti secondi si controlla se il catalogo è cambiato e l'indice va ricostruito
+NAME_INDEX_TTL = 600
+
+def normalize_game_name(name):
+    """Normalizza il nome di un gioco: senza accenti, ™/®, punteggiatura e spazi ripetuti."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    name = re.sub(r"[®™©]", "", name).lower()
+    name = re.sub(r"[^a-z0-9]+", " ", name)
+    return " ".join(name.split())
+
+def trigrams(name):
+    """Trigrammi di un nome normalizzato, con spazi di riempimento agli estremi."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Indice a trigrammi dei nomi dei giochi per la ricerca approssimata.
+
+    Ogni trigramma punta agli app_id dei nomi che lo contengono; la
+    somiglianza di un candidato è il coefficiente di Dice tra i trigrammi
+    della ricerca e quelli del nome.
+    """
+
+    def __init__(self, games):
+        self.names = {}  # app_id -> nome originale
+        self.ranks = {}  # app_id -> posizione per popolarità, usata a parità di somiglianza
+        self.trigram_counts = {}  # app_id -> numero di trigrammi del nome
+        self.exact = defaultdict(list)  # nome normalizzato -> [app_id]
+        postings = defaultdict(list)
+
+        for rank, (app_id, name) in enumerate(games):
+            normalized = normalize_game_name(name)
+            if not normalized:
+                continue
+            name_trigrams = trigrams(normalized)
+            self.names[app_id] = name
+            self.ranks[app_id] = rank
+            self.trigram_counts[app_id] = len(name_trigrams)
+            self.exact[normalized].append(app_id)
+            for trigram in name_trigrams:
+                postings[trigram].append(app_id)
+
+        self.postings = {trigram: array('i', app_ids) for trigram, app_ids in postings.items()}
+        self.built_at = time.monotonic()
+        self.signature = None  # firma del catalogo al momento della costruzione
+
+    @classmethod
+    def build(cls, session):
+        return cls(session.query(Game.app_id, Game.name).order_by(Game.score.desc(), Game.app_id))
+
+    def search(self, query, limit=5, min_score=0.3):
+        """Restituisce fino a limit tuple (app_id, nome, somiglianza), dalla più simile.
+
+        Una corrispondenza esatta del nome normalizzato ha somiglianza 1.
+        """
+        normalized = normalize_game_name(query)
+        if not normalized:
+            return []
+
+        query_trigrams = trigrams(normalized)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for app_id in self.postings.get(trigram, ()):
+                shared[app_id] += 1
+
+        exact = set(self.exact.get(normalized, ()))
+        scored = (
+            (1.0 if app_id in exact else 2 * count / (len(query_trigrams) + self.trigram_counts[app_id]), -self.ranks[app_id], app_id)
+            for app_id, count in shared.items()
+        )
+        best = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+        return [(app_id, self.names[app_id], score) for score, _, app_id in best]
+
+_shared_index = SharedIndex(TrigramIndex.build, NAME_INDEX_TTL)
+
+def get_name_index(session, force=False):
+    """Restituisce l'indice condiviso dal processo, costruendolo o ricostruendolo se scaduto."""
+    return _shared_index.get(session, force)
+
+async def get_name_index_async(session, force=False):
+    """Come get_name_index, con una AsyncSession: una sola costruzione anche tra richieste concorrenti."""
+    return await _shared_index.get_async(session, force)
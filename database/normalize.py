@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import hashlib
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dateutil import parser
+
+from database.models import compute_game_score
+
+# Normalizzazione dei giochi di games.json in righe pronte per il database.
+#
+# Il lavoro per gioco (pulizia dei valori, controllo del nome, parsing delle date,
+# filtro sull'inglese) non dipende dal database: normalize_games lo distribuisce
+# su un pool di processi, mentre un solo processo assegna gli id e scrive.
+# La lettura di games.json e la scelta dei giochi (seeders.normalized_games)
+# restano invece nel processo principale, su un solo core.
+
+# Processi di normalizzazione (0 o 1: tutto nel processo del seeder)
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", os.cpu_count() or 1))
+# Giochi inviati a un processo per volta
+NORMALIZE_BATCH_SIZE = 200
+# Blocchi in lavorazione per processo: limita la memoria se la scrittura è più lenta
+NORMALIZE_QUEUE_DEPTH = 2
+
+DIMENSION_FIELDS = ['developers', 'genres', 'categories', 'publishers', 'supported_languages', 'full_audio_languages']
+# Colonne di games copiate (con safe_get) dal campo di games.json indicato
+GAME_FIELDS = {
+    'estimated_owners': 'estimated_owners',
+    'peak_ccu': 'peak_ccu',
+    'required_age': 'required_age',
+    'price': 'price',
+    'dlc_count': 'dlc_count',
+    'detailed_description': 'detailed_description',
+    'short_description': 'short_description',
+    'reviews': 'reviews',
+    'header_image': 'header_image',
+    'website': 'website',
+    'support_url': 'support_url',
+    'support_email': 'support_email',
+    'support_windows': 'windows',
+    'support_mac': 'mac',
+    'support_linux': 'linux',
+    'metacritic_score': 'metacritic_score',
+    'metacritic_url': 'metacritic_url',
+    'user_score': 'user_score',
+    'positive': 'positive',
+    'negative': 'negative',
+    'score_rank': 'score_rank',
+    'achievements': 'achievements',
+    'recommendations': 'recommendations',
+    'notes': 'notes',
+    'average_playtime': 'average_playtime_forever',
+    'average_playtime_2weeks': 'average_playtime_2weeks',
+    'median_playtime': 'median_playtime_forever',
+    'median_playtime_2weeks': 'median_playtime_2weeks',
+}
+# Regex che permette solo caratteri latini, numeri e spazi
+VALID_NAME_PATTERN = r"^[a-zA-Z0-9\s!\"#$%&'()*+,\-./:;<=>?@[\\\]^_`{|}~®™]*$"
+# Le descrizioni più lunghe non entrano in una colonna TEXT di MySQL
+MAX_DESCRIPTION_BYTES = 65535
+# Parti mancanti delle date incomplete
+RELEASE_DATE_DEFAULT = datetime(1900, 1, 1)
+
+def safe_get(value):
+    """Restituisce None o NaN per valori mancanti o vuoti."""
+    if isinstance(value, str) and value.strip() == '':
+        return None  # Sostituisce stringhe vuote con None
+    elif isinstance(value, (int, float)) and (value is None or value == ''):
+        return float('nan')  # Sostituisce i valori numerici mancanti con NaN
+    return value
+
+def is_valid_game_name(name):
+    """Verifica che il nome del gioco contenga solo caratteri latini, numeri e spazi."""
+    if name is None:
+        return False
+    return bool(re.match(VALID_NAME_PATTERN, name))
+
+def parse_release_date(release_date):
+    """Converte la data del dataset ("Oct 21, 2008") in un oggetto date."""
+    release_date = release_date.replace(',', '')  # Rimuove la virgola
+    try:
+        # Tenta di fare il parsing con il formato specifico
+        return datetime.strptime(release_date, "%b %d %Y").date()
+    except ValueError:
+        # Se fallisce, usa il parser di dateutil. Giorno e mese mancanti ("Oct 2015", "2015")
+        # valgono 1: il default di dateutil è la data di oggi, che cambierebbe source_hash ogni giorno
+        return parser.parse(release_date, default=RELEASE_DATE_DEFAULT).date()
+
+def build_game_row(game):
+    """Riga della tabella games per un gioco, o None se non supporta l'inglese o il nome non è valido."""
+
+    # Controlla se l'inglese è nelle lingue supportate
+    supported_languages = game.get('supported_languages', [])
+    if 'English' not in supported_languages:
+        return None  # Salta il gioco se non supporta l'inglese
+
+    detailed_description = game.get('detailed_description') or ''
+    if len(detailed_description.encode('utf-8')) > MAX_DESCRIPTION_BYTES:
+        return None
+
+    # Verifica che il nome del gioco contenga solo caratteri validi
+    game_name = safe_get(game.get('name'))
+    if not is_valid_game_name(game_name):
+        print(f"Nome del gioco '{game_name}' non valido (contenuto non latino). Salto il gioco.")
+        return None  # Salta il gioco se il nome non è valido
+
+    release_date = safe_get(game.get('release_date'))
+
+    game_row = {column: safe_get(game.get(field)) for column, field in GAME_FIELDS.items()}
+    game_row['name'] = re.sub(r"[®™]", "", game_name)
+    game_row['release_date'] = parse_release_date(release_date) if release_date else None
+    game_row['price'] = as_price(game_row['price'])
+    game_row['score'] = compute_game_score(game_row['positive'], game_row['negative'])
+    return game_row
+
+def normalize_game(source_id, game):
+    """Un gioco di games.json come dati semplici (dizionari e liste), o None se il gioco è scartato.
+
+    Gli id non sono ancora assegnati: li decide il processo che scrive nel database.
+    """
+    game_row = build_game_row(game)
+    if game_row is None:
+        return None
+
+    normalized = {
+        'source_id': source_id,
+        'game': game_row,
+        # Pacchetti con i loro subpacchetti
+        'packages': [
+            (
+                {'title': safe_get(package.get('title')), 'description': safe_get(package.get('description'))},
+                [
+                    {
+                        'title': safe_get(subpackage.get('title')),
+                        'description': safe_get(subpackage.get('description')),
+                        'price': as_price(safe_get(subpackage.get('price'))),
+                    }
+                    for subpackage in package.get('subpackages', [])
+                ],
+            )
+            for package in game.get('packages', [])
+        ],
+        'movies': [safe_get(movie) for movie in game.get('movies', [])],
+        'screenshots': [safe_get(screenshot) for screenshot in game.get('screenshots', [])],
+        # Tag con il numero di voti
+        'tags': list(game['tags'].items()) if isinstance(game.get('tags'), dict) else [],
+    }
+    for field in DIMENSION_FIELDS:
+        normalized[field] = list(game.get(field, []))
+
+    game_row['steam_app_id'] = steam_app_id(source_id)
+    game_row['source_hash'] = content_hash(normalized)
+    return normalized
+
+def steam_app_id(source_id):
+    """La chiave di games.json come intero, se è numerica."""
+    return int(source_id) if str(source_id).isdecimal() else None
+
+def as_price(value):
+    # In games.json i prezzi interi (0) non hanno decimali: come float l'hash non dipende dalla sorgente
+    return float(value) if isinstance(value, int) and not isinstance(value, bool) else value
+
+def content_hash(normalized):
+    """Hash di tutto ciò che il seeder scrive per un gioco (riga, pacchetti, media, collegamenti)."""
+    content = json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def normalize_batch(batch):
+    return [normalize_game(source_id, game) for source_id, game in batch]
+
+def normalize_games(games, workers=SEED_WORKERS, batch_size=NORMALIZE_BATCH_SIZE):
+    """Normalizza le coppie (chiave, gioco) in parallelo e le restituisce nell'ordine di arrivo.
+
+    I giochi scartati sono omessi. Al massimo NORMALIZE_QUEUE_DEPTH blocchi per
+    processo sono in lavorazione o in attesa di essere scritti.
+    """
+    games = iter(games)
+    batches = iter(lambda: list(itertools.islice(games, batch_size)), [])
+
+    if workers <= 1:
+        for batch in batches:
+            yield from filter(None, normalize_batch(batch))
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(executor.submit(normalize_batch, batch))
+            if len(in_flight) >= workers * NORMALIZE_QUEUE_DEPTH:
+                yield from filter(None, in_flight.popleft().result())
+        while in_flight:
+            yield from filter(None, in_flight.popleft().result())
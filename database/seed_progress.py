@@ -0,0 +1,89 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Avanzamento del seeding: tempi per fase e giochi al secondo, per blocco e in totale.
+#
+# Le fasi sono quelle di un blocco del seeder: lettura (lettura e normalizzazione
+# dei giochi, compresa l'attesa dei processi), dimensioni (id di dimensioni,
+# pacchetti e collegamenti assegnati in memoria), inserimento (INSERT e UPDATE del
+# blocco, con gli eventuali SAVEPOINT) e commit. Con un file di metriche ogni
+# blocco viene aggiunto anche come riga JSON, scritta subito su disco.
+
+STAGES = ['lettura', 'dimensioni', 'inserimento', 'commit']
+
+_END = object()
+
+class SeedProgress:
+    """Cronometra le fasi del seeding e ne stampa il resoconto."""
+
+    def __init__(self, metrics_path=None):
+        self.metrics_file = open(metrics_path, "a", encoding="utf-8") if metrics_path else None
+        self.start = self.chunk_start = time.perf_counter()
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.chunk = dict.fromkeys(STAGES, 0.0)
+        self.games = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.chunk[name] += time.perf_counter() - start
+
+    def timed(self, iterable, name):
+        """Gli elementi di iterable, con il tempo di attesa di ognuno attribuito alla fase name."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            yield item
+
+    def end_chunk(self, games, **fields):
+        """Chiude il blocco di games giochi; restituisce il testo del resoconto (velocità e tempi per fase)."""
+        now = time.perf_counter()
+        elapsed = now - self.chunk_start
+        self.chunk_start = now
+        self.games += games
+        for name, seconds in self.chunk.items():
+            self.totals[name] += seconds
+        chunk, self.chunk = self.chunk, dict.fromkeys(STAGES, 0.0)
+
+        self.write_metrics('chunk', games=games, elapsed_s=elapsed, stages=chunk, **fields)
+        return f"{rate(games, elapsed):.0f} giochi/s; {format_stages(chunk)}"
+
+    def summary(self, **fields):
+        """Resoconto finale: giochi al secondo e tempi per fase dell'intera esecuzione."""
+        elapsed = time.perf_counter() - self.start
+        self.write_metrics('summary', games=self.games, elapsed_s=elapsed, stages=self.totals, **fields)
+        return (f"{self.games} giochi in {elapsed:.1f}s ({rate(self.games, elapsed):.0f} giochi/s); "
+                f"{format_stages(self.totals)}")
+
+    def write_metrics(self, record, elapsed_s, stages, **fields):
+        if self.metrics_file is None:
+            return
+        games = fields.get('games', 0)
+        self.metrics_file.write(json.dumps({
+            'record': record,
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            **fields,
+            'elapsed_s': round(elapsed_s, 4),
+            'games_per_s': round(rate(games, elapsed_s), 1),
+            'stages_s': {name: round(seconds, 4) for name, seconds in stages.items()},
+        }) + "\n")
+        self.metrics_file.flush()
+
+    def close(self):
+        if self.metrics_file is not None:
+            self.metrics_file.close()
+            self.metrics_file = None
+
+def rate(games, seconds):
+    return games / seconds if seconds > 0 else 0.0
+
+def format_stages(stages):
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stages.items())
@@ -1,37 +1,42 @@
-import json
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
-from dateutil import parser
-from dotenv import load_dotenv
-
 import sys
+import argparse
+import functools
+import itertools
+from datetime import datetime
+from collections import defaultdict
 
 # Ottieni la directory principale del progetto
 project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_dir)
 from database.models import *
-from sqlalchemy.exc import IntegrityError
-import re
+from database.session import get_session
+from database.db_queries import compute_top_publishers, compute_top_tags
+from database.game_cards import rebuild_game_cards
+from database.dataset_stream import iter_games, unique_games, top_games
+from database.normalize import SEED_WORKERS, normalize_games
+from database.seed_progress import SeedProgress
+from sqlalchemy import func, select, update, delete
+from sqlalchemy.exc import DBAPIError
 import math
 
-# Carica le variabili di ambiente dal file .env
-load_dotenv()
+session = get_session()
 
-# Recupera gli elementi dell'URL del database
-DB_USER = os.getenv("DB_USER")  # Usa "root" come valore predefinito
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
-DB_DRIVER = os.getenv("DB_DRIVER")
-
-# Costruisci l'URL del database
-DATABASE_URL = f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+def parse_game_limit(value):
+    """Numero di giochi da caricare; "all" o 0 indicano tutto il catalogo (None)."""
+    if str(value).strip().lower() == "all":
+        return None
+    limit = int(value)
+    if limit < 0:
+        raise ValueError(f"limite di giochi negativo: {limit}")
+    return limit or None
 
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+# Giochi caricati: i migliori SEED_GAME_LIMIT, oppure tutto il catalogo con SEED_GAME_LIMIT=all (o 0)
+SEED_GAME_LIMIT = parse_game_limit(os.getenv("SEED_GAME_LIMIT", "5000"))
+# Giochi inseriti per ogni blocco (una transazione, una INSERT per tabella, un resoconto degli errori)
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", 1000))
+# File in cui aggiungere le metriche di ogni blocco come righe JSON (vedi seed_progress.py)
+SEED_METRICS_FILE = os.getenv("SEED_METRICS_FILE")
 
 
 # Funzione per calcolare il valore
@@ -43,303 +48,503 @@ def calculate_value(positive, negative):
         return 0  # Evita la divisione per zero se entrambi sono zero
     return math.log(log_argument)
 
-def load_json_data(filepath):
-    """Carica i dati dal file JSON."""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except json.JSONDecodeError as e:
-            print(f"Errore nel parsing del file JSON: {e}")
-        except Exception as e:
-            print(f"Errore nell'aprire il file: {e}")
-    else:
-        print(f"Il file {filepath} non esiste.")
-    return None
-
-def safe_get(value):
-    """Restituisce None o NaN per valori mancanti o vuoti."""
-    if isinstance(value, str) and value.strip() == '':
-        return None  # Sostituisce stringhe vuote con None
-    elif isinstance(value, (int, float)) and (value is None or value == ''):
-        return float('nan')  # Sostituisce i valori numerici mancanti con NaN
-    return value
-
-def is_valid_game_name(name):
-    """Verifica che il nome del gioco contenga solo caratteri latini, numeri e spazi."""
-    if name is None:
-        return False
-    # Regex che permette solo caratteri latini, numeri e spazi
-    return bool(re.match(r"^[a-zA-Z0-9\s!\"#$%&'()*+,\-./:;<=>?@[\\\]^_`{|}~®™]*$", name))
-
-def seed_game_data(game):
-    """Aggiungi i dati di un gioco nel database solo se supporta l'inglese e il nome è valido."""
-    
-    # Controlla se l'inglese è nelle lingue supportate
-    supported_languages = game.get('supported_languages', [])
-    if 'English' not in supported_languages:
-        return None  # Salta il gioco se non supporta l'inglese
-    
-    detailed_description = game.get('detailed_description')
-    if len(detailed_description.encode('utf-8')) > 65535:
+def next_id(id_column):
+    """Primo id libero di una tabella: il seeder assegna gli id da sé per inserire a blocchi."""
+    return (session.query(func.max(id_column)).scalar() or 0) + 1
+
+def dimension_key(name):
+    # Come il confronto di MySQL (collation *_ci): senza maiuscole e spazi finali
+    return str(name).rstrip().lower()
+
+class DimensionCache:
+    """Mappa nome -> id di una dimensione (sviluppatori, tag, lingue, ...), caricata con una sola query.
+
+    I nomi nuovi ricevono subito un id e vengono inseriti con il blocco successivo.
+    """
+
+    def __init__(self, model, id_column):
+        self.table = model.__table__
+        self.id_name = id_column.key
+        self.ids = {}
+        for dimension_id, name in session.query(id_column, model.name):
+            self.ids.setdefault(dimension_key(name), dimension_id)
+        self.next_id = next_id(id_column)
+        self.new_rows = []
+
+    def get_id(self, name):
+        key = dimension_key(name)
+        dimension_id = self.ids.get(key)
+        if dimension_id is None:
+            dimension_id = self.ids[key] = self.next_id
+            self.next_id += 1
+            self.new_rows.append({self.id_name: dimension_id, 'name': str(name)})
+        return dimension_id
+
+    def take_new_rows(self):
+        rows, self.new_rows = self.new_rows, []
+        return rows
+
+    def forget(self, row):
+        """Dimentica un nome nuovo il cui inserimento è fallito: il prossimo gioco che lo usa lo ricrea."""
+        key = dimension_key(row['name'])
+        if self.ids.get(key) == row[self.id_name]:
+            del self.ids[key]
+
+# Tabelle con le righe di un gioco, riscritte quando il gioco cambia (oltre a packages e subpackages)
+GAME_CHILD_MODELS = [
+    GameDeveloper, GameGenre, GameCategory, GamePublisher, GameTag,
+    GameSupportedLanguage, GameFullAudioLanguage, Movie, Screenshot,
+]
+
+class PendingGame:
+    """Righe di un gioco in attesa di essere scritte, tabella -> righe."""
+
+    def __init__(self, source_id, name, app_id, replaces):
+        self.source_id = source_id  # chiave del gioco in games.json
+        self.name = name
+        self.app_id = app_id
+        self.replaces = replaces  # True se il gioco esiste già e va aggiornato
+        self.game_row = None
+        self.rows = defaultdict(list)
+
+    @property
+    def label(self):
+        return f"gioco {self.source_id} '{self.name}'"
+
+    def find_reference(self, references):
+        """La prima coppia (colonna, id) di references usata dalle righe del gioco, o None."""
+        for rows in self.rows.values():
+            for row in rows:
+                for item in row.items():
+                    if item in references:
+                        return item
         return None
-    
-    # Verifica che il nome del gioco contenga solo caratteri validi
-    game_name = safe_get(game.get('name'))
-    if not is_valid_game_name(game_name):
-        print(f"Nome del gioco '{game_name}' non valido (contenuto non latino). Salto il gioco.")
-        return None  # Salta il gioco se il nome non è valido
-    
-    print(game_name)
-
-    game_name = re.sub(r"[®™]", "", game_name)
-
-    # Recupero e conversione della data
-    release_date = safe_get(game.get('release_date'))
-
-    if release_date:
-        release_date = release_date.replace(',', '')  # Rimuove la virgola
-        
-        try:
-            # Tenta di fare il parsing con il formato specifico
-            release_date = datetime.strptime(release_date, "%b %d %Y")
-        except ValueError:
-            # Se fallisce, usa il parser di dateutil
-            release_date = parser.parse(release_date)
-
-    new_game = Game(
-        name=game_name,
-        release_date=release_date,
-        estimated_owners=safe_get(game.get('estimated_owners')),
-        peak_ccu=safe_get(game.get('peak_ccu')),
-        required_age=safe_get(game.get('required_age')),
-        price=safe_get(game.get('price')),
-        dlc_count=safe_get(game.get('dlc_count')),
-        detailed_description=safe_get(game.get('detailed_description')),
-        short_description=safe_get(game.get('short_description')),
-        reviews=safe_get(game.get('reviews')),
-        header_image=safe_get(game.get('header_image')),
-        website=safe_get(game.get('website')),
-        support_url=safe_get(game.get('support_url')),
-        support_email=safe_get(game.get('support_email')),
-        support_windows=safe_get(game.get('windows')),
-        support_mac=safe_get(game.get('mac')),
-        support_linux=safe_get(game.get('linux')),
-        metacritic_score=safe_get(game.get('metacritic_score')),
-        metacritic_url=safe_get(game.get('metacritic_url')),
-        user_score=safe_get(game.get('user_score')),
-        positive=safe_get(game.get('positive')),
-        negative=safe_get(game.get('negative')),
-        score_rank=safe_get(game.get('score_rank')),
-        achievements=safe_get(game.get('achievements')),
-        recommendations=safe_get(game.get('recommendations')),
-        notes=safe_get(game.get('notes')),
-        average_playtime=safe_get(game.get('average_playtime_forever')),
-        average_playtime_2weeks=safe_get(game.get('average_playtime_2weeks')),
-        median_playtime=safe_get(game.get('median_playtime_forever')),
-        median_playtime_2weeks=safe_get(game.get('median_playtime_2weeks'))
-    )
-    session.add(new_game)
-    return new_game
-
-def seed_package_data(game, new_game):
-    """Aggiungi i pacchetti e subpacchetti di un gioco nel database."""
-    for package in game.get('packages', []):
-        new_package = Package(
-            app_id=new_game.app_id,
-            title=safe_get(package.get('title')),
-            description=safe_get(package.get('description'))
+
+def insert_rows(rows_by_table):
+    """Una INSERT executemany per tabella, nell'ordine delle chiavi esterne."""
+    for table in Base.metadata.sorted_tables:
+        rows = rows_by_table.get(table)
+        if rows:
+            session.execute(table.insert(), rows)
+
+def delete_game_rows(app_ids, models=GAME_CHILD_MODELS):
+    """Elimina pacchetti, subpacchetti e le righe di models che appartengono ai giochi app_ids."""
+    package_ids = select(Package.package_id).where(Package.app_id.in_(app_ids))
+    session.execute(delete(Subpackage.__table__).where(Subpackage.package_id.in_(package_ids)))
+    session.execute(delete(Package.__table__).where(Package.app_id.in_(app_ids)))
+    for model in models:
+        session.execute(delete(model.__table__).where(model.app_id.in_(app_ids)))
+
+def write_games(pending_games, dimension_rows=None):
+    """Scrive un gruppo di giochi: i nuovi con INSERT, quelli esistenti con UPDATE e righe collegate riscritte."""
+    replaced = [pending_game for pending_game in pending_games if pending_game.replaces]
+    if replaced:
+        delete_game_rows([pending_game.app_id for pending_game in replaced])
+
+    insert_rows(merge_rows(
+        dimension_rows or {},
+        {Game.__table__: [pending_game.game_row for pending_game in pending_games if not pending_game.replaces]},
+        *(pending_game.rows for pending_game in pending_games),
+    ))
+
+    if replaced:
+        # UPDATE executemany per chiave primaria
+        session.execute(update(Game), [pending_game.game_row for pending_game in replaced])
+
+def merge_rows(*rows_by_tables):
+    merged = defaultdict(list)
+    for rows_by_table in rows_by_tables:
+        for table, rows in rows_by_table.items():
+            merged[table].extend(rows)
+    return merged
+
+def describe_error(error):
+    return " ".join(str(getattr(error, 'orig', None) or error).split())[:200]
+
+class CatalogSeeder:
+    """Accumula le righe dei giochi e le inserisce a blocchi con executemany (SQLAlchemy Core).
+
+    Ogni blocco è una transazione. Se l'inserimento di un blocco fallisce, il
+    blocco viene ripetuto un gioco alla volta, ognuno in un SAVEPOINT: i giochi
+    non validi vengono scartati e riportati senza perdere il resto del blocco.
+    Con un checkpoint, la posizione raggiunta viene salvata nella stessa transazione.
+    """
+
+    def __init__(self, progress=None, checkpoint=None):
+        self.developers = DimensionCache(Developer, Developer.developer_id)
+        self.genres = DimensionCache(Genre, Genre.genre_id)
+        self.categories = DimensionCache(Category, Category.category_id)
+        self.publishers = DimensionCache(Publisher, Publisher.publisher_id)
+        self.tags = DimensionCache(Tag, Tag.tag_id)
+        self.languages = DimensionCache(Language, Language.language_id)
+        self.dimensions = [self.developers, self.genres, self.categories, self.publishers, self.tags, self.languages]
+
+        self.next_app_id = next_id(Game.app_id)
+        self.next_package_id = next_id(Package.package_id)
+        self.pending = []  # giochi del blocco corrente
+        self.progress = progress or SeedProgress()
+        self.checkpoint = checkpoint
+        self.position = checkpoint.position if checkpoint else 0  # giochi ricevuti, compresi quelli già scritti
+        self.written_app_ids = []  # giochi inseriti o aggiornati, per ricostruirne le schede
+        self.chunks = 0
+        self.inserted_games = 0
+        self.updated_games = 0
+        self.failed_games = 0
+
+    def add_links(self, pending_game, link_model, cache, app_id, names):
+        # Un nome ripetuto nello stesso gioco violerebbe la chiave primaria della tabella di collegamento
+        for dimension_id in dict.fromkeys(cache.get_id(name) for name in names):
+            pending_game.rows[link_model.__table__].append({'app_id': app_id, cache.id_name: dimension_id})
+
+    def add_game(self, normalized, app_id=None):
+        """Assegna gli id a un gioco normalizzato (vedi normalize.normalize_game) e ne prepara le righe.
+
+        Con app_id il gioco esiste già: la sua riga viene aggiornata e le righe collegate riscritte.
+        """
+        replaces = app_id is not None
+        if not replaces:
+            app_id = self.next_app_id
+            self.next_app_id += 1
+        game_row = dict(normalized['game'], app_id=app_id, updated_at=datetime.utcnow())
+        pending_game = PendingGame(normalized['source_id'], game_row['name'], app_id, replaces)
+        pending_game.game_row = game_row
+        rows = pending_game.rows
+
+        # Pacchetti e subpacchetti
+        for package_row, subpackage_rows in normalized['packages']:
+            package_id = self.next_package_id
+            self.next_package_id += 1
+            rows[Package.__table__].append({'package_id': package_id, 'app_id': app_id, **package_row})
+            rows[Subpackage.__table__].extend({'package_id': package_id, **subpackage_row} for subpackage_row in subpackage_rows)
+
+        # Film e screenshot
+        rows[Movie.__table__].extend({'app_id': app_id, 'url': url} for url in normalized['movies'])
+        rows[Screenshot.__table__].extend({'app_id': app_id, 'url': url} for url in normalized['screenshots'])
+
+        # Sviluppatori, generi, categorie, editori e lingue (molti a molti)
+        self.add_links(pending_game, GameDeveloper, self.developers, app_id, normalized['developers'])
+        self.add_links(pending_game, GameGenre, self.genres, app_id, normalized['genres'])
+        self.add_links(pending_game, GameCategory, self.categories, app_id, normalized['categories'])
+        self.add_links(pending_game, GamePublisher, self.publishers, app_id, normalized['publishers'])
+        self.add_links(pending_game, GameSupportedLanguage, self.languages, app_id, normalized['supported_languages'])
+        self.add_links(pending_game, GameFullAudioLanguage, self.languages, app_id, normalized['full_audio_languages'])
+
+        # Tag con il numero di voti
+        tag_values = {}
+        for tag, tag_value in normalized['tags']:
+            tag_values.setdefault(self.tags.get_id(tag), tag_value)
+        rows[GameTag.__table__].extend(
+            {'app_id': app_id, 'tag_id': tag_id, 'tag_value': tag_value} for tag_id, tag_value in tag_values.items()
         )
-        session.add(new_package)
-
-        for subpackage in package.get('subpackages', []):
-            new_subpackage = Subpackage(
-                package_id=new_package.package_id,
-                title=safe_get(subpackage.get('title')),
-                description=safe_get(subpackage.get('description')),
-                price=safe_get(subpackage.get('price'))
-            )
-            session.add(new_subpackage)
-
-def seed_developers(game):
-    """Aggiungi sviluppatori di un gioco nel database."""
-    developers = []
-    for dev in game.get('developers', []):
-        existing_dev = session.query(Developer).filter_by(name=dev).first()
-        if not existing_dev:
-            new_dev = Developer(name=dev)
-            session.add(new_dev)
-            session.flush()
-            developers.append(new_dev)
-        else:
-            developers.append(existing_dev)
-    return developers
-
-def seed_genres(game):
-    """Aggiungi generi di un gioco nel database."""
-    genres = []
-    for genre in game.get('genres', []):
-        existing_genre = session.query(Genre).filter_by(name=genre).first()
-        if not existing_genre:
-            new_genre = Genre(name=genre)
-            session.add(new_genre)
-            session.flush()
-            genres.append(new_genre)
-        else:
-            genres.append(existing_genre)
-    return genres
-
-def seed_categories(game):
-    """Aggiungi generi di un gioco nel database."""
-    categories = []
-    for category in game.get('categories', []):
-        existing_category = session.query(Category).filter_by(name=category).first()
-        if not existing_category:
-            new_category = Category(name=category)
-            session.add(new_category)
-            session.flush()
-            categories.append(new_category)
-        else:
-            categories.append(existing_category)
-    return categories
-
-def seed_movies_and_screenshots(game, new_game):
-    """Aggiungi film e screenshot di un gioco nel database."""
-    movies = [Movie(app_id=new_game.app_id, url=safe_get(movie)) for movie in game.get('movies', [])]
-    screenshots = [Screenshot(app_id=new_game.app_id, url=safe_get(screenshot)) for screenshot in game.get('screenshots', [])]
-    session.bulk_save_objects(movies)
-    session.bulk_save_objects(screenshots)
-
-def seed_publishers_and_tags(game):
-    """Aggiungi publisher e tag di un gioco nel database."""
-    publishers = []
-    tags = []
-    for publisher in game.get('publishers', []):
-        existing_pub = session.query(Publisher).filter_by(name=publisher).first()
-        if not existing_pub:
-            new_pub = Publisher(name=publisher)
-            session.add(new_pub)
-            session.flush()
-            publishers.append(new_pub)
-        else:
-            publishers.append(existing_pub)
-
-    if isinstance(game.get('tags'), dict):
-        for tag, tag_value in game.get('tags', {}).items():
-            existing_tag = session.query(Tag).filter_by(name=tag).first()
-            if not existing_tag:
-                new_tag = Tag(name=str(tag))
-                session.add(new_tag)
-                session.flush() 
-                tags.append([new_tag, tag_value, tag])
-            else:
-                tags.append([existing_tag, tag_value, tag])
-
-    return publishers, tags
-
-def link_game_to_developers_genres_categories_publishers_tags(new_game, developers, genres, categories, publishers, tags):
-    """Collega il gioco agli sviluppatori, generi, editori e tag (many-to-many)."""
-    
-    app_id = new_game.app_id
-    game_developers = [GameDeveloper(app_id=app_id, developer_id=developer.developer_id) for developer in developers]
-    game_categories = [GameCategory(app_id=app_id, category_id=category.category_id) for category in categories]
-    game_genres = [GameGenre(app_id=app_id, genre_id=genre.genre_id) for genre in genres]
-    game_publishers = [GamePublisher(app_id=app_id, publisher_id=publisher.publisher_id) for publisher in publishers]
-    game_tags = [GameTag(app_id=app_id, tag_id=tag[0].tag_id, tag_value=tag[1]) for tag in tags]
-
-    # Usa bulk_save_objects per inserire tutte le voci in un'unica operazione
-    session.bulk_save_objects(game_developers + game_genres + game_publishers + game_tags + game_categories)
-
-
-def seed_languages(game, new_game):
-    """Aggiungi lingue supportate e lingue audio complete."""
-    supported_languages = []
-    for lang in game.get('supported_languages', []):
-        existing_language = session.query(Language).filter_by(name=lang).first()
-        if not existing_language:
-            new_language = Language(name=lang)
-            session.add(new_language)
-            session.flush() 
-            supported_languages.append(new_language)
-        else:
-            supported_languages.append(existing_language)
-
-    full_audio_languages = []
-    for lang in game.get('full_audio_languages', []):
-        existing_language = session.query(Language).filter_by(name=lang).first()
-        if not existing_language:
-            new_language = Language(name=lang)
-            session.add(new_language)
-            session.flush() 
-            full_audio_languages.append(new_language)
-        else:
-            full_audio_languages.append(existing_language)
-
-    app_id = new_game.app_id
-    supported_languages_list = [GameSupportedLanguage(app_id=app_id, language_id=language.language_id) for language in supported_languages]
-    full_audio_languages_list = [GameFullAudioLanguage(app_id=app_id, language_id=language.language_id) for language in full_audio_languages]
-
-    # Usa bulk_save_objects per inserire tutte le lingue in un'unica operazione
-    session.bulk_save_objects(supported_languages_list + full_audio_languages_list)
-
-def seed_data(dataset):
-    """Esegui il seeding dei dati nel database, assicurandoti che non ci siano duplicati basati sul nome del gioco."""
-    
-    # Rimuovi duplicati basandoti sul nome del gioco
-    unique_dataset = {}
-    seen_names = set()
-    for game_id, game in dataset.items():
-        name = game.get('name', '').strip().lower()
-        if name and name not in seen_names:
-            seen_names.add(name)
-            unique_dataset[game_id] = game
-
-    # Prepara i dati per il seeding
-    games = []
-    for game_id, game in unique_dataset.items():
-        positive = game.get('positive', 0)
-        negative = game.get('negative', 0)
-        value = calculate_value(positive, negative)
-        games.append((game_id, value, game))
-
-    # Ordina i giochi in base al valore (dal più alto al più basso)
-    games_sorted = sorted(games, key=lambda x: x[1], reverse=True)
-
-    # Prendi i primi 5000 giochi (o meno se non ci sono abbastanza giochi)
-    top_games = games_sorted[:5000]
-
-    for top_game in top_games:
-        game = top_game[2]
-        try:
-            new_game = seed_game_data(game)
-            if new_game is None:
-                continue
-            seed_package_data(game, new_game)
-            developers = seed_developers(game)
-            categories = seed_categories(game)
-            genres = seed_genres(game)
-            seed_movies_and_screenshots(game, new_game)
-            publishers, tags = seed_publishers_and_tags(game)
-            link_game_to_developers_genres_categories_publishers_tags(new_game, developers, genres, categories, publishers, tags)
-            seed_languages(game, new_game)
-        except IntegrityError:
-            session.rollback()
-        
-        session.commit()
 
-    # Commit finale
+        self.pending.append(pending_game)
+        self.position += 1
+        return app_id
+
+    @property
+    def pending_games(self):
+        return len(self.pending)
+
+    def write_isolated(self, items):
+        """Scrive ogni elemento (etichetta, funzione) nel proprio SAVEPOINT; restituisce gli errori."""
+        errors = []
+        for label, write in items:
+            try:
+                with session.begin_nested():
+                    write()
+            except DBAPIError as error:
+                errors.append((label, describe_error(error)))
+        return errors
+
+    def flush(self):
+        """Inserisce il blocco corrente in una transazione e ne stampa il resoconto."""
+        if not self.pending and not any(cache.new_rows for cache in self.dimensions):
+            return []
+
+        dimension_rows = {cache.table: cache.take_new_rows() for cache in self.dimensions}
+        errors = []
+        with self.progress.stage('inserimento'):
+            try:
+                with session.begin_nested():
+                    write_games(self.pending, dimension_rows)
+            except DBAPIError:
+                # Nomi nuovi delle dimensioni prima dei giochi che li usano, poi un gioco alla volta
+                failed_dimensions = {}  # (colonna, id) -> etichetta del nome non inserito
+                for cache in self.dimensions:
+                    for row in dimension_rows[cache.table]:
+                        label = f"{cache.table.name} '{row['name']}'"
+                        dimension_errors = self.write_isolated([(label, functools.partial(insert_rows, {cache.table: [row]}))])
+                        if dimension_errors:
+                            cache.forget(row)
+                            failed_dimensions[(cache.id_name, row[cache.id_name])] = label
+                            errors += dimension_errors
+
+                # I giochi che usano un nome non inserito sono scartati con la causa, senza tentare l'inserimento
+                games_to_write = []
+                for pending_game in self.pending:
+                    reference = pending_game.find_reference(failed_dimensions)
+                    if reference is not None:
+                        errors.append((pending_game.label, f"{failed_dimensions[reference]} non inserito"))
+                    else:
+                        games_to_write.append(pending_game)
+                errors += self.write_isolated(
+                    (pending_game.label, functools.partial(write_games, [pending_game]))
+                    for pending_game in games_to_write
+                )
+
+        failed_labels = {label for label, _ in errors}
+        written = [pending_game for pending_game in self.pending if pending_game.label not in failed_labels]
+        inserted = sum(1 for pending_game in written if not pending_game.replaces)
+        with self.progress.stage('commit'):
+            if self.checkpoint is not None and self.pending:
+                self.save_checkpoint(self.pending[-1].source_id, inserted)
+            session.commit()
+
+        self.chunks += 1
+        self.inserted_games += inserted
+        self.updated_games += len(written) - inserted
+        self.failed_games += len(self.pending) - len(written)
+        self.written_app_ids.extend(pending_game.app_id for pending_game in written)
+        self.print_chunk_report(inserted, len(written) - inserted, errors)
+        self.pending = []
+        return errors
+
+    def save_checkpoint(self, last_source_id, inserted):
+        """Aggiorna il checkpoint con la posizione del blocco, prima del suo commit."""
+        self.checkpoint = session.merge(SeedCheckpoint(
+            source=self.checkpoint.source,
+            position=self.position,
+            last_source_id=str(last_source_id),
+            inserted_games=(self.checkpoint.inserted_games or 0) + inserted,
+            updated_at=datetime.utcnow(),
+        ))
+
+    def print_chunk_report(self, inserted, updated, errors):
+        updated_text = f", {updated} aggiornati" if updated else ""
+        progress_text = self.progress.end_chunk(
+            len(self.pending), chunk=self.chunks, inserted=inserted, updated=updated,
+            failed=len(self.pending) - inserted - updated, position=self.position,
+        )
+        print(f"Blocco {self.chunks}: {inserted} giochi inseriti{updated_text}, {len(errors)} errori "
+              f"(totale: {self.inserted_games + self.updated_games} giochi) - {progress_text}")
+        for label, message in errors:
+            print(f"  scartato {label}: {message}")
+
+def seed_leaderboards():
+    """Ricalcola le classifiche materializzate di tag e publisher."""
+    leaderboards = [
+        (TagLeaderboard, 'tag_id', compute_top_tags(session)),
+        (PublisherLeaderboard, 'publisher_id', compute_top_publishers(session)),
+    ]
+
+    for leaderboard, id_column, rows in leaderboards:
+        session.query(leaderboard).delete()
+        session.bulk_insert_mappings(leaderboard, [
+            {'rank': rank, id_column: dimension_id, 'game_count': game_count}
+            for rank, (dimension_id, game_count) in enumerate(rows, 1)
+        ])
+
     session.commit()
 
-def run_seeding():
-    """Esegui il seeding."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    json_file_path = os.path.join(script_dir, 'dataset', 'games.json')
+def game_value(game):
+    return calculate_value(game.get('positive', 0), game.get('negative', 0))
+
+def normalized_games(dataset, limit=SEED_GAME_LIMIT, workers=SEED_WORKERS):
+    """Giochi di dataset scelti e normalizzati per il seeding, senza duplicati basati sul nome del gioco.
+
+    dataset è un dizionario {app_id: gioco} o un iteratore di coppie (app_id, gioco), come iter_games.
+    Con limit vengono scelti solo i limit giochi con più recensioni, con None tutto il catalogo.
+    I giochi sono normalizzati da workers processi; lettura, deduplica e scelta dei
+    migliori avvengono in questo processo, e con limit la normalizzazione parte solo
+    dopo aver letto tutto il dataset.
+    """
+    if isinstance(dataset, dict):
+        dataset = dataset.items()
+
+    # Rimuovi duplicati basandoti sul nome del gioco e tieni solo i migliori limit giochi
+    # (dal più alto al più basso valore): in memoria restano al più limit giochi
+    selected_games = top_games(unique_games(dataset), limit, game_value)
+    return normalize_games(selected_games, workers)
+
+def seed_data(dataset, limit=SEED_GAME_LIMIT, workers=SEED_WORKERS):
+    """Esegui il seeding dei dati nel database (vedi normalized_games)."""
+    seed_normalized(normalized_games(dataset, limit, workers))
+
+def load_checkpoint(source, restart=False):
+    """Checkpoint del seeding di source (nuovo se non esiste); con restart quello salvato viene scartato."""
+    checkpoint = session.get(SeedCheckpoint, source)
+    if checkpoint is not None and restart:
+        session.delete(checkpoint)
+        session.commit()
+        checkpoint = None
+    return checkpoint or SeedCheckpoint(source=source, position=0, inserted_games=0)
+
+def skip_written_games(games, checkpoint):
+    """Consuma i giochi già scritti prima dell'interruzione; False se il dataset non corrisponde al checkpoint."""
+    skipped = 0
+    last_source_id = None
+    for normalized in itertools.islice(games, checkpoint.position):
+        skipped += 1
+        last_source_id = normalized['source_id']
+    return skipped == checkpoint.position and str(last_source_id) == checkpoint.last_source_id
+
+def seed_normalized(games, checkpoint_source=None, restart=False, metrics_path=SEED_METRICS_FILE):
+    """Inserisce i giochi normalizzati (da normalized_games o da staging.load_staged_games).
+
+    Con checkpoint_source la posizione raggiunta viene salvata a ogni blocco: se il
+    seeding si interrompe, la volta successiva riprende dal primo gioco non scritto
+    (restart lo fa ripartire dall'inizio). Il checkpoint è eliminato a seeding completato.
+    """
+    games = iter(games)
+    progress = SeedProgress(metrics_path)
+    checkpoint = load_checkpoint(checkpoint_source, restart) if checkpoint_source else None
+    if checkpoint is not None and checkpoint.position:
+        print(f"Ripresa del seeding dal gioco {checkpoint.position + 1} "
+              f"({checkpoint.inserted_games} giochi già inseriti, ultimo blocco salvato il {checkpoint.updated_at:%Y-%m-%d %H:%M})")
+        with progress.stage('lettura'):
+            if not skip_written_games(games, checkpoint):
+                print("Il dataset non corrisponde al checkpoint: usa --sync per allineare il catalogo "
+                      "oppure --restart per ricominciare il seeding.")
+                progress.close()
+                return
+
+    # Le dimensioni esistenti vengono lette una volta sola; giochi, nomi nuovi e
+    # collegamenti sono inseriti a blocchi di SEED_BATCH_SIZE giochi, mentre i
+    # processi di normalizzazione preparano i giochi successivi
+    seeder = CatalogSeeder(progress, checkpoint)
+    for normalized in progress.timed(games, 'lettura'):
+        with progress.stage('dimensioni'):
+            seeder.add_game(normalized)
+        if seeder.pending_games >= SEED_BATCH_SIZE:
+            seeder.flush()
+
+    # Ultimo blocco
+    seeder.flush()
+    print(f"Seeding completato: {seeder.inserted_games} giochi inseriti, {seeder.failed_games} scartati per errore")
+    print(f"Tempi: {progress.summary(inserted=seeder.inserted_games, failed=seeder.failed_games)}")
+    progress.close()
+
+    seed_leaderboards()
+    rebuild_game_cards(session)
+    if checkpoint is not None:
+        session.query(SeedCheckpoint).filter(SeedCheckpoint.source == checkpoint_source).delete()
+        session.commit()
+
+def delete_games(app_ids):
+    """Elimina i giochi e tutte le righe che li riferiscono, a blocchi di SEED_BATCH_SIZE."""
+    for start in range(0, len(app_ids), SEED_BATCH_SIZE):
+        batch = app_ids[start:start + SEED_BATCH_SIZE]
+        delete_game_rows(batch, GAME_CHILD_MODELS + [ImageStatus, StoredGameCard])
+        session.execute(delete(Game.__table__).where(Game.app_id.in_(batch)))
+        session.commit()
+
+def sync_data(dataset, limit=SEED_GAME_LIMIT, workers=SEED_WORKERS):
+    """Allinea il catalogo a un nuovo games.json senza ricaricarlo da zero (vedi sync_normalized)."""
+    sync_normalized(normalized_games(dataset, limit, workers))
+
+def sync_normalized(games, metrics_path=SEED_METRICS_FILE):
+    """Allinea il catalogo ai giochi normalizzati.
+
+    I giochi sono riconosciuti dalla chiave Steam (steam_app_id) e confrontati con
+    l'hash dei dati normalizzati: si inseriscono i nuovi, si aggiornano solo quelli
+    cambiati e si eliminano quelli che non fanno più parte del catalogo.
+    Non serve un checkpoint: dopo un'interruzione i giochi già scritti risultano invariati.
+    """
+    # Giochi già caricati: per chiave Steam, oppure per nome se caricati prima delle chiavi
+    known_games = {
+        steam_app_id: (app_id, source_hash)
+        for app_id, steam_app_id, source_hash in session.query(Game.app_id, Game.steam_app_id, Game.source_hash).filter(Game.steam_app_id.isnot(None))
+    }
+    legacy_games = {
+        dimension_key(name): app_id
+        for app_id, name in session.query(Game.app_id, Game.name).filter(Game.steam_app_id.is_(None))
+    }
+
+    progress = SeedProgress(metrics_path)
+    seeder = CatalogSeeder(progress)
+    kept_app_ids = set()
+    unchanged = 0
+    for normalized in progress.timed(games, 'lettura'):
+        game_row = normalized['game']
+        app_id, source_hash = known_games.get(game_row['steam_app_id'], (None, None))
+        if app_id is None:
+            app_id = legacy_games.pop(dimension_key(game_row['name']), None)
+
+        if app_id is not None:
+            kept_app_ids.add(app_id)
+            if source_hash == game_row['source_hash']:
+                unchanged += 1
+                continue
 
-    print(f"Percorso completo del file JSON: {json_file_path}")
-    dataset = load_json_data(json_file_path)
-    if dataset:
-        seed_data(dataset)
+        with progress.stage('dimensioni'):
+            seeder.add_game(normalized, app_id)
+        if seeder.pending_games >= SEED_BATCH_SIZE:
+            seeder.flush()
+    seeder.flush()
+
+    # Giochi non più nel file, non più tra i migliori limit o non più validi
+    removed = [app_id for app_id, _ in known_games.values() if app_id not in kept_app_ids]
+    removed += list(legacy_games.values())
+    delete_games(removed)
+
+    print(f"Sincronizzazione completata: {seeder.inserted_games} giochi inseriti, {seeder.updated_games} aggiornati, "
+          f"{unchanged} invariati, {len(removed)} eliminati, {seeder.failed_games} scartati per errore")
+    print(f"Tempi: {progress.summary(inserted=seeder.inserted_games, updated=seeder.updated_games, unchanged=unchanged, removed=len(removed), failed=seeder.failed_games)}")
+    progress.close()
+
+    seed_leaderboards()
+    rebuild_game_cards(session, seeder.written_app_ids)
+
+def run_seeding(limit=SEED_GAME_LIMIT, workers=SEED_WORKERS, sync=False, staging_dir=None, restart=False, metrics_path=SEED_METRICS_FILE):
+    """Esegui il seeding (o la sincronizzazione incrementale con sync).
+
+    Con staging_dir i giochi vengono letti dalle tabelle Parquet di database/staging.py invece che da games.json.
+    Un seeding interrotto riprende dall'ultimo blocco salvato, se il dataset e il limite sono gli stessi.
+    """
+    if staging_dir:
+        # Import locale: pandas e pyarrow servono solo per lo staging
+        from database.staging import load_staged_games
+        print(f"Lettura delle tabelle di staging da {staging_dir}")
+        source = os.path.abspath(staging_dir)
+        games = load_staged_games(staging_dir, limit)
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        json_file_path = os.path.join(script_dir, 'dataset', 'games.json')
+
+        print(f"Percorso completo del file JSON: {json_file_path}")
+        if not os.path.exists(json_file_path):
+            print(f"Il file {json_file_path} non esiste.")
+            return
+        # Il file viene letto un gioco alla volta: la memoria non dipende dalla sua dimensione
+        source = json_file_path
+        games = normalized_games(iter_games(json_file_path), limit, workers)
+
+    if sync:
+        sync_normalized(games, metrics_path)
+    else:
+        checkpoint_source = f"{source} (limite: {'tutti' if limit is None else limit})"
+        seed_normalized(games, checkpoint_source, restart, metrics_path)
 
 # Esegui il seeding
 if __name__ == "__main__":
-    run_seeding()
+    arg_parser = argparse.ArgumentParser(description="Popola il database con i dati del dataset Steam.")
+    arg_parser.add_argument("--leaderboards", action="store_true", help="ricalcola solo le classifiche di tag e publisher")
+    arg_parser.add_argument("--game-cards", action="store_true", help="ricostruisce solo le schede dei giochi cambiate")
+    arg_parser.add_argument("--sync", action="store_true", help="aggiorna solo i giochi nuovi, cambiati o rimossi invece di ricaricare tutto")
+    size_group = arg_parser.add_mutually_exclusive_group()
+    size_group.add_argument("--limit", type=parse_game_limit, default=SEED_GAME_LIMIT,
+                            help="numero di giochi da caricare, 0 o all per l'intero catalogo (default: SEED_GAME_LIMIT)")
+    size_group.add_argument("--all", dest="limit", action="store_const", const=None, help="carica l'intero catalogo")
+    arg_parser.add_argument("--workers", type=int, default=SEED_WORKERS, help="processi di normalizzazione (default: SEED_WORKERS o numero di core)")
+    arg_parser.add_argument("--restart", action="store_true", help="ignora il checkpoint di un seeding interrotto e ricomincia dall'inizio")
+    arg_parser.add_argument("--metrics", default=SEED_METRICS_FILE, help="file in cui aggiungere le metriche di ogni blocco come righe JSON (default: SEED_METRICS_FILE)")
+    arg_parser.add_argument("--staging", nargs="?", const=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset', 'staging'),
+                            help="legge i giochi dalle tabelle Parquet di database/staging.py (default: database/dataset/staging)")
+    args = arg_parser.parse_args()
+
+    if args.leaderboards:
+        seed_leaderboards()
+    elif args.game_cards:
+        rebuild_game_cards(session)
+    else:
+        run_seeding(args.limit, args.workers, args.sync, args.staging, args.restart, args.metrics)
@@ -0,0 +1,333 @@
+import os
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Carica le variabili di ambiente dal file .env
+load_dotenv()
+
+# Configurazione del pool di connessioni
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # MySQL chiude le connessioni inattive
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Numero di istruzioni SQL compilate tenute in cache dall'engine
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+
+# Copia locale in sola lettura del catalogo (vedi database/snapshot.py): se impostata,
+# l'engine condiviso legge da questo file invece che dal database del .env
+CATALOG_SQLITE_PATH = os.getenv("CATALOG_SQLITE_PATH")
+CATALOG_SQLITE_MMAP_MB = int(os.getenv("CATALOG_SQLITE_MMAP_MB", 256))
+CATALOG_SQLITE_CACHE_MB = int(os.getenv("CATALOG_SQLITE_CACHE_MB", 64))
+
+# Driver asincroni corrispondenti ai driver sincroni (DB_ASYNC_DRIVER li sovrascrive)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def get_database_url():
+    """Costruisce l'URL del database dalle variabili di ambiente."""
+    return (
+        f"{os.getenv('DB_DRIVER')}://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
+    )
+
+def get_snapshot_url(path, drivername="sqlite"):
+    """URL di una copia SQLite del catalogo aperta in sola lettura.
+
+    immutable=1 evita i lock: la copia non viene mai modificata sul posto,
+    una nuova esportazione sostituisce il file.
+    """
+    return f"{drivername}:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true"
+
+def is_snapshot_url(database_url):
+    url = make_url(database_url)
+    return url.drivername.startswith("sqlite") and url.query.get("mode") == "ro"
+
+def set_snapshot_pragmas(dbapi_connection, connection_record):
+    """Pragma di lettura per la copia del catalogo: I/O mappato in memoria e cache più ampia."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA mmap_size = {CATALOG_SQLITE_MMAP_MB * 1024 * 1024}")
+    cursor.execute(f"PRAGMA cache_size = -{CATALOG_SQLITE_CACHE_MB * 1024}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+def get_serving_database_url():
+    """URL usato dall'engine condiviso: la copia locale se configurata, altrimenti il database."""
+    if CATALOG_SQLITE_PATH:
+        return get_snapshot_url(CATALOG_SQLITE_PATH)
+    return get_database_url()
+
+def get_async_database_url(database_url=None):
+    """URL del database con il driver asincrono corrispondente."""
+    url = make_url(database_url or get_database_url())
+    driver = os.getenv("DB_ASYNC_DRIVER") or ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver)
+
+class PoolStats:
+    """Contatori del pool di connessioni, aggiornati dagli eventi dell'engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.waits = 0  # checkout arrivati con il pool pieno
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def record_wait(self, elapsed):
+        with self._lock:
+            self.waits += 1
+            self.wait_time += elapsed
+            self.max_wait_time = max(self.max_wait_time, elapsed)
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+class WaitTimingPool:
+    """Base per i pool a coda: misura i checkout costretti ad aspettare una connessione libera."""
+
+    stats = None
+    max_overflow_limit = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_lock = threading.Lock()
+        self._pending = 0  # checkout in corso
+
+    def _do_get(self):
+        # Le connessioni libere vanno ai checkout già in corso: nel pool asincrono il
+        # prelievo cede il controllo all'event loop prima di togliere la connessione
+        with self._pending_lock:
+            free = self.checkedin() - self._pending
+            self._pending += 1
+        exhausted = free <= 0 and self.overflow() >= self.max_overflow_limit
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+            if exhausted:
+                self.stats.record_wait(time.perf_counter() - start)
+
+class InstrumentedQueuePool(WaitTimingPool, QueuePool):
+    """QueuePool dell'engine sincrono con la misura delle attese."""
+
+class InstrumentedAsyncQueuePool(WaitTimingPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool dell'engine asincrono con la misura delle attese."""
+
+def instrumented_pool_class(base, stats, max_overflow):
+    """Sottoclasse di un pool instrumentato che registra le attese in stats."""
+    return type(f"Engine{base.__name__}", (base,), {"stats": stats, "max_overflow_limit": max_overflow})
+
+def watch_pool(engine, stats):
+    """Conta checkout, nuove connessioni e invalidazioni del pool di engine in stats."""
+    event.listen(engine, "checkout", lambda *args: stats.increment("checkouts"))
+    event.listen(engine, "connect", lambda *args: stats.increment("connects"))
+    event.listen(engine, "invalidate", lambda *args: stats.increment("invalidations"))
+
+_engine = None
+_session_factory = None
+_async_engine = None
+_async_session_factory = None
+_database_url = None
+_pool_stats = PoolStats()
+_async_pool_stats = PoolStats()
+_background_tasks = set()
+_lock = threading.Lock()
+
+def create_database_engine(database_url=None, **engine_options):
+    """Crea un engine con il pool configurato e registra gli eventi per le statistiche."""
+    database_url = database_url or get_database_url()
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+
+    # SQLite usa i propri pool: le opzioni di QueuePool valgono per i server (MySQL)
+    if not database_url.startswith("sqlite"):
+        options.update(
+            poolclass=instrumented_pool_class(
+                InstrumentedQueuePool, _pool_stats, engine_options.get("max_overflow", DB_MAX_OVERFLOW),
+            ),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    options.update(engine_options)
+
+    engine = create_engine(database_url, **options)
+
+    watch_pool(engine, _pool_stats)
+    if is_snapshot_url(database_url):
+        event.listen(engine, "connect", set_snapshot_pragmas)
+    return engine
+
+def create_async_database_engine(database_url=None, **engine_options):
+    """Crea un engine asincrono con le stesse opzioni di pool dell'engine sincrono."""
+    async_url = get_async_database_url(database_url)
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+    if not async_url.drivername.startswith("sqlite"):
+        options.update(
+            poolclass=instrumented_pool_class(
+                InstrumentedAsyncQueuePool, _async_pool_stats, engine_options.get("max_overflow", DB_MAX_OVERFLOW),
+            ),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    options.update(engine_options)
+
+    async_engine = create_async_engine(async_url, **options)
+
+    watch_pool(async_engine.sync_engine, _async_pool_stats)
+    if is_snapshot_url(async_url):
+        event.listen(async_engine.sync_engine, "connect", set_snapshot_pragmas)
+    return async_engine
+
+def configure(database_url=None, **engine_options):
+    """Sostituisce l'engine condiviso (ad esempio per puntare a un altro database)."""
+    global _engine, _session_factory, _async_engine, _async_session_factory, _database_url
+    database_url = database_url or get_serving_database_url()
+
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = create_database_engine(database_url, **engine_options)
+        _session_factory = sessionmaker(bind=_engine)
+        # L'engine asincrono viene ricreato al primo utilizzo con il nuovo URL
+        if _async_engine is not None:
+            dispose_async_engine(_async_engine)
+        _database_url = database_url
+        _async_engine = None
+        _async_session_factory = None
+    return _engine
+
+def dispose_async_engine(async_engine):
+    """Chiude le connessioni di un engine asincrono sostituito.
+
+    Dentro un event loop la chiusura viene programmata come task; altrimenti
+    viene eseguita subito. Se il loop che ha aperto le connessioni non esiste
+    più, il pool viene comunque abbandonato senza chiuderle.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None:
+        task = loop.create_task(async_engine.dispose())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        return
+    try:
+        asyncio.run(async_engine.dispose())
+    except Exception:
+        async_engine.sync_engine.dispose(close=False)
+
+def get_engine():
+    """Restituisce l'engine condiviso dal processo, creandolo al primo utilizzo."""
+    if _engine is None:
+        configure()
+    return _engine
+
+def get_session() -> Session:
+    if _session_factory is None:
+        get_engine()
+    return _session_factory()
+
+@contextmanager
+def session_scope(commit=False):
+    """Apre una sessione e la chiude sempre; con commit=True salva le modifiche alla fine."""
+    session = get_session()
+    try:
+        yield session
+        if commit:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def get_async_engine():
+    """Restituisce l'engine asincrono condiviso, creandolo al primo utilizzo."""
+    global _async_engine, _async_session_factory
+    with _lock:
+        if _async_engine is None:
+            _async_engine = create_async_database_engine(_database_url or get_serving_database_url())
+            _async_session_factory = async_sessionmaker(bind=_async_engine, expire_on_commit=False)
+    return _async_engine
+
+def get_async_session() -> AsyncSession:
+    if _async_session_factory is None:
+        get_async_engine()
+    return _async_session_factory()
+
+@asynccontextmanager
+async def async_session_scope(commit=False):
+    """Versione asincrona di session_scope."""
+    session = get_async_session()
+    try:
+        yield session
+        if commit:
+            await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+def collect_pool_stats(engine, pool_stats):
+    """Contatori di pool_stats e stato corrente del pool di engine (se creato e a coda)."""
+    stats = {
+        "checkouts": pool_stats.checkouts,
+        "connects": pool_stats.connects,
+        "invalidations": pool_stats.invalidations,
+        "waits": pool_stats.waits,
+        "wait_time": pool_stats.wait_time,
+        "max_wait_time": pool_stats.max_wait_time,
+    }
+
+    pool = engine.pool if engine is not None else None
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return stats
+
+def get_pool_stats():
+    """Statistiche correnti dei pool di connessioni degli engine condivisi: {"sync": {...}, "async": {...}}.
+
+    Lette a ogni scrape delle metriche: gli engine non vengono creati solo per misurarli.
+    """
+    async_engine = _async_engine
+    return {
+        "sync": collect_pool_stats(_engine, _pool_stats),
+        "async": collect_pool_stats(async_engine.sync_engine if async_engine is not None else None, _async_pool_stats),
+    }
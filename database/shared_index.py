@@ -0,0 +1,76 @@
+import time
+import asyncio
+import threading
+
+from sqlalchemy import func
+
+from database.models import Game
+
+def catalog_signature(session):
+    """Firma del catalogo dei giochi: cambia quando giochi vengono aggiunti, eliminati o riscritti dal seeder.
+
+    updated_at cambia anche quando una sincronizzazione rinomina un gioco o ne
+    riscrive tag, generi e publisher senza toccarne il punteggio.
+    """
+    count, max_app_id, score_sum, updated_at = session.query(
+        func.count(Game.app_id), func.max(Game.app_id), func.sum(Game.score), func.max(Game.updated_at),
+    ).one()
+    return count, max_app_id, round(score_sum or 0.0, 6), updated_at
+
+class SharedIndex:
+    """Indice in memoria condiviso dal processo (nomi dei giochi, filtri), ricostruito quando il catalogo cambia.
+
+    Ogni ttl secondi si confronta la firma del catalogo e l'indice viene
+    ricostruito solo se è cambiata. Una sola richiesta alla volta lo costruisce:
+    le altre aspettano e usano l'indice appena costruito.
+
+    I chiamanti sincroni si escludono con un threading.Lock. Quelli asincroni
+    devono usare get_async, che li mette in coda su un asyncio.Lock prima di
+    run_sync: dentro run_sync la costruzione cede il controllo all'event loop, e
+    una seconda richiesta sullo stesso thread si bloccherebbe sul threading.Lock.
+    """
+
+    def __init__(self, build, ttl):
+        self.build = build  # funzione(session) -> indice con l'attributo built_at
+        self.ttl = ttl
+        self.index = None
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def is_fresh(self, index):
+        return index is not None and time.monotonic() - index.built_at <= self.ttl
+
+    def get(self, session, force=False):
+        """L'indice, controllato o ricostruito con session se è scaduto (sempre ricostruito con force)."""
+        index = self.index
+        if not force and self.is_fresh(index):
+            return index
+        with self._lock:
+            return self._refresh(session, force)
+
+    async def get_async(self, session, force=False):
+        """Come get, con una AsyncSession."""
+        index = self.index
+        if not force and self.is_fresh(index):
+            return index
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            return await session.run_sync(self.get, force)
+
+    def _refresh(self, session, force):
+        index = self.index
+        if not force and self.is_fresh(index):
+            return index  # ricostruito da un'altra richiesta mentre questa aspettava
+        signature = catalog_signature(session)
+        if not force and index is not None and index.signature == signature:
+            # Catalogo invariato: l'indice resta valido per un altro intervallo
+            index.built_at = time.monotonic()
+            return index
+        index = self.build(session)
+        index.signature = signature
+        self.index = index
+        return index
+
+    def clear(self):
+        self.index = None
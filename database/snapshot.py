@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.schema import CreateTable
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import *
+from database.session import create_database_engine, get_database_url
+
+# Righe lette dal database e scritte nella copia per ogni blocco
+EXPORT_BATCH_SIZE = 5000
+
+def copy_table(source_connection, target_connection, table, batch_size=EXPORT_BATCH_SIZE):
+    """Copia tutte le righe di una tabella a blocchi, senza caricarla interamente in memoria."""
+    rows = 0
+    result = source_connection.execution_options(yield_per=batch_size).execute(select(table))
+    for partition in result.mappings().partitions():
+        target_connection.execute(table.insert(), [dict(row) for row in partition])
+        rows += len(partition)
+    return rows
+
+def export_snapshot(source_engine, path, batch_size=EXPORT_BATCH_SIZE):
+    """Esporta il catalogo in un file SQLite da aprire in sola lettura.
+
+    Le tabelle vengono create senza indici, riempite e solo alla fine
+    indicizzate. Il file viene scritto accanto alla destinazione e poi
+    sostituito in un colpo solo, così chi legge la copia precedente non
+    vede mai un file a metà. Restituisce il numero di righe per tabella.
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    target_engine = create_engine(f"sqlite:///{tmp_path}")
+    counts = {}
+    try:
+        with source_engine.connect() as source_connection, target_engine.begin() as target_connection:
+            # Durante l'esportazione il file non serve a nessuno: niente journal né fsync
+            target_connection.exec_driver_sql("PRAGMA journal_mode = OFF")
+            target_connection.exec_driver_sql("PRAGMA synchronous = OFF")
+
+            for table in Base.metadata.sorted_tables:
+                target_connection.execute(CreateTable(table))
+                counts[table.name] = copy_table(source_connection, target_connection, table, batch_size)
+
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(target_connection)
+
+            # Statistiche per il pianificatore delle query
+            target_connection.exec_driver_sql("ANALYZE")
+
+        with target_engine.connect() as target_connection:
+            target_connection.exec_driver_sql("PRAGMA journal_mode = DELETE")
+            target_connection.execute(text("VACUUM"))
+    finally:
+        target_engine.dispose()
+
+    os.replace(tmp_path, path)
+    return counts
+
+def run_export():
+    """Esporta il catalogo in una copia SQLite locale."""
+    arg_parser = argparse.ArgumentParser(description="Esporta il catalogo in un file SQLite in sola lettura.")
+    arg_parser.add_argument("path", help="file SQLite da creare (CATALOG_SQLITE_PATH per le azioni)")
+    arg_parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = arg_parser.parse_args()
+
+    # Si legge sempre dal database del .env, anche se CATALOG_SQLITE_PATH è impostata
+    source_engine = create_database_engine(get_database_url())
+    start = time.perf_counter()
+    counts = export_snapshot(source_engine, args.path, args.batch_size)
+    source_engine.dispose()
+
+    for table_name, rows in counts.items():
+        print(f"{table_name}: {rows} righe")
+    print(f"Copia scritta in {args.path} ({os.path.getsize(args.path) / 1024 / 1024:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+# Esegui l'esportazione
+if __name__ == "__main__":
+    run_export()
@@ -0,0 +1,316 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+from database.models import compute_game_score
+from database.dataset_stream import iter_games, name_hash
+from database.normalize import (
+    DIMENSION_FIELDS, GAME_FIELDS, MAX_DESCRIPTION_BYTES, VALID_NAME_PATTERN,
+    content_hash, parse_release_date, safe_get, steam_app_id,
+)
+
+# Copia colonnare di games.json in tabelle Parquet, da convertire una volta sola:
+#
+#   python database/staging.py [database/dataset/games.json] [database/dataset/staging]
+#
+# Ogni tabella è una cartella con un file per blocco di STAGING_BATCH_SIZE giochi
+# (games, una tabella per ogni dimensione, tag, pacchetti, film e screenshot).
+# load_staged_games applica filtri e normalizzazione del seeder sulle colonne con
+# pandas e restituisce gli stessi giochi normalizzati di normalize.normalize_games:
+#
+#   python database/seeders.py --staging
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset')
+STAGING_DIR = os.path.join(DATASET_DIR, 'staging')
+STAGING_BATCH_SIZE = 10_000
+
+# Campi di games.json copiati nella tabella games (le chiavi di GAME_FIELDS più nome e data)
+GAME_SCHEMA = pa.schema(
+    [('source_id', pa.string()), ('name', pa.string()), ('release_date', pa.string())]
+    + [(field, pa.string()) for field in (
+        'estimated_owners', 'detailed_description', 'short_description', 'reviews', 'header_image', 'website',
+        'support_url', 'support_email', 'metacritic_url', 'score_rank', 'notes',
+    )]
+    + [(field, pa.int64()) for field in (
+        'peak_ccu', 'required_age', 'dlc_count', 'metacritic_score', 'user_score', 'positive', 'negative',
+        'achievements', 'recommendations', 'average_playtime_forever', 'average_playtime_2weeks',
+        'median_playtime_forever', 'median_playtime_2weeks',
+    )]
+    + [('price', pa.float64())]
+    + [(field, pa.bool_()) for field in ('windows', 'mac', 'linux')]
+)
+NAME_SCHEMA = pa.schema([('source_id', pa.string()), ('name', pa.string())])
+URL_SCHEMA = pa.schema([('source_id', pa.string()), ('url', pa.string())])
+LINK_SCHEMAS = {
+    **{field: NAME_SCHEMA for field in DIMENSION_FIELDS},
+    'tags': pa.schema([('source_id', pa.string()), ('name', pa.string()), ('value', pa.int64())]),
+    'packages': pa.schema([('source_id', pa.string()), ('package', pa.int64()), ('title', pa.string()), ('description', pa.string())]),
+    'subpackages': pa.schema([
+        ('source_id', pa.string()), ('package', pa.int64()),
+        ('title', pa.string()), ('description', pa.string()), ('price', pa.float64()),
+    ]),
+    'movies': URL_SCHEMA,
+    'screenshots': URL_SCHEMA,
+}
+
+def coerce(value, data_type):
+    """Converte un valore di games.json nel tipo della colonna (None se vuoto)."""
+    if value is None or value == '':
+        return None if data_type != pa.string() else value
+    if data_type == pa.string():
+        return str(value)
+    if data_type == pa.int64():
+        return int(value)
+    if data_type == pa.float64():
+        return float(value)
+    return bool(value)
+
+def game_staging_rows(source_id, game):
+    """Righe di staging di un gioco: tabella -> lista di dizionari."""
+    rows = {'games': [{
+        field.name: source_id if field.name == 'source_id' else coerce(game.get(field.name), field.type)
+        for field in GAME_SCHEMA
+    }]}
+    for field in DIMENSION_FIELDS:
+        rows[field] = [{'source_id': source_id, 'name': str(name)} for name in game.get(field, [])]
+    tags = game.get('tags')
+    rows['tags'] = [
+        {'source_id': source_id, 'name': str(name), 'value': coerce(value, pa.int64())}
+        for name, value in (tags.items() if isinstance(tags, dict) else [])
+    ]
+    rows['packages'] = []
+    rows['subpackages'] = []
+    for package_index, package in enumerate(game.get('packages', [])):
+        rows['packages'].append({
+            'source_id': source_id, 'package': package_index,
+            'title': coerce(package.get('title'), pa.string()), 'description': coerce(package.get('description'), pa.string()),
+        })
+        rows['subpackages'].extend({
+            'source_id': source_id, 'package': package_index,
+            'title': coerce(subpackage.get('title'), pa.string()),
+            'description': coerce(subpackage.get('description'), pa.string()),
+            'price': coerce(subpackage.get('price'), pa.float64()),
+        } for subpackage in package.get('subpackages', []))
+    for field in ('movies', 'screenshots'):
+        rows[field] = [{'source_id': source_id, 'url': coerce(url, pa.string())} for url in game.get(field, [])]
+    return rows
+
+def write_part(staging_dir, part, batch):
+    schemas = {'games': GAME_SCHEMA, **LINK_SCHEMAS}
+    for table_name, schema in schemas.items():
+        table = pa.Table.from_pylist(batch[table_name], schema=schema)
+        pq.write_table(table, os.path.join(staging_dir, table_name, f"part-{part:05d}.parquet"))
+
+def export_staging(json_path, staging_dir=STAGING_DIR, batch_size=STAGING_BATCH_SIZE):
+    """Converte games.json nelle tabelle Parquet di staging; restituisce il numero di giochi."""
+    tmp_dir = staging_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    for table_name in ['games', *LINK_SCHEMAS]:
+        os.makedirs(os.path.join(tmp_dir, table_name))
+
+    games = 0
+    part = 0
+    batch = {table_name: [] for table_name in ['games', *LINK_SCHEMAS]}
+    for source_id, game in iter_games(json_path):
+        for table_name, rows in game_staging_rows(str(source_id), game).items():
+            batch[table_name].extend(rows)
+        games += 1
+        if games % batch_size == 0:
+            write_part(tmp_dir, part, batch)
+            batch = {table_name: [] for table_name in batch}
+            part += 1
+    if batch['games'] or part == 0:
+        write_part(tmp_dir, part, batch)
+
+    # La copia precedente viene sostituita solo a conversione completata
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.replace(tmp_dir, staging_dir)
+    return games
+
+def staging_parts(staging_dir):
+    """Nomi dei blocchi di staging nell'ordine di games.json (uguali in tutte le tabelle)."""
+    paths = sorted(glob.glob(os.path.join(staging_dir, 'games', "*.parquet")))
+    if not paths:
+        raise FileNotFoundError(f"Tabella di staging games non trovata in {staging_dir}")
+    return [os.path.basename(path) for path in paths]
+
+def read_part(staging_dir, table_name, part, columns=None):
+    """Un blocco di una tabella di staging (solo columns, se indicate)."""
+    path = os.path.join(staging_dir, table_name, part)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Blocco di staging {table_name}/{part} non trovato in {staging_dir}")
+    return pq.read_table(path, columns=columns)
+
+def blank_to_none(column):
+    """safe_get sulle colonne di testo: le stringhe vuote o di soli spazi diventano None."""
+    return column.mask(column.str.strip().eq('').fillna(False), None)
+
+def unique_names(games, seen_names):
+    """I giochi di un blocco con un nome non ancora incontrato, come unique_games; aggiorna seen_names."""
+    keep = []
+    for name in games['name'].fillna('').tolist():
+        key = name.strip().lower()
+        keep.append(bool(key) and name_hash(key) not in seen_names)
+        if keep[-1]:
+            seen_names.add(name_hash(key))
+    return games[keep]
+
+def top_source_ids(staging_dir, parts, limit):
+    """source_id dei migliori limit giochi per log(recensioni + 1), come top_games; a parità vale l'ordine del file.
+
+    Legge solo le colonne che servono alla scelta, un blocco alla volta: in memoria restano
+    al più limit giochi più quelli del blocco corrente.
+    """
+    seen_names = set()
+    top = None
+    for part in parts:
+        games = read_part(staging_dir, 'games', part, ['source_id', 'name', 'positive', 'negative'])
+        games = unique_names(games.to_pandas(types_mapper=pd.ArrowDtype), seen_names)
+        reviews = games['positive'].fillna(0) + games['negative'].fillna(0)
+        value = pd.Series(
+            np.where(reviews > 0, np.log(reviews.to_numpy(dtype=float) + 1), 0.0), index=games['source_id'].tolist(),
+        )
+        top = pd.concat([top, value]).sort_values(ascending=False, kind='stable').head(max(limit, 0))
+    return top.index.tolist()
+
+def valid_games(games, english_ids):
+    """I giochi che superano i filtri di build_game_row: inglese, lunghezza della descrizione, nome valido."""
+    english = games['source_id'].isin(english_ids)
+    description_ok = games['description_bytes'].fillna(0).le(MAX_DESCRIPTION_BYTES)
+    names = blank_to_none(games['name']).astype(object)
+    valid_name = names.str.match(VALID_NAME_PATTERN).fillna(False).astype(bool)
+    for name in names[english & description_ok & ~valid_name]:
+        print(f"Nome del gioco '{name}' non valido (contenuto non latino). Salto il gioco.")
+    return games[english & description_ok & valid_name]
+
+def parse_release_dates(release_dates):
+    """parse_release_date sull'intera colonna: il formato di Steam in blocco, gli altri uno alla volta."""
+    release_dates = blank_to_none(release_dates).astype(object)
+    parsed = pd.to_datetime(release_dates.str.replace(',', '', regex=False), format="%b %d %Y", errors='coerce')
+    result = parsed.dt.date.astype(object).where(parsed.notna(), None)
+    fallback = release_dates.notna() & parsed.isna()
+    result[fallback] = [parse_release_date(release_date) for release_date in release_dates[fallback]]
+    return result
+
+def game_rows(games):
+    """Colonne della tabella games calcolate in blocco (come build_game_row)."""
+    rows = pd.DataFrame(index=games.index)
+    for column, field in GAME_FIELDS.items():
+        rows[column] = blank_to_none(games[field]) if games[field].dtype == pd.ArrowDtype(pa.string()) else games[field]
+    rows['name'] = games['name'].str.replace(r"[®™]", "", regex=True)
+    rows['release_date'] = parse_release_dates(games['release_date'])
+
+    # compute_game_score con math.log: np.log può differire nell'ultima cifra e cambierebbe source_hash
+    rows['score'] = [
+        compute_game_score(positive, negative)
+        for positive, negative in zip(games['positive'].fillna(0).tolist(), games['negative'].fillna(0).tolist())
+    ]
+    return rows
+
+def grouped_rows(table, source_ids, columns, blank_columns=()):
+    """source_id -> lista di righe (dizionari con columns) per i giochi scelti, nell'ordine del file."""
+    table = table.filter(pc.is_in(table['source_id'], value_set=source_ids))
+    data = table.select(['source_id', *columns]).to_pydict()
+    for column in blank_columns:
+        data[column] = [safe_get(value) for value in data[column]]
+    grouped = {}
+    for source_id, *values in zip(*data.values()):
+        grouped.setdefault(source_id, []).append(dict(zip(columns, values)))
+    return grouped
+
+def normalized_part(staging_dir, part, select):
+    """Giochi normalizzati di un blocco di staging, nell'ordine del file; select(giochi) sceglie quelli da tenere."""
+    games_table = read_part(staging_dir, 'games', part)
+    games_table = games_table.append_column(
+        'description_bytes', pc.binary_length(pc.fill_null(games_table['detailed_description'], ''))
+    )
+    games = select(games_table.to_pandas(types_mapper=pd.ArrowDtype))
+
+    supported_languages = read_part(staging_dir, 'supported_languages', part)
+    english_ids = pc.filter(supported_languages['source_id'], pc.equal(supported_languages['name'], 'English'))
+    games = valid_games(games, english_ids.to_pandas())
+    source_ids = games['source_id'].tolist()
+    rows = game_rows(games)
+
+    # Righe collegate dei soli giochi scelti, raggruppate per gioco
+    value_set = pa.array(source_ids, pa.string())
+    links = {table_name: read_part(staging_dir, table_name, part) for table_name in LINK_SCHEMAS}
+    names = {field: grouped_rows(links[field], value_set, ['name']) for field in DIMENSION_FIELDS}
+    tags = grouped_rows(links['tags'], value_set, ['name', 'value'])
+    packages = grouped_rows(links['packages'], value_set, ['package', 'title', 'description'], ['title', 'description'])
+    subpackages = grouped_rows(links['subpackages'], value_set, ['package', 'title', 'description', 'price'], ['title', 'description'])
+    media = {field: grouped_rows(links[field], value_set, ['url'], ['url']) for field in ('movies', 'screenshots')}
+
+    for source_id, game_row in zip(source_ids, rows.to_dict('records')):
+        game_subpackages = {}
+        for subpackage in subpackages.get(source_id, []):
+            game_subpackages.setdefault(subpackage.pop('package'), []).append(subpackage)
+
+        normalized = {
+            'source_id': source_id,
+            'game': game_row,
+            'packages': [
+                ({'title': package['title'], 'description': package['description']}, game_subpackages.get(package['package'], []))
+                for package in packages.get(source_id, [])
+            ],
+            'movies': [movie['url'] for movie in media['movies'].get(source_id, [])],
+            'screenshots': [screenshot['url'] for screenshot in media['screenshots'].get(source_id, [])],
+            'tags': [(tag['name'], tag['value']) for tag in tags.get(source_id, [])],
+        }
+        for field in DIMENSION_FIELDS:
+            normalized[field] = [record['name'] for record in names[field].get(source_id, [])]
+
+        game_row['steam_app_id'] = steam_app_id(source_id)
+        game_row['source_hash'] = content_hash(normalized)
+        yield normalized
+
+def load_staged_games(staging_dir=STAGING_DIR, limit=None):
+    """Giochi normalizzati (vedi normalize.normalize_game) letti dalle tabelle di staging.
+
+    Le tabelle sono lette un blocco alla volta. Con limit None i giochi escono nell'ordine
+    del file; con limit una prima lettura delle sole colonne di nome e recensioni sceglie
+    i migliori, che escono dal migliore dopo aver letto tutti i blocchi (al più limit in memoria).
+    """
+    parts = staging_parts(staging_dir)
+    if limit is None:
+        seen_names = set()
+        for part in parts:
+            yield from normalized_part(staging_dir, part, lambda games: unique_names(games, seen_names))
+        return
+
+    ranked_ids = top_source_ids(staging_dir, parts, limit)
+    selected_ids = set(ranked_ids)
+    selected = {}
+    for part in parts:
+        for normalized in normalized_part(staging_dir, part, lambda games: games[games['source_id'].isin(selected_ids)]):
+            selected[normalized['source_id']] = normalized
+    for source_id in ranked_ids:
+        if source_id in selected:
+            yield selected.pop(source_id)
+
+def run_export():
+    """Converti games.json nelle tabelle di staging."""
+    arg_parser = argparse.ArgumentParser(description="Converte games.json in tabelle Parquet di staging per il seeder.")
+    arg_parser.add_argument("json_path", nargs="?", default=os.path.join(DATASET_DIR, 'games.json'))
+    arg_parser.add_argument("staging_dir", nargs="?", default=STAGING_DIR)
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    games = export_staging(args.json_path, args.staging_dir)
+    print(f"{games} giochi convertiti in {args.staging_dir} in {time.perf_counter() - start:.1f}s")
+
+# Esegui la conversione
+if __name__ == "__main__":
+    run_export()
@@ -1,31 +1,9 @@
-import os
-from dotenv import load_dotenv
 from sqlalchemy import func
-from sqlalchemy.orm import sessionmaker
 from models import *
-from sqlalchemy import create_engine
-
-# Carica le variabili di ambiente dal file .env
-load_dotenv()
-
-# Recupera gli elementi dell'URL del database
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
-DB_DRIVER = os.getenv("DB_DRIVER")
-
-# Costruisci l'URL del database
-DATABASE_URL = f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-
-# Create an engine and sessionmaker
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-
-# Helper function to get the session
+from session import session_scope
 
 # Query per contare la distribuzione dei user_score, score_rank e reviews
-with Session() as session:
+with session_scope() as session:
     # Query per user_score
     score_counts = session.query(Game.user_score, func.count(Game.user_score)) \
         .group_by(Game.user_score) \
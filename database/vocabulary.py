@@ -0,0 +1,91 @@
+import time
+import asyncio
+import threading
+
+from sqlalchemy import func
+
+from database.models import *
+
+def normalize_name(name):
+    """Normalizza un nome per il confronto: minuscolo e spazi compattati."""
+    return " ".join(str(name).split()).lower()
+
+class Vocabulary:
+    """Vocabolario di una dimensione del catalogo (tag, publisher, ...) tenuto in memoria.
+
+    Mappa i nomi normalizzati al nome canonico e all'id, così la validazione
+    è una lookup O(1) senza query. Il vocabolario viene ricaricato quando il
+    catalogo cambia: il controllo (numero di righe e id massimo) viene fatto
+    al massimo una volta ogni ``refresh_interval`` secondi.
+
+    Nel server asincrono delle azioni si usano lookup_async e refresh_async, che
+    interrogano il database con ``async_session_scope`` senza bloccare l'event loop.
+    """
+
+    def __init__(self, session_factory, model, id_column, refresh_interval=300, async_session_scope=None):
+        self.session_factory = session_factory
+        self.async_session_scope = async_session_scope
+        self.model = model
+        self.id_column = id_column
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._async_lock = None
+        self._entries = {}  # nome normalizzato -> (nome canonico, id)
+        self._signature = None
+        self._checked_at = None
+
+    def _load(self, session):
+        signature = tuple(session.query(func.count(self.id_column), func.max(self.id_column)).one())
+        if signature != self._signature:
+            entries = {}
+            for entry_id, name in session.query(self.id_column, self.model.name):
+                if name:
+                    entries.setdefault(normalize_name(name), (name, entry_id))
+            self._entries = entries
+            self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _is_fresh(self):
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_interval
+
+    def refresh(self, force=False):
+        """Ricarica il vocabolario se il catalogo è cambiato (o sempre, con force)."""
+        with self._lock:
+            if not force and self._is_fresh():
+                return
+            if force:
+                self._signature = None
+            with self.session_factory() as session:
+                self._load(session)
+
+    async def refresh_async(self, force=False):
+        """Come refresh, con una sessione asincrona; un solo controllo alla volta tra le richieste concorrenti."""
+        if not force and self._is_fresh():
+            return
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if not force and self._is_fresh():
+                return
+            if force:
+                self._signature = None
+            async with self.async_session_scope() as session:
+                await session.run_sync(self._load)
+
+    def lookup(self, name):
+        """Restituisce (nome canonico, id) oppure None se il nome non esiste."""
+        self.refresh()
+        return self._entries.get(normalize_name(name))
+
+    async def lookup_async(self, name):
+        """Come lookup, senza query sincrone sull'event loop."""
+        await self.refresh_async()
+        return self._entries.get(normalize_name(name))
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def __len__(self):
+        self.refresh()
+        return len(self._entries)
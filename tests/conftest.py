@@ -0,0 +1,25 @@
+import os
+import sys
+import importlib
+
+import pytest
+
+# Ottieni la directory principale del progetto
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_dir)
+
+from database import session as db_session
+from database.models import Base
+
+
+@pytest.fixture
+def seeders(tmp_path):
+    """Il modulo seeders legato a un database SQLite vuoto."""
+    db_session.configure(f"sqlite:///{tmp_path / 'catalog.sqlite'}")
+    Base.metadata.create_all(db_session.get_engine())
+    if 'database.seeders' in sys.modules:
+        module = importlib.reload(sys.modules['database.seeders'])
+    else:
+        module = importlib.import_module('database.seeders')
+    yield module
+    module.session.close()
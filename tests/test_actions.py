@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from rasa_sdk.executor import CollectingDispatcher
+
+from database.normalize import normalize_game
+
+
+class FakeTracker:
+    def __init__(self, **slots):
+        self.slots = slots
+
+    def get_slot(self, name):
+        return self.slots.get(name)
+
+
+@pytest.fixture
+def actions(seeders, monkeypatch):
+    """Il modulo delle azioni sul catalogo di prova, senza endpoint delle metriche."""
+    import actions.instrumentation
+    import actions.actions
+    from database import name_index
+
+    monkeypatch.setattr(actions.instrumentation, "_metrics_server_started", True)
+    name_index._shared_index.clear()
+    yield actions.actions
+    name_index._shared_index.clear()
+
+
+def test_game_info_for_a_game_deleted_after_the_index_was_built(seeders, actions):
+    seeders.seed_normalized([normalize_game("70", {
+        'name': "Half-Life", 'release_date': "Nov 8, 1998", 'supported_languages': ["English"],
+        'positive': 10, 'negative': 1,
+    })])
+
+    def ask(game_name):
+        dispatcher = CollectingDispatcher()
+        asyncio.run(actions.ActionProvideGameInfo().run(dispatcher, FakeTracker(game=game_name), {}))
+        return [message.get("text") or "" for message in dispatcher.messages]
+
+    assert "Half-Life" in ask("Half-Life")[0]
+
+    # Una sincronizzazione elimina il gioco: l'indice dei nomi, ancora valido, lo conosce
+    seeders.sync_normalized([])
+    assert ask("Half-Life") == ["🚫 Sorry, I couldn't retrieve details for the game 'Half-Life'"]
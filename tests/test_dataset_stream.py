@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+
+from database.dataset_stream import GameStream, iter_games, top_games, unique_games
+
+DATASET = {
+    "10": {"name": "Half-Life", "positive": 12345, "negative": 67, "price": 9.99, "tags": {"FPS": 1200}},
+    "20": {"name": "Æsir — «Ragnarök» 🎮", "positive": 0, "negative": 0, "screenshots": [], "packages": [{"title": "x\"y"}]},
+    "30": {"name": "half-life ", "positive": 1, "negative": 100000, "notes": None, "windows": True},
+    "40": {"name": "", "positive": 999999},
+    "50": {"name": "Portal", "positive": 12345, "negative": 67, "price": 0},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_stream_matches_json_load_at_any_chunk_boundary(chunk_size, indent):
+    text = json.dumps(DATASET, indent=indent, ensure_ascii=False)
+    assert list(GameStream(io.StringIO(text), chunk_size)) == list(DATASET.items())
+
+
+@pytest.mark.parametrize("text", ["{}", "  {\n }\n"])
+def test_empty_object(text):
+    assert list(GameStream(io.StringIO(text), 1)) == []
+
+
+@pytest.mark.parametrize("text", ['{"1": {"name": "A"} "2": {}}', '[{"name": "A"}]', '{"1": {"name": "A"}'])
+def test_malformed_file_raises(text):
+    with pytest.raises(ValueError):
+        list(GameStream(io.StringIO(text), 3))
+
+
+def test_number_split_across_chunks_is_not_truncated():
+    text = '{"1": 1234567890, "2": -1.5e10}'
+    for chunk_size in range(1, len(text) + 1):
+        assert list(GameStream(io.StringIO(text), chunk_size)) == [("1", 1234567890), ("2", -1.5e10)]
+
+
+def test_iter_games_reads_a_file(tmp_path):
+    path = tmp_path / "games.json"
+    path.write_text(json.dumps(DATASET, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_games(path, chunk_size=4)) == list(DATASET.items())
+
+
+def test_unique_games_keeps_the_first_of_each_name():
+    names = [game["name"] for _, game in unique_games(DATASET.items())]
+    assert names == ["Half-Life", "Æsir — «Ragnarök» 🎮", "Portal"]
+
+
+def test_top_games_orders_by_key_and_keeps_file_order_on_ties():
+    positive = lambda game: game["positive"]
+    games = list(DATASET.items())
+
+    assert [app_id for app_id, _ in top_games(games, 3, positive)] == ["40", "10", "50"]
+    assert [app_id for app_id, _ in top_games(games, 10, positive)] == ["40", "10", "50", "30", "20"]
+    assert list(top_games(games, 0, positive)) == []
+    assert list(top_games(iter(games), None, positive)) == games
@@ -0,0 +1,60 @@
+import pytest
+
+from database import db_queries
+from database.models import Game
+from database.facet_index import FacetIndex
+from database.normalize import normalize_game
+
+
+@pytest.fixture
+def catalog(seeders):
+    """30 giochi con punteggi distinti; tag, publisher e generi assegnati per divisibilità dell'indice."""
+    games = []
+    for number in range(1, 31):
+        games.append(normalize_game(str(number), {
+            'name': f"Game {number}",
+            'release_date': "Oct 21, 2015",
+            'supported_languages': ["English"],
+            'positive': number * 10,
+            'negative': 1,
+            'tags': {tag: 1 for tag, divisor in (("Action", 2), ("Puzzle", 3), ("Indie", 7)) if number % divisor == 0},
+            'publishers': ["Valve"] if number % 5 in (0, 1) else ["Other Studio"],
+            'genres': ["Strategy"] if number < 20 else ["Casual"],
+        }))
+    seeders.seed_normalized(games)
+    return seeders.session
+
+
+FILTERS = [
+    {'tags': ["Action"]},
+    {'tags': ["Action", "Puzzle"]},
+    {'tags': ["action", "Missing"]},
+    {'tags': ["Action"], 'publishers': ["Valve"]},
+    {'tags': ["Action", "Indie"], 'publishers': ["Valve"], 'genres': ["Strategy"]},
+    {'tags': ["Puzzle"], 'genres': ["Casual", "Strategy"]},
+    {'tags': ["Missing"]},
+]
+
+
+def sql_top_ids(session, filters, limit=None):
+    games = db_queries.get_top_games_filtered(
+        session, filters.get('publishers'), filters.get('tags'), limit, genre_names=filters.get('genres'),
+    )
+    return [game.app_id for game in games]
+
+
+def test_top_ids_match_the_sql_joins(catalog):
+    index = FacetIndex.build(catalog)
+    for filters in FILTERS:
+        assert index.top_ids(filters) == sql_top_ids(catalog, filters), filters
+        assert index.top_ids(filters, 3) == sql_top_ids(catalog, filters)[:3], filters
+
+
+def test_or_within_and_across_dimensions_in_popularity_order(catalog):
+    index = FacetIndex.build(catalog)
+    names = dict(catalog.query(Game.app_id, Game.name))
+    found = [names[app_id] for app_id in index.top_ids({'tags': ["Action", "Puzzle"], 'publishers': ["Valve"]})]
+
+    # Action o Puzzle, e Valve (numeri che finiscono per 0, 1, 5 o 6), dal più recensito
+    assert found == [f"Game {number}" for number in (30, 26, 21, 20, 16, 15, 10, 6)]
+    assert index.top_ids({}) == index.app_ids.tolist()
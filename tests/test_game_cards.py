@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database import db_queries
+from database.models import Game, StoredGameCard
+from database.normalize import normalize_game
+
+
+def steam_game(source_id, name, publishers, developers, languages):
+    return normalize_game(source_id, {
+        'name': name,
+        'release_date': "Oct 21, 2015",
+        'supported_languages': languages,
+        'positive': 10,
+        'negative': 1,
+        'publishers': publishers,
+        'developers': developers,
+    })
+
+
+@contextmanager
+def count_queries(session):
+    statements = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_game_cards_in_requested_order_with_four_queries(seeders):
+    seeders.seed_normalized([
+        steam_game(str(number), f"Game {number}", ["Valve", f"Publisher {number}"], [f"Studio {number}"], ["English", "Italian"])
+        for number in range(1, 41)
+    ])
+    session = seeders.session
+    ids = {name: app_id for app_id, name in session.query(Game.app_id, Game.name)}
+    requested = [ids["Game 3"], ids["Game 1"], 999_999, ids["Game 2"]] + [ids[f"Game {number}"] for number in range(10, 40)]
+
+    with count_queries(session) as statements:
+        cards = db_queries.get_game_cards(session, requested)
+
+    assert len(statements) == 4
+    assert [card.app_id for card in cards] == [app_id for app_id in requested if app_id != 999_999]
+    first = cards[0]
+    assert first.name == "Game 3"
+    assert first.publishers == ("Valve", "Publisher 3")
+    assert first.developers == ("Studio 3",)
+    assert first.supported_languages == ("English", "Italian")
+
+
+def test_no_app_ids_no_queries(seeders):
+    with count_queries(seeders.session) as statements:
+        assert db_queries.get_game_cards(seeders.session, []) == []
+    assert statements == []
+
+
+def test_rebuild_rewrites_only_changed_cards(seeders):
+    from database.game_cards import get_stored_game_cards, rebuild_game_cards
+
+    seeders.seed_normalized([
+        steam_game(str(number), f"Game {number}", ["Valve"], ["Valve"], ["English"]) for number in range(1, 6)
+    ])
+    session = seeders.session
+    cards = {card.app_id: card for card in session.query(StoredGameCard)}
+    assert len(cards) == 5
+    updated_at = {app_id: card.updated_at for app_id, card in cards.items()}
+
+    assert rebuild_game_cards(session) == (0, 0)
+
+    changed = session.query(Game).filter(Game.name == "Game 2").one()
+    changed.price = 4.99
+    session.add(StoredGameCard(app_id=999_999, card_text="stale", source_hash="x"))
+    session.commit()
+
+    assert rebuild_game_cards(session, [app_id for app_id in cards]) == (1, 0)
+    assert "$4.99" in get_stored_game_cards(session, [changed.app_id])[0].card_text
+    assert [app_id for app_id, card in cards.items() if card.updated_at != updated_at[app_id]] == [changed.app_id]
+
+    # La ricostruzione completa elimina le schede dei giochi che non esistono più
+    assert rebuild_game_cards(session) == (0, 1)
+    assert session.get(StoredGameCard, 999_999) is None
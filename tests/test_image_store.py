@@ -0,0 +1,138 @@
+import io
+import socket
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import httpx
+import pytest
+from PIL import Image
+
+from actions import image_store as image_store_module
+from actions.image_store import ImageStore
+
+
+def png_bytes(width, height, color=(200, 30, 30)):
+    data = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(data, "PNG")
+    return data.getvalue()
+
+
+class FakeCdnHandler(BaseHTTPRequestHandler):
+    """Risponde come la CDN di Steam: un'immagine, una pagina HTML o 404."""
+
+    routes = {
+        "/cover.png": ("image/png", png_bytes(920, 430)),
+        "/page.html": ("text/html; charset=utf-8", b"<html>not an image</html>"),
+        "/fake.png": ("image/png", b"not really a png"),
+    }
+
+    def do_GET(self):
+        if self.path not in self.routes:
+            self.send_error(404)
+            return
+        content_type, body = self.routes[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cdn():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCdnHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def fetch_all(store_dir, requests, max_width=460):
+    async def main():
+        async with httpx.AsyncClient() as client:
+            store = ImageStore(str(store_dir), 10 * 1024 * 1024, max_width, client)
+            statuses = [await store.fetch(app_id, url) for app_id, url in requests]
+            return store, statuses
+    return asyncio.run(main())
+
+
+def test_fetch_statuses_and_resized_copy(tmp_path, cdn):
+    store, statuses = fetch_all(tmp_path, [
+        (10, f"{cdn}/cover.png"),
+        (20, f"{cdn}/page.html"),
+        (30, f"{cdn}/missing.png"),
+        (40, "not a url"),
+        (50, f"{cdn}/fake.png"),
+    ], max_width=230)
+
+    assert statuses == ["image", "not_image", "error", "invalid", "not_image"]
+    assert store.contains(10)
+    assert not any(store.contains(app_id) for app_id in (20, 30, 40, 50))
+    with Image.open(store.path(10)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (230, 108)
+    assert store.total_bytes == (tmp_path / "10.jpg").stat().st_size
+
+
+def test_stored_images_are_served_over_http(tmp_path, cdn):
+    fetch_all(tmp_path, [(10, f"{cdn}/cover.png")])
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    threading.Thread(target=image_store_module.serve, args=(str(tmp_path), port), daemon=True).start()
+
+    for _ in range(50):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/10.jpg", timeout=1) as response:
+                assert response.headers["Content-Type"] == "image/jpeg"
+                assert response.read() == (tmp_path / "10.jpg").read_bytes()
+                break
+        except urllib.error.URLError:
+            threading.Event().wait(0.05)
+    else:
+        pytest.fail("il server delle immagini non risponde")
+
+
+def test_least_recently_used_image_is_evicted(tmp_path):
+    data = png_bytes(300, 200)
+    probe = ImageStore(str(tmp_path / "probe"), 10 * 1024 * 1024)
+    probe.store(1, io.BytesIO(data))
+    size = probe.total_bytes
+
+    store = ImageStore(str(tmp_path / "store"), int(size * 2.5))
+    assert store.store(1, io.BytesIO(data)) == "image"
+    assert store.store(2, io.BytesIO(data)) == "image"
+    assert store.contains(1)  # 2 diventa il meno recente
+    assert store.store(3, io.BytesIO(data)) == "image"
+
+    assert store.contains(1) and store.contains(3)
+    assert not store.contains(2)
+    assert not (tmp_path / "store" / "2.jpg").exists()
+    assert store.total_bytes == 2 * size
+
+    # Dopo un riavvio il totale viene ricostruito dai file su disco
+    reopened = ImageStore(str(tmp_path / "store"), int(size * 2.5))
+    assert reopened.total_bytes == 2 * size
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    data = png_bytes(100, 100)
+
+    def disk_full(image, path, *args, **kwargs):
+        with open(path, "wb") as file:
+            file.write(b"partial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(Image.Image, "save", disk_full)
+    store = ImageStore(str(tmp_path), 10 * 1024 * 1024)
+
+    assert store.store(10, io.BytesIO(data)) == "error"
+    assert list(tmp_path.iterdir()) == []
+    assert store.total_bytes == 0 and not store.contains(10)
@@ -0,0 +1,37 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from database import session as db_session
+from actions.instrumentation import RequestStats, current_request
+
+
+def test_failed_statement_clears_its_start_time():
+    engine = create_engine("sqlite://")
+    stats = RequestStats("action_test")
+    token = current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info["query_start_time"] == []
+
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.info["query_start_time"] == []
+    finally:
+        current_request.reset(token)
+
+    assert stats.sql_count == 2
+    assert "SELECT * FROM missing_table" in stats.statements
+
+
+def test_pool_statistics_are_published(tmp_path):
+    db_session.configure(f"sqlite:///{tmp_path / 'catalog.sqlite'}")
+    before = REGISTRY.get_sample_value("chatbot_db_pool_checkouts_total", {"engine": "sync"})
+
+    with db_session.session_scope() as session:
+        session.execute(text("SELECT 1"))
+
+    assert REGISTRY.get_sample_value("chatbot_db_pool_checkouts_total", {"engine": "sync"}) == before + 1
+    assert REGISTRY.get_sample_value("chatbot_db_pool_waits_total", {"engine": "async"}) is not None
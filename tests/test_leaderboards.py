@@ -0,0 +1,48 @@
+from database import db_queries
+from database.normalize import normalize_game
+
+
+def steam_game(source_id, tags, publishers):
+    return normalize_game(source_id, {
+        'name': f"Game {source_id}",
+        'release_date': "Oct 21, 2015",
+        'supported_languages': ["English"],
+        'positive': 10,
+        'negative': 1,
+        'tags': {tag: 1 for tag in tags},
+        'publishers': publishers,
+    })
+
+
+def leaderboard(rows):
+    return [(dimension.name, game_count) for dimension, game_count in rows]
+
+
+def test_leaderboards_are_recomputed_after_seeding_and_sync(seeders):
+    seeders.seed_normalized([
+        steam_game("1", ["FPS", "Action"], ["Valve"]),
+        steam_game("2", ["Action"], ["Valve"]),
+        steam_game("3", ["Puzzle", "Action"], ["Annapurna"]),
+        steam_game("4", ["Puzzle"], ["Devolver"]),
+    ])
+    session = seeders.session
+
+    # A parità di giochi vale l'id: l'ordine in cui i nomi sono stati inseriti
+    assert leaderboard(db_queries.get_top_tags(session)) == [("Action", 3), ("Puzzle", 2), ("FPS", 1)]
+    assert leaderboard(db_queries.get_top_publishers(session, limit=2)) == [("Valve", 2), ("Annapurna", 1)]
+    assert db_queries.count_top_tags(session) == 3
+    assert db_queries.count_top_publishers(session) == 3
+
+    seeders.sync_normalized([
+        steam_game("1", ["FPS"], ["Devolver"]),
+        steam_game("3", ["Puzzle", "FPS"], ["Devolver"]),
+        steam_game("4", ["Puzzle"], ["Devolver"]),
+    ])
+
+    assert leaderboard(db_queries.get_top_tags(session)) == [("FPS", 2), ("Puzzle", 2)]
+    assert leaderboard(db_queries.get_top_publishers(session)) == [("Devolver", 3)]
+    assert db_queries.count_top_tags(session) == 2
+    assert db_queries.count_top_publishers(session) == 1
+
+    computed = db_queries.compute_top_tags(session)
+    assert [(tag.tag_id, count) for tag, count in db_queries.get_top_tags(session)] == [tuple(row) for row in computed]
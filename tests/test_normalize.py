@@ -0,0 +1,45 @@
+import types
+import datetime
+
+import pytest
+from dateutil.parser import _parser
+
+from database.normalize import normalize_game, parse_release_date
+
+
+def steam_game(release_date):
+    return {
+        'name': "Half-Life",
+        'release_date': release_date,
+        'supported_languages': ["English"],
+        'positive': 10,
+        'negative': 2,
+        'price': 9,
+        'tags': {"FPS": 5},
+    }
+
+
+def freeze_today(monkeypatch, today):
+    """Fa credere a dateutil che oggi sia today."""
+    class FrozenDateTime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(today.year, today.month, today.day)
+
+    monkeypatch.setattr(_parser, "datetime", types.SimpleNamespace(**{**vars(datetime), "datetime": FrozenDateTime}))
+
+
+@pytest.mark.parametrize("release_date", ["2015", "Oct 2015", "Oct 21, 2015"])
+def test_source_hash_does_not_depend_on_today(monkeypatch, release_date):
+    hashes = []
+    for today in (datetime.date(2026, 10, 18), datetime.date(2027, 3, 5)):
+        freeze_today(monkeypatch, today)
+        normalized = normalize_game("70", steam_game(release_date))
+        hashes.append(normalized['game']['source_hash'])
+    assert hashes[0] == hashes[1]
+
+
+def test_incomplete_release_dates_use_first_day():
+    assert parse_release_date("2015") == datetime.date(2015, 1, 1)
+    assert parse_release_date("Oct 2015") == datetime.date(2015, 10, 1)
+    assert parse_release_date("Oct 21, 2015") == datetime.date(2015, 10, 21)
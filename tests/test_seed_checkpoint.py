@@ -0,0 +1,77 @@
+import pytest
+
+from database.models import Game, GameTag, SeedCheckpoint
+from database.normalize import normalize_game
+
+
+SOURCE = "games.json (limite: tutti)"
+
+
+def steam_games(count):
+    return [
+        normalize_game(str(index), {
+            'name': f"Game {index}",
+            'release_date': "Oct 21, 2015",
+            'supported_languages': ["English"],
+            'positive': index,
+            'negative': 1,
+            'tags': {"Indie": 1},
+        })
+        for index in range(1, count + 1)
+    ]
+
+
+def interrupted(games, after):
+    """Come il dataset, ma il processo si interrompe dopo aver letto after giochi."""
+    for index, normalized in enumerate(games):
+        if index == after:
+            raise KeyboardInterrupt
+        yield normalized
+
+
+@pytest.fixture
+def small_batches(seeders, monkeypatch):
+    monkeypatch.setattr(seeders, "SEED_BATCH_SIZE", 2)
+    return seeders
+
+
+def test_interrupted_seeding_resumes_after_last_flush(small_batches, tmp_path):
+    seeders = small_batches
+    session = seeders.session
+    games = steam_games(7)
+    metrics = str(tmp_path / "seed.prom")
+
+    with pytest.raises(KeyboardInterrupt):
+        seeders.seed_normalized(interrupted(games, 5), SOURCE, metrics_path=metrics)
+    session.rollback()
+
+    # Il quinto gioco era nel blocco non ancora scritto
+    checkpoint = session.get(SeedCheckpoint, SOURCE)
+    assert (checkpoint.position, checkpoint.last_source_id, checkpoint.inserted_games) == (4, "4", 4)
+    assert session.query(Game).count() == 4
+
+    seeders.seed_normalized(iter(games), SOURCE, metrics_path=metrics)
+
+    names = sorted(name for name, in session.query(Game.name))
+    assert names == sorted(f"Game {index}" for index in range(1, 8))
+    assert session.query(GameTag).count() == 7
+    assert session.get(SeedCheckpoint, SOURCE) is None
+
+
+def test_checkpoint_of_another_dataset_is_not_resumed(small_batches, tmp_path):
+    seeders = small_batches
+    session = seeders.session
+    metrics = str(tmp_path / "seed.prom")
+
+    with pytest.raises(KeyboardInterrupt):
+        seeders.seed_normalized(interrupted(steam_games(5), 3), SOURCE, metrics_path=metrics)
+    session.rollback()
+
+    # Stessa sorgente ma giochi diversi: il seeding non riparte da una posizione sbagliata
+    seeders.seed_normalized(iter(steam_games(5)[2:]), SOURCE, metrics_path=metrics)
+    assert session.query(Game).count() == 2
+    assert session.get(SeedCheckpoint, SOURCE).position == 2
+
+    seeders.seed_normalized(iter(steam_games(5)), SOURCE, restart=True, metrics_path=metrics)
+    assert session.query(Game).count() == 5
+    assert session.get(SeedCheckpoint, SOURCE) is None
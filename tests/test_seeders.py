@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import text
+
+from database.models import Game, GameTag, Tag
+from database.normalize import normalize_game
+
+
+def game(source_id, name, tags):
+    return normalize_game(source_id, {
+        'name': name,
+        'release_date': "Oct 21, 2015",
+        'supported_languages': ["English"],
+        'positive': 10,
+        'negative': 1,
+        'tags': {tag: 1 for tag in tags},
+    })
+
+
+def test_failed_dimension_row_is_recreated_by_later_games(seeders):
+    session = seeders.session
+    session.execute(text(
+        "CREATE TRIGGER reject_broken_tag BEFORE INSERT ON tags WHEN NEW.name = 'Broken' "
+        "BEGIN SELECT RAISE(ABORT, 'tag rifiutato'); END"
+    ))
+    session.commit()
+
+    seeder = seeders.CatalogSeeder()
+    seeder.add_game(game("1", "First", ["Broken", "FPS"]))
+    seeder.add_game(game("2", "Second", ["FPS"]))
+    errors = seeder.flush()
+
+    assert [label for label, _ in errors] == ["tags 'Broken'", "gioco 1 'First'"]
+    assert errors[1][1] == "tags 'Broken' non inserito"
+    assert [name for name, in session.query(Game.name)] == ["Second"]
+
+    # Il nome non è rimasto in cache con l'id mai inserito: il blocco successivo lo ricrea
+    session.execute(text("DROP TRIGGER reject_broken_tag"))
+    session.commit()
+    seeder.add_game(game("3", "Third", ["Broken"]))
+    assert seeder.flush() == []
+
+    third_tags = (
+        session.query(Tag.name)
+        .join(GameTag, GameTag.tag_id == Tag.tag_id)
+        .join(Game, Game.app_id == GameTag.app_id)
+        .filter(Game.name == "Third")
+        .all()
+    )
+    assert third_tags == [("Broken",)]
+    dangling_links = session.query(GameTag).outerjoin(Tag, Tag.tag_id == GameTag.tag_id).filter(Tag.tag_id.is_(None)).count()
+    assert dangling_links == 0
+
+
+def test_zero_limit_loads_the_whole_catalog(seeders):
+    assert [seeders.parse_game_limit(value) for value in ("all", "ALL", "0", 0, "20000")] == [None, None, None, None, 20000]
+    with pytest.raises(ValueError):
+        seeders.parse_game_limit("-1")
+
+    games = [(str(index), {'name': f"Game {index}", 'positive': index, 'negative': 0}) for index in range(3)]
+    top_ids = lambda limit: [app_id for app_id, _ in seeders.top_games(iter(games), seeders.parse_game_limit(limit), seeders.game_value)]
+    assert top_ids("0") == ["0", "1", "2"]
+    assert top_ids("2") == ["2", "1"]
@@ -0,0 +1,78 @@
+import time
+import asyncio
+import threading
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import session as db_session
+from database.session import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolStats, instrumented_pool_class
+
+
+def test_async_pool_counts_checkouts_waiting_for_a_connection(tmp_path):
+    stats = PoolStats()
+    pool_class = instrumented_pool_class(InstrumentedAsyncQueuePool, stats, 0)
+
+    async def hold(engine, seconds):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(seconds)
+
+    async def main():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'catalog.sqlite'}", poolclass=pool_class, pool_size=1, max_overflow=0,
+        )
+        await hold(engine, 0)  # connessione già aperta e libera: nessuna attesa
+        await asyncio.gather(hold(engine, 0.2), hold(engine, 0))
+        pool = engine.sync_engine.pool
+        sizes = (pool.size(), pool.checkedout(), pool.overflow())
+        await engine.dispose()
+        return sizes
+
+    assert asyncio.run(main()) == (1, 0, 0)
+    assert stats.waits == 1
+    assert stats.max_wait_time >= 0.1
+
+
+def test_configure_disposes_the_async_engine(tmp_path):
+    async def main():
+        db_session.configure(f"sqlite:///{tmp_path / 'first.sqlite'}")
+        async with db_session.async_session_scope() as session:
+            await session.execute(text("SELECT 1"))
+        first = db_session.get_async_engine()
+        assert first.sync_engine.pool.checkedin() == 1
+
+        db_session.configure(f"sqlite:///{tmp_path / 'second.sqlite'}")
+        await asyncio.gather(*db_session._background_tasks)
+        assert db_session.get_async_engine() is not first
+        return first.sync_engine.pool.checkedin()
+
+    assert asyncio.run(main()) == 0
+    stats = db_session.get_pool_stats()
+    assert set(stats) == {"sync", "async"} and stats["async"]["checkouts"] >= 1
+
+
+def test_sync_pool_counts_checkouts_waiting_for_a_connection(tmp_path):
+    stats = PoolStats()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'catalog.sqlite'}",
+        poolclass=instrumented_pool_class(InstrumentedQueuePool, stats, 0), pool_size=1, max_overflow=0,
+    )
+    held = threading.Event()
+
+    def hold():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            held.set()
+            time.sleep(0.2)
+
+    with engine.connect():
+        pass
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    thread.join()
+
+    assert stats.waits == 1
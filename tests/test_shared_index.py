@@ -0,0 +1,115 @@
+import time
+import asyncio
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from database.models import Base, Game
+from database.name_index import TrigramIndex
+from database.normalize import normalize_game
+from database.shared_index import SharedIndex
+
+
+class CountingIndex:
+    builds = 0
+
+    def __init__(self, app_ids):
+        self.app_ids = app_ids
+        self.built_at = time.monotonic()
+        self.signature = None
+
+    @classmethod
+    def build(cls, session):
+        cls.builds += 1
+        return cls([app_id for app_id, in session.query(Game.app_id).order_by(Game.app_id)])
+
+
+def catalog(tmp_path, games=50):
+    path = tmp_path / "catalog.sqlite"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Game(app_id=app_id, name=f"Game {app_id}", score=float(app_id)) for app_id in range(1, games + 1))
+        session.commit()
+    engine.dispose()
+    return path
+
+
+def test_concurrent_async_requests_build_once(tmp_path):
+    path = catalog(tmp_path)
+    CountingIndex.builds = 0
+    shared = SharedIndex(CountingIndex.build, ttl=600)
+
+    async def request(engine):
+        async with AsyncSession(engine) as session:
+            return await shared.get_async(session)
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        indexes = await asyncio.wait_for(asyncio.gather(*(request(engine) for _ in range(20))), timeout=30)
+        await engine.dispose()
+        return indexes
+
+    indexes = asyncio.run(main())
+    assert CountingIndex.builds == 1
+    assert all(index is indexes[0] for index in indexes)
+    assert indexes[0].app_ids == list(range(1, 51))
+
+
+def test_concurrent_threads_build_once(tmp_path):
+    engine = create_engine(f"sqlite:///{catalog(tmp_path)}")
+    CountingIndex.builds = 0
+    shared = SharedIndex(CountingIndex.build, ttl=600)
+    indexes = []
+
+    def request():
+        with Session(engine) as session:
+            indexes.append(shared.get(session))
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingIndex.builds == 1
+    assert len(indexes) == 10 and all(index is indexes[0] for index in indexes)
+
+
+def test_expired_index_is_rebuilt_only_if_catalog_changed(tmp_path):
+    engine = create_engine(f"sqlite:///{catalog(tmp_path)}")
+    CountingIndex.builds = 0
+    shared = SharedIndex(CountingIndex.build, ttl=0)
+    with Session(engine) as session:
+        first = shared.get(session)
+        first.built_at -= 1
+        assert shared.get(session) is first
+
+        session.add(Game(app_id=51, name="Game 51", score=51.0))
+        session.commit()
+        first.built_at -= 1
+        assert shared.get(session) is not first
+    assert CountingIndex.builds == 2
+
+
+def test_sync_rename_rebuilds_the_name_index(seeders):
+    def steam_game(name, tags):
+        return normalize_game("70", {
+            'name': name, 'release_date': "Nov 8, 1998", 'supported_languages': ["English"],
+            'positive': 10, 'negative': 1, 'tags': {tag: 1 for tag in tags},
+        })
+
+    seeders.seed_normalized([steam_game("Half-Life", ["FPS"])])
+    shared = SharedIndex(TrigramIndex.build, ttl=0)
+    session = seeders.session
+    first = shared.get(session)
+    assert [name for _, name, _ in first.search("half life")] == ["Half-Life"]
+
+    # Stesso numero di giochi, stesso app_id e stesso punteggio: cambia solo il nome
+    seeders.sync_normalized([steam_game("Half-Life: Source", ["FPS", "Classic"])])
+    first.built_at -= 1
+    second = shared.get(session)
+    assert second is not first
+    assert [name for _, name, _ in second.search("half life source")] == ["Half-Life: Source"]
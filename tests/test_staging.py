@@ -0,0 +1,51 @@
+import json
+import importlib
+
+import pytest
+
+from database import session as db_session
+from database.dataset_stream import iter_games
+from database.staging import export_staging, load_staged_games
+
+
+def steam_game(name, positive, languages=("English",)):
+    return {
+        'name': name,
+        'release_date': "Oct 21, 2015",
+        'supported_languages': list(languages),
+        'positive': positive,
+        'negative': 1,
+        'tags': {"FPS": positive},
+        'packages': [{'title': f"Buy {name}", 'description': "", 'subpackages': [{'title': name, 'description': "", 'price': 9.99}]}],
+        'screenshots': [f"https://example.com/{positive}.jpg"],
+    }
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    games = {
+        "10": steam_game("Alpha", 5),
+        "20": steam_game("Beta", 50),
+        "30": steam_game("alpha ", 500),  # duplicato di Alpha in un altro blocco
+        "40": steam_game("Gamma", 50),
+        "50": steam_game("Delta", 5000, languages=("German",)),
+        "60": steam_game("Epsilon", 50),
+        "70": steam_game("", 9000),
+    }
+    path = tmp_path / "games.json"
+    path.write_text(json.dumps(games))
+    staging_dir = str(tmp_path / "staging")
+    export_staging(str(path), staging_dir, batch_size=2)
+    return str(path), staging_dir
+
+
+@pytest.mark.parametrize("limit", [None, 3, 0])
+def test_staged_games_match_json_games_across_parts(tmp_path, dataset, limit):
+    # Il seeder si importa solo con un database configurato
+    db_session.configure(f"sqlite:///{tmp_path / 'catalog.sqlite'}")
+    seeders = importlib.import_module('database.seeders')
+    path, staging_dir = dataset
+    expected = list(seeders.normalized_games(iter_games(path), limit, workers=1))
+    staged = list(load_staged_games(staging_dir, limit))
+    assert staged == expected
+    assert [game['source_id'] for game in staged] == (["10", "20", "40", "60"] if limit is None else ["20", "40"][:limit])
@@ -0,0 +1,69 @@
+from sqlalchemy import update
+
+from database.models import Game, GameTag, StoredGameCard, Tag
+from database.normalize import normalize_game
+
+
+def steam_game(source_id, name, tags, positive=10):
+    return normalize_game(source_id, {
+        'name': name,
+        'release_date': "Oct 21, 2015",
+        'supported_languages': ["English"],
+        'positive': positive,
+        'negative': 1,
+        'tags': {tag: 1 for tag in tags},
+    })
+
+
+def catalog(session):
+    """steam_app_id -> (app_id, nome, tag, updated_at)."""
+    tags = {}
+    for app_id, tag in session.query(GameTag.app_id, Tag.name).join(Tag, Tag.tag_id == GameTag.tag_id).order_by(Tag.name):
+        tags.setdefault(app_id, []).append(tag)
+    return {
+        game.steam_app_id: (game.app_id, game.name, tags.get(game.app_id, []), game.updated_at)
+        for game in session.query(Game)
+    }
+
+
+def test_sync_inserts_updates_and_deletes(seeders):
+    session = seeders.session
+    seeders.sync_normalized([
+        steam_game("10", "Half-Life", ["FPS"]),
+        steam_game("20", "Portal", ["Puzzle"]),
+        steam_game("30", "Braid", ["Indie"]),
+    ])
+    before = catalog(session)
+    assert {key: value[1:3] for key, value in before.items()} == {
+        10: ("Half-Life", ["FPS"]), 20: ("Portal", ["Puzzle"]), 30: ("Braid", ["Indie"]),
+    }
+
+    seeders.sync_normalized([
+        steam_game("10", "Half-Life", ["FPS"]),  # invariato
+        steam_game("20", "Portal", ["Puzzle", "Classic"], positive=50),  # cambiato
+        steam_game("40", "Celeste", ["Indie"]),  # nuovo
+    ])
+    after = catalog(session)
+
+    assert after[10] == before[10]  # non riscritto
+    assert after[20][0] == before[20][0] and after[20][1:3] == ("Portal", ["Classic", "Puzzle"])
+    assert after[20][3] > before[20][3]
+    assert after[40][1:3] == ("Celeste", ["Indie"])
+    assert 30 not in after
+
+    # Nessuna riga orfana del gioco eliminato, schede allineate al catalogo
+    assert session.query(GameTag).filter(GameTag.app_id == before[30][0]).count() == 0
+    assert sorted(app_id for app_id, in session.query(StoredGameCard.app_id)) == sorted(value[0] for value in after.values())
+
+
+def test_sync_adopts_games_loaded_before_the_sync_keys(seeders):
+    session = seeders.session
+    seeders.seed_normalized([steam_game("10", "Half-Life", ["FPS"])])
+    # Come dopo la migrazione delle chiavi: i giochi già caricati non hanno steam_app_id
+    session.execute(update(Game).values(steam_app_id=None, source_hash=None))
+    session.commit()
+    app_id, = session.query(Game.app_id).one()
+
+    seeders.sync_normalized([steam_game("10", "half-life", ["FPS"])])
+
+    assert session.query(Game.app_id, Game.steam_app_id, Game.name).all() == [(app_id, 10, "half-life")]
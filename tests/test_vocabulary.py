@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from database.models import Base, Tag
+from database.vocabulary import Vocabulary
+
+
+def test_lookup_async_loads_once_through_the_async_session(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Tag(tag_id=1, name="Action"), Tag(tag_id=2, name="Open  World")])
+        session.commit()
+
+    def no_sync_session():
+        raise AssertionError("query sincrona sull'event loop")
+
+    async def main():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        sessions = []
+
+        @asynccontextmanager
+        async def async_session_scope():
+            async with AsyncSession(async_engine) as session:
+                sessions.append(session)
+                yield session
+
+        vocabulary = Vocabulary(no_sync_session, Tag, Tag.tag_id, async_session_scope=async_session_scope)
+        entries = await asyncio.gather(*(vocabulary.lookup_async(name) for name in ["action", "open world", "RPG"] * 5))
+        await async_engine.dispose()
+        return entries, len(sessions)
+
+    entries, session_count = asyncio.run(main())
+    assert entries[:3] == [("Action", 1), ("Open  World", 2), None]
+    assert session_count == 1
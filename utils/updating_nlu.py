@@ -1,6 +1,3 @@
-import os
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 import sys
 import os
 
@@ -8,21 +5,9 @@ project_root = r"C:\Users\dswal\Desktop\ChatBot-Data-Science-Project"
 sys.path.append(project_root)
 
 from database.models import *
+from database.session import get_session
 
-load_dotenv()
-# Recupera gli elementi dell'URL del database
-DB_USER = os.getenv("DB_USER")  # Usa "root" come valore predefinito
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
-DB_DRIVER = os.getenv("DB_DRIVER")
-
-# Costruisci l'URL del database
-DATABASE_URL = f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+session = get_session()
 
 column = "language"
 